@@ -1,10 +1,14 @@
 from __future__ import annotations
 import json
+from contextlib import nullcontext
 import numpy as np
 from ..models.pool import Pool
 from ..models.extended_nmj import ExtendedNMJParams, ExtendedOptimizedNMJ
 from ..models.extended_muscle import ExtendedMuscleParams, ExtendedMuscle
+from ..models.multirate import decimate
 from ..profiles import extended_param_dicts
+from ..storage.traces import TraceStore
+from .extended_checkpoint import checkpointed_filtered_activations
 
 def simulate_extended(
     seconds: float = 1.0,
@@ -18,9 +22,23 @@ def simulate_extended(
     seed: int = 7,
     profile: str = "baseline",
     fft_threshold: int | None = None,
+    trace_dir: str | None = None,
+    force_decimation: int = 1,
+    checkpoint_dir: str | None = None,
+    checkpoint_every: int = 10,
+    block_s: float = 1.0,
+    resume: bool = True,
 ) -> dict:
+    """Extended NMJ → muscle run; channel noise is seeded from ``seed``.
+
+    With ``checkpoint_dir`` the filtering stage runs in blocks of ``block_s``
+    and is checkpointed every ``checkpoint_every`` blocks (see
+    :mod:`~neuromotorica.analysis.extended_checkpoint`); a rerun with the same
+    arguments resumes from the last checkpoint.
+    """
+    if force_decimation < 1:
+        raise ValueError("force_decimation must be >= 1")
     pool = Pool(units=units, dt=dt, T=seconds)
-    spikes = pool.poisson_spikes(rate_hz=rate_hz, seed=seed)
     enh_dict, muscle_dict = extended_param_dicts(profile)
     ext_nmj = ExtendedNMJParams(
         **{**enh_dict, "noise_sigma": noise_sigma, "glial_mod_gain": glial_gain, "failure_bias": failure_bias}
@@ -29,28 +47,53 @@ def simulate_extended(
     ext_muscle = ExtendedMuscleParams(**{**muscle_dict, "topography_factor": topo_factor})
     muscle = ExtendedMuscle(ext_muscle, dt, seconds, units=units)
 
-    act, failure_rate, snr, jitter_ms = nmj.extended_activation(
-        spikes,
-        failure_bias=failure_bias,
-        fft_threshold=fft_threshold,
-    )
-    F, _ = muscle.force(act)
+    config = {
+        "seconds": seconds,
+        "dt": dt,
+        "units": units,
+        "rate_hz": rate_hz,
+        "noise_sigma": noise_sigma,
+        "glial_gain": glial_gain,
+        "topography_factor": topo_factor,
+        "failure_bias": failure_bias,
+        "profile": profile,
+        "fft_threshold": fft_threshold,
+        "force_decimation": force_decimation,
+    }
+    # NMJ metrics use the fine grid; force is evaluated at dt * force_decimation.
+    force_dt = dt * force_decimation
+    noise_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    if checkpoint_dir is None:
+        act, failure_rate, snr, jitter_ms = nmj.extended_activation(
+            pool.poisson_spikes(rate_hz=rate_hz, seed=seed),
+            failure_bias=failure_bias,
+            fft_threshold=fft_threshold,
+            rng=noise_rng,
+        )
+    else:
+        ach_act, hist_act = checkpointed_filtered_activations(
+            nmj, pool, rate_hz=rate_hz, seed=seed, config=config, checkpoint_dir=checkpoint_dir,
+            block_s=block_s, checkpoint_every=checkpoint_every, resume=resume,
+        )
+        act, failure_rate, snr, jitter_ms = nmj.activation_from_filtered(
+            ach_act, hist_act, failure_bias=failure_bias, rng=noise_rng
+        )
+    force_act = decimate(act, force_decimation) if force_decimation > 1 else act
+    # Stored traces share the force-stage rate so that one store has a single dt;
+    # each stage is appended as soon as it finishes.
+    writer = (TraceStore.create(trace_dir, dt=force_dt, config=config, profile=profile, seed=seed)
+              if trace_dir is not None else None)
+    with writer if writer is not None else nullcontext():
+        if writer is not None:
+            writer.append("extended.activation", force_act)
+        F, _ = muscle.force(force_act)
+        if writer is not None:
+            writer.append("extended.force", F)
     mean_force = float(np.mean(F))
     cv_force = float((np.std(F) / max(mean_force, 1e-9)))
 
-    return {
-        "config": {
-            "seconds": seconds,
-            "dt": dt,
-            "units": units,
-            "rate_hz": rate_hz,
-            "noise_sigma": noise_sigma,
-            "glial_gain": glial_gain,
-            "topography_factor": topo_factor,
-            "failure_bias": failure_bias,
-            "profile": profile,
-            "fft_threshold": fft_threshold,
-        },
+    result = {
+        "config": config,
         "metrics": {
             "failure_rate": round(failure_rate, 4),
             "failure_probability": round(failure_rate, 4),
@@ -61,6 +104,9 @@ def simulate_extended(
             "cv_force": round(cv_force, 4),
         },
     }
+    if writer is not None:
+        result["traces"] = {"path": str(trace_dir), "names": list(writer.store.names())}
+    return result
 
 if __name__ == "__main__":
     out = simulate_extended()
@@ -0,0 +1,85 @@
+"""``neuromotorica profile``: cProfile and stack-sampling artifacts for repeated simulations."""
+
+from __future__ import annotations
+
+import cProfile
+import contextlib
+import json
+import pathlib
+import pstats
+from typing import Optional
+
+import typer
+
+from ..profiles import ProfileNotFoundError
+from .profiling import StackSampler, hotspot_tables, profile_simulation, stage_breakdown
+
+
+def main(
+    seconds: float = typer.Option(2.0, "--seconds"),
+    dt: float = typer.Option(1e-3, "--dt"),
+    units: int = typer.Option(64, "--units"),
+    rate: float = typer.Option(20.0, "--rate"),
+    repeats: int = typer.Option(3, "--repeats", "-r"),
+    profile: str = typer.Option("baseline", "--profile", "-p"),
+    fft_threshold: Optional[int] = typer.Option(None, "--fft-threshold"),
+    seed: int = typer.Option(0, "--seed"),
+    report: pathlib.Path = typer.Option(pathlib.Path("profile.json"), "--report"),
+    use_cprofile: bool = typer.Option(True, "--cprofile/--no-cprofile"),
+    pstats_path: Optional[pathlib.Path] = typer.Option(None, "--pstats", help="Write raw cProfile stats (snakeviz)"),
+    sample: bool = typer.Option(True, "--sample/--no-sample", help="Sample stacks for flamegraphs"),
+    interval_ms: float = typer.Option(1.0, "--interval-ms"),
+    collapsed_path: Optional[pathlib.Path] = typer.Option(
+        None, "--collapsed", help="Collapsed-stack output (default: <report>.folded)"
+    ),
+    top: int = typer.Option(20, "--top"),
+    stages: bool = typer.Option(True, "--stages/--no-stages", help="Per-stage breakdown in its own unprofiled pass"),
+    stage_memory: bool = typer.Option(
+        True, "--stage-memory/--no-stage-memory", help="Stage allocation peaks (one extra tracemalloc run)"
+    ),
+):
+    """Profile repeated simulations and write JSON, hotspot and flamegraph artifacts."""
+    if repeats < 1 or interval_ms <= 0:
+        raise typer.BadParameter("--repeats must be >= 1 and --interval-ms > 0")
+    profiler = cProfile.Profile() if use_cprofile else None
+    sampler = StackSampler(interval_ms / 1000.0) if sample else None
+    sim = dict(seconds=seconds, dt=dt, units=units, rate_hz=rate, repeats=repeats,
+               profile=profile, fft_threshold=fft_threshold, seed=seed)
+    try:
+        # Stage recording would dominate the hotspots and stacks, so the profiled
+        # pass runs uninstrumented and the breakdown gets a pass of its own.
+        with contextlib.ExitStack() as stack:
+            if sampler is not None:
+                stack.enter_context(sampler)
+            if profiler is not None:
+                profiler.enable()
+                stack.callback(profiler.disable)
+            result = profile_simulation(**sim, instrument=False)
+        if stages:
+            result["stages"] = stage_breakdown(**sim, trace_memory=stage_memory)
+    except ProfileNotFoundError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=2)
+
+    report.parent.mkdir(parents=True, exist_ok=True)
+    artifacts = {"report": str(report)}
+    if profiler is not None:
+        stats = pstats.Stats(profiler)
+        result["hotspots"] = hotspot_tables(stats, top=top)
+        if pstats_path is not None:
+            pstats_path.parent.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(str(pstats_path))
+            artifacts["pstats"] = str(pstats_path)
+    if sampler is not None:
+        folded = collapsed_path or report.with_suffix(".folded")
+        folded.parent.mkdir(parents=True, exist_ok=True)
+        folded.write_text(sampler.collapsed(), encoding="utf-8")
+        artifacts["collapsed"] = str(folded)
+        result["sampling"] = {"interval_ms": interval_ms, "samples": sampler.samples}
+    result["artifacts"] = artifacts
+    report.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    typer.echo(f"runtime mean {result['metrics']['runtime_ms']['mean']:.2f} ms over {repeats} run(s)")
+    for row in result.get("hotspots", {}).get("by_tottime", [])[: min(top, 10)]:
+        typer.echo(f"{row['tottime_ms']:>10.2f} ms {row['calls']:>8d}  {row['function']} ({pathlib.Path(row['file']).name}:{row['line']})")
+    typer.echo(json.dumps(artifacts))
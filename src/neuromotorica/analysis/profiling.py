@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import os
+import pstats
 import statistics
+import sys
+import threading
+from collections import Counter
 from time import perf_counter
 from typing import Any, Dict, List
 
@@ -20,6 +25,54 @@ def _summary_stats(values: List[float]) -> Dict[str, float]:
     }
 
 
+def stage_breakdown(
+    *,
+    seconds: float,
+    dt: float,
+    units: int,
+    rate_hz: float,
+    repeats: int,
+    profile: str,
+    fft_threshold: int | None,
+    seed: int,
+    trace_memory: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """Per-stage timings and allocation peaks of :func:`scenario_sim`, aggregated across repeats.
+
+    Timings come from ``repeats`` runs without ``tracemalloc``, and
+    ``share_pct`` is relative to the runtime of those same runs. ``tracemalloc``
+    slows the simulation several-fold, so allocation peaks are taken from one
+    extra run of the first seed and never mix into the timings.
+    """
+
+    stage_runs: Dict[str, Dict[str, List[float]]] = {}
+    runtimes: List[float] = []
+    common = dict(seconds=seconds, dt=dt, units=units, rate_hz=rate_hz, profile=profile, fft_threshold=fft_threshold)
+    for idx in range(repeats):
+        t0 = perf_counter()
+        result = scenario_sim(seed=seed + idx, instrument=True, trace_memory=False, **common)
+        runtimes.append((perf_counter() - t0) * 1000.0)
+        for name, stage in result["runtime"]["stages"].items():
+            acc = stage_runs.setdefault(name, {"total_ms": [], "calls": []})
+            acc["total_ms"].append(stage["total_ms"])
+            acc["calls"].append(stage["calls"])
+    peaks: Dict[str, int] = {}
+    if trace_memory:
+        result = scenario_sim(seed=seed, instrument=True, trace_memory=True, **common)
+        peaks = {name: stage["peak_bytes"] for name, stage in result["runtime"]["stages"].items()}
+
+    mean_runtime = max(statistics.fmean(runtimes), 1e-9)
+    return {
+        name: {
+            "total_ms": _summary_stats(acc["total_ms"]),
+            "calls_per_run": round(statistics.fmean(acc["calls"]), 3),
+            "peak_bytes_max": peaks.get(name),
+            "share_pct": round(statistics.fmean(acc["total_ms"]) / mean_runtime * 100.0, 2),
+        }
+        for name, acc in stage_runs.items()
+    }
+
+
 def profile_simulation(
     *,
     seconds: float,
@@ -30,15 +83,23 @@ def profile_simulation(
     profile: str,
     fft_threshold: int | None,
     seed: int,
+    instrument: bool = True,
+    trace_memory: bool = True,
 ) -> Dict[str, Any]:
-    """Profile repeated simulation runs and surface optimisation hints."""
+    """Profile repeated simulation runs and surface optimisation hints.
+
+    ``runtime_ms`` and ``single_spike_ms`` always come from uninstrumented
+    runs. With ``instrument`` enabled, :func:`stage_breakdown` adds ``stages``
+    in separate passes afterwards (allocation peaks only with ``trace_memory``).
+    """
 
     runtimes: List[float] = []
+    single_runtimes: List[float] = []
     force_improvements: List[float] = []
     snr_gains: List[float] = []
     seeds = [seed + idx for idx in range(repeats)]
 
-    for idx, run_seed in enumerate(seeds):
+    for run_seed in seeds:
         t0 = perf_counter()
         result = scenario_sim(
             seconds=seconds,
@@ -49,16 +110,24 @@ def profile_simulation(
             profile=profile,
             fft_threshold=fft_threshold,
         )
-        runtimes.append(result["runtime"]["single_spike_sec"])
+        runtimes.append(perf_counter() - t0)
+        single_runtimes.append(result["runtime"]["single_spike_sec"])
         poisson_forces = result["random_poisson"]["forces_N"]
         baseline_force = float(poisson_forces["baseline"]) or 1e-9
         optimized_force = float(poisson_forces["optimized"])
         force_improvements.append((optimized_force - baseline_force) / baseline_force * 100.0)
         snr_metrics = result["random_poisson"]["snr"]
         snr_gains.append(float(snr_metrics["optimized"]) - float(snr_metrics["baseline"]))
-        runtimes[-1] = max(runtimes[-1], perf_counter() - t0)
 
     runtime_stats = _summary_stats([r * 1000.0 for r in runtimes])
+    stages = (
+        stage_breakdown(
+            seconds=seconds, dt=dt, units=units, rate_hz=rate_hz, repeats=repeats,
+            profile=profile, fft_threshold=fft_threshold, seed=seed, trace_memory=trace_memory,
+        )
+        if instrument
+        else {}
+    )
     improvement_stats = _summary_stats(force_improvements)
     snr_stats = _summary_stats(snr_gains)
 
@@ -98,8 +167,85 @@ def profile_simulation(
         },
         "metrics": {
             "runtime_ms": runtime_stats,
+            "single_spike_ms": _summary_stats([r * 1000.0 for r in single_runtimes]),
             "force_improvement_pct": improvement_stats,
             "snr_gain": snr_stats,
         },
+        "stages": stages,
         "recommendations": recommendations,
     }
+
+
+def _frame_label(code: Any) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class StackSampler:
+    """Periodically sample the calling thread's stack into collapsed-stack counts.
+
+    The output of :meth:`collapsed` is the ``frame;frame;frame count`` format read
+    by ``flamegraph.pl``, speedscope and ``py-spy``-compatible viewers.
+    """
+
+    def __init__(self, interval_s: float = 0.001, thread_id: int | None = None):
+        if interval_s <= 0:
+            raise ValueError("interval_s must be > 0")
+        self.interval_s = interval_s
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.counts: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack: List[str] = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            self.counts[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def __enter__(self) -> "StackSampler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="neuromotorica-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def samples(self) -> int:
+        return sum(self.counts.values())
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+def hotspot_tables(stats: pstats.Stats, top: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+    """Per-function hotspot rows from cProfile stats, ranked by own and cumulative time."""
+
+    rows: List[Dict[str, Any]] = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append(
+            {
+                "function": func,
+                "file": filename,
+                "line": line,
+                "calls": ncalls,
+                "tottime_ms": round(tottime * 1000.0, 3),
+                "cumtime_ms": round(cumtime * 1000.0, 3),
+                "percall_ms": round(tottime * 1000.0 / max(ncalls, 1), 6),
+            }
+        )
+    return {
+        "by_tottime": sorted(rows, key=lambda r: r["tottime_ms"], reverse=True)[:top],
+        "by_cumtime": sorted(rows, key=lambda r: r["cumtime_ms"], reverse=True)[:top],
+    }
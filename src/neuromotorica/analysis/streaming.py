@@ -0,0 +1,284 @@
+"""Block-streaming extended simulation with checkpoint/restart.
+
+:class:`ExtendedStream` runs the extended NMJ → muscle pipeline in fixed-size
+time blocks with causal filters, carrying convolution tails, filter states,
+the channel-noise integrator, the RNG bit-generator state and running
+statistics between blocks. The complete state can be checkpointed at block
+boundaries; a run restored from a checkpoint continues with exactly the same
+arithmetic and therefore produces results bit-identical to an uninterrupted
+run.
+
+Unlike :func:`~neuromotorica.analysis.extended_validation.simulate_extended`,
+the stream uses the causal first-order low-pass instead of the zero-phase
+biquad, a running (rather than whole-trace) mean for glial modulation, and
+does not report ``jitter_ms``, which needs the full activation trace. It is
+therefore an approximation: the zero-phase filter's backward pass pre-charges
+the start of the trace, whereas the causal stream always ramps up from zero.
+On typical configurations the stream's ``cv_force`` comes out about 1.5x
+higher, ``snr`` about 10 % and ``mean_force_N`` about 5 % lower; the tests
+bound this drift. To resume ``simulate_extended`` itself, pass it
+``checkpoint_dir`` (:mod:`~neuromotorica.analysis.extended_checkpoint`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from typing import Any, Callable, Dict
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..models.extended_muscle import ExtendedMuscle, ExtendedMuscleParams
+from ..models.extended_nmj import ExtendedNMJParams
+from ..models.filters import lowpass_block
+from ..models.kernels import cached_normalized_kernel, convolve_block
+from ..profiles import extended_param_dicts
+from ..storage.checkpoint import load_checkpoint, save_checkpoint
+from ..storage.traces import TraceStore
+
+CHECKPOINT_VERSION = 1
+
+_STAT_KEYS = (
+    "act_sum", "act_sumsq", "act_count",
+    "force_sum", "force_sumsq", "force_max", "force_count",
+    "failures", "diff_count",
+)
+
+
+class ExtendedStream:
+    def __init__(
+        self,
+        seconds: float = 1.0,
+        dt: float = 0.001,
+        units: int = 64,
+        rate_hz: float = 10.0,
+        noise_sigma: float = 0.05,
+        glial_gain: float = 0.25,
+        topo_factor: float = 1.2,
+        failure_bias: float = 0.0,
+        seed: int = 7,
+        profile: str = "baseline",
+        block_s: float = 0.1,
+        fft_threshold: int | None = None,
+    ):
+        if seconds <= 0 or dt <= 0 or units <= 0 or block_s <= 0:
+            raise ValueError("seconds, dt, units and block_s must be > 0")
+        self.config: Dict[str, Any] = {
+            "seconds": seconds,
+            "dt": dt,
+            "units": units,
+            "rate_hz": rate_hz,
+            "noise_sigma": noise_sigma,
+            "glial_gain": glial_gain,
+            "topography_factor": topo_factor,
+            "failure_bias": failure_bias,
+            "seed": seed,
+            "profile": profile,
+            "block_s": block_s,
+            "fft_threshold": fft_threshold,
+        }
+        enh_dict, muscle_dict = extended_param_dicts(profile)
+        self.nmj_p = ExtendedNMJParams(
+            **{**enh_dict, "noise_sigma": noise_sigma, "glial_mod_gain": glial_gain, "failure_bias": failure_bias}
+        )
+        self.muscle = ExtendedMuscle(
+            ExtendedMuscleParams(**{**muscle_dict, "topography_factor": topo_factor}), dt, seconds, units=units
+        )
+        self.dt = dt
+        self.units = units
+        self.Tn = int(seconds / dt)
+        self.block_len = max(1, int(round(block_s / dt)))
+        self.fft_threshold = 2048 if fft_threshold is None else max(int(fft_threshold), 1)
+        p = self.nmj_p
+        self.ach_kernel = cached_normalized_kernel(0.5, dt, p.tau_rise, p.tau_decay)
+        self.hist_kernel = cached_normalized_kernel(0.5, dt, p.histamine_tau_rise, p.histamine_tau_decay)
+
+        self.rng = np.random.default_rng(seed)
+        self.t = 0
+        self.started = False
+        self.ach_tail = np.zeros((units, self.ach_kernel.size - 1))
+        self.hist_tail = np.zeros((units, self.hist_kernel.size - 1))
+        self.ach_state = np.zeros(units)
+        self.hist_state = np.zeros(units)
+        self.hist_sum = np.zeros(units)
+        self.noise_state = np.zeros(units)
+        self.prev_act = np.zeros(units)
+        self.stats: Dict[str, float] = {key: 0.0 for key in _STAT_KEYS}
+        self.stats["force_max"] = -np.inf
+
+    @property
+    def done(self) -> bool:
+        return self.t >= self.Tn
+
+    def step_block(self) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Advance one block and return its ``(activation, force)`` traces."""
+
+        if self.done:
+            raise RuntimeError("stream already finished")
+        B = min(self.block_len, self.Tn - self.t)
+        p, dt = self.nmj_p, self.dt
+        spikes = (self.rng.random((self.units, B)) < self.config["rate_hz"] * dt).astype(np.float64)
+
+        ach_conv, self.ach_tail = convolve_block(spikes, self.ach_kernel, self.ach_tail, self.fft_threshold)
+        hist_conv, self.hist_tail = convolve_block(spikes, self.hist_kernel, self.hist_tail, self.fft_threshold)
+        ach_act, ach_state = lowpass_block(
+            ach_conv * p.quantal_content * p.ach_ratio, dt, p.ach_decay, self.ach_state if self.started else None
+        )
+        hist_act, hist_state = lowpass_block(
+            hist_conv * p.quantal_content * p.histamine_ratio, dt, p.ach_decay * 1.5,
+            self.hist_state if self.started else None,
+        )
+        self.ach_state, self.hist_state = ach_state, hist_state
+
+        counts = self.t + np.arange(1, B + 1, dtype=np.float64)
+        running_hist = (self.hist_sum[:, None] + np.cumsum(hist_act, axis=1)) / counts
+        self.hist_sum = self.hist_sum + hist_act.sum(axis=1)
+        dual = ach_act + hist_act + 0.3 * ach_act * hist_act + p.glial_mod_gain * running_hist
+
+        if p.noise_sigma > 0:
+            noise = self.rng.normal(0.0, p.noise_sigma * np.sqrt(dt), size=(self.units, B))
+            noise = self.noise_state[:, None] + np.cumsum(noise, axis=1)
+            self.noise_state = noise[:, -1].copy()
+            dual = dual + noise
+        act = np.clip(dual, 0.0, 1.2)
+
+        prev = act[:, :1] if not self.started else self.prev_act[:, None]
+        diffs = np.diff(np.concatenate([prev, act], axis=1), axis=1)
+        if not self.started:
+            diffs = diffs[:, 1:]
+        self.prev_act = act[:, -1].copy()
+
+        F, _ = self.muscle.force(act)
+        st = self.stats
+        st["act_sum"] += float(np.sum(act))
+        st["act_sumsq"] += float(np.sum(act * act))
+        st["act_count"] += act.size
+        st["force_sum"] += float(np.sum(F))
+        st["force_sumsq"] += float(np.sum(F * F))
+        st["force_max"] = max(st["force_max"], float(np.max(F)))
+        st["force_count"] += F.size
+        st["failures"] += int(np.count_nonzero(diffs < -0.1))
+        st["diff_count"] += diffs.size
+
+        self.started = True
+        self.t += B
+        return act, F
+
+    def run(
+        self,
+        *,
+        checkpoint_path: str | os.PathLike | None = None,
+        checkpoint_every: int = 10,
+        on_block: Callable[[NDArray[np.float64], NDArray[np.float64]], None] | None = None,
+    ) -> dict:
+        """Run to completion, checkpointing every ``checkpoint_every`` blocks."""
+
+        if checkpoint_every <= 0:
+            raise ValueError("checkpoint_every must be > 0")
+        blocks = 0
+        while not self.done:
+            act, F = self.step_block()
+            blocks += 1
+            if on_block is not None:
+                on_block(act, F)
+            if checkpoint_path is not None and (blocks % checkpoint_every == 0 or self.done):
+                self.save_checkpoint(checkpoint_path)
+        return self.result()
+
+    def result(self) -> dict:
+        st = self.stats
+        act_mean = st["act_sum"] / max(st["act_count"], 1)
+        act_std = float(np.sqrt(max(st["act_sumsq"] / max(st["act_count"], 1) - act_mean**2, 0.0))) or 1e-9
+        mean_force = st["force_sum"] / max(st["force_count"], 1)
+        force_std = float(np.sqrt(max(st["force_sumsq"] / max(st["force_count"], 1) - mean_force**2, 0.0)))
+        failures = st["failures"] / st["diff_count"] if st["diff_count"] else 0.0
+        failure_rate = float(np.clip(failures + max(self.nmj_p.failure_bias, 0.0), 0.0, 1.0))
+        return {
+            "config": dict(self.config),
+            "progress": {"t_index": self.t, "Tn": self.Tn, "done": self.done},
+            "metrics": {
+                "failure_rate": round(failure_rate, 4),
+                "failure_probability": round(failure_rate, 4),
+                "snr": round(act_mean / act_std, 4),
+                "peak_force_N": st["force_max"] if self.t else 0.0,
+                "mean_force_N": mean_force,
+                "cv_force": round(force_std / max(mean_force, 1e-9), 4),
+            },
+        }
+
+    def save_checkpoint(self, path: str | os.PathLike) -> None:
+        arrays = {
+            "ach_tail": self.ach_tail,
+            "hist_tail": self.hist_tail,
+            "ach_state": self.ach_state,
+            "hist_state": self.hist_state,
+            "hist_sum": self.hist_sum,
+            "noise_state": self.noise_state,
+            "prev_act": self.prev_act,
+        }
+        meta = {
+            "version": CHECKPOINT_VERSION,
+            "config": self.config,
+            "t": self.t,
+            "started": self.started,
+            "rng": self.rng.bit_generator.state,
+            "stats": self.stats,
+        }
+        save_checkpoint(path, arrays, meta)
+
+    @classmethod
+    def from_checkpoint(cls, path: str | os.PathLike) -> "ExtendedStream":
+        arrays, meta = load_checkpoint(path)
+        if meta.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {meta.get('version')}")
+        cfg = dict(meta["config"])
+        stream = cls(**{("topo_factor" if k == "topography_factor" else k): v for k, v in cfg.items()})
+        for name, value in arrays.items():
+            setattr(stream, name, value)
+        stream.t = int(meta["t"])
+        stream.started = bool(meta["started"])
+        stream.rng.bit_generator.state = meta["rng"]
+        stream.stats = dict(meta["stats"])
+        return stream
+
+
+def simulate_extended_stream(
+    *,
+    checkpoint_path: str | os.PathLike | None = None,
+    checkpoint_every: int = 10,
+    resume: bool = True,
+    trace_dir: str | os.PathLike | None = None,
+    **config: Any,
+) -> dict:
+    """Run :class:`ExtendedStream`, resuming from ``checkpoint_path`` when it exists.
+
+    With ``trace_dir`` every block's activation and force is appended to a new
+    trace store as soon as it is produced; this is only supported for a run
+    that starts from the beginning.
+    """
+
+    stream = ExtendedStream(**config)
+    if checkpoint_path is not None and resume and pathlib.Path(checkpoint_path).exists():
+        restored = ExtendedStream.from_checkpoint(checkpoint_path)
+        if restored.config != stream.config:
+            raise ValueError(
+                "Checkpoint config does not match the requested run: "
+                + json.dumps(restored.config, sort_keys=True)
+            )
+        stream = restored
+    if trace_dir is None:
+        return stream.run(checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+    if stream.t:
+        raise ValueError("trace_dir cannot be combined with resuming from a checkpoint")
+
+    cfg = stream.config
+    with TraceStore.create(trace_dir, dt=stream.dt, config=cfg, profile=cfg["profile"], seed=cfg["seed"]) as writer:
+        def on_block(act: NDArray[np.float64], F: NDArray[np.float64]) -> None:
+            writer.append("extended.activation", act)
+            writer.append("extended.force", F)
+
+        result = stream.run(checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every, on_block=on_block)
+    result["traces"] = {"path": str(trace_dir), "names": list(writer.store.names())}
+    return result
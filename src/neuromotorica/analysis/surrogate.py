@@ -0,0 +1,186 @@
+"""Precomputed metric grid for instant ``scenario_sim``-style queries.
+
+:func:`build_surrogate` runs :func:`scenario_sim` offline over a ``rate_hz`` x
+``units`` grid for every profile and stores the metrics as a compressed
+``float32`` npz. :class:`MetricSurrogate` answers queries with vectorised
+multilinear interpolation and falls back to a real simulation outside the
+grid. Interpolation error is estimated at build time by simulating cell
+midpoints and is stored with the grid.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ..profiles import available_profiles
+from .validation import scenario_sim
+
+FORMAT_VERSION = 1
+AXES = ("rate_hz", "units")
+METRICS = (
+    "time_to_peak_ms",
+    "half_relaxation_time_ms",
+    "twitch_peak_N",
+    "poisson_force_N",
+    "snr",
+    "summation_efficiency",
+)
+DEFAULT_RATES = (5.0, 10.0, 20.0, 30.0, 40.0, 60.0)
+DEFAULT_UNITS = (16, 32, 64, 128)
+
+
+def _metrics(res: dict) -> list[float]:
+    tw = res["single_spike"]["twitch"]
+    return [
+        tw["time_to_peak_ms"],
+        tw["half_relaxation_time_ms"],
+        tw["peak_force_N"],
+        res["random_poisson"]["forces_N"]["optimized"],
+        res["random_poisson"]["snr"]["optimized"],
+        res["burst"]["summation_efficiency"],
+    ]
+
+
+def _simulate(profile: str, rate_hz: float, units: float, sim: dict) -> list[float]:
+    return _metrics(scenario_sim(rate_hz=float(rate_hz), units=int(round(units)), profile=profile, **sim))
+
+
+def multilinear(axes: Sequence[NDArray[np.float64]], values: NDArray, points: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Interpolate ``values[len(a0), ..., len(ad-1), M]`` at ``points[N, d]``; points must lie inside the grid."""
+    pts = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    lo_idx, frac = [], []
+    for k, axis in enumerate(axes):
+        i = np.clip(np.searchsorted(axis, pts[:, k], side="right") - 1, 0, axis.size - 2)
+        lo_idx.append(i)
+        frac.append((pts[:, k] - axis[i]) / (axis[i + 1] - axis[i]))
+    out = np.zeros((pts.shape[0], values.shape[-1]), dtype=np.float64)
+    for corner in range(1 << len(axes)):
+        weight = np.ones(pts.shape[0])
+        index = []
+        for k in range(len(axes)):
+            bit = (corner >> k) & 1
+            weight = weight * (frac[k] if bit else 1.0 - frac[k])
+            index.append(lo_idx[k] + bit)
+        out += weight[:, None] * values[tuple(index)]
+    return out
+
+
+def build_surrogate(
+    path: str | pathlib.Path,
+    profiles: Iterable[str] | None = None,
+    rates_hz: Sequence[float] = DEFAULT_RATES,
+    units: Sequence[int] = DEFAULT_UNITS,
+    *,
+    seconds: float = 1.0,
+    dt: float = 0.001,
+    seed: int = 42,
+    error_samples: int = 6,
+) -> pathlib.Path:
+    """Simulate the grid for each profile and write it to ``path`` (``.npz``).
+
+    ``error_samples`` random cell midpoints per profile are simulated to record
+    the maximum absolute and relative interpolation error per metric.
+    """
+    profiles = list(profiles) if profiles is not None else list(available_profiles())
+    axes = [np.asarray(sorted(set(map(float, rates_hz)))), np.asarray(sorted(set(map(float, units))))]
+    if any(a.size < 2 for a in axes):
+        raise ValueError("each grid axis needs at least two distinct values")
+    sim = {"seconds": seconds, "dt": dt, "seed": seed}
+    values = np.empty((len(profiles), axes[0].size, axes[1].size, len(METRICS)), dtype=np.float64)
+    abs_err = np.zeros((len(profiles), len(METRICS)))
+    rel_err = np.zeros((len(profiles), len(METRICS)))
+    rng = np.random.default_rng(seed)
+    for p, profile in enumerate(profiles):
+        for i, rate in enumerate(axes[0]):
+            for j, u in enumerate(axes[1]):
+                values[p, i, j] = _simulate(profile, rate, u, sim)
+        cells = [(i, j) for i in range(axes[0].size - 1) for j in range(axes[1].size - 1)]
+        for c in rng.permutation(len(cells))[:error_samples]:
+            i, j = cells[c]
+            mid = np.array([[(axes[0][i] + axes[0][i + 1]) / 2, round((axes[1][j] + axes[1][j + 1]) / 2)]])
+            exact = np.asarray(_simulate(profile, mid[0, 0], mid[0, 1], sim))
+            err = np.abs(multilinear(axes, values[p], mid)[0] - exact)
+            abs_err[p] = np.maximum(abs_err[p], err)
+            rel_err[p] = np.maximum(rel_err[p], err / np.maximum(np.abs(exact), 1e-9))
+    meta = {"version": FORMAT_VERSION, "sim": sim, "error_samples": error_samples,
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as fh:
+        np.savez_compressed(
+            fh, profiles=np.asarray(profiles), metrics=np.asarray(METRICS), rate_hz=axes[0], units=axes[1],
+            values=values.astype(np.float32), max_abs_error=abs_err.astype(np.float32),
+            max_rel_error=rel_err.astype(np.float32), meta=np.asarray(json.dumps(meta)),
+        )
+    return path
+
+
+class MetricSurrogate:
+    """Interpolated metric lookup over a grid written by :func:`build_surrogate`."""
+
+    def __init__(self, profiles, metrics, axes, values, max_abs_error, max_rel_error, meta: dict):
+        self.profiles = list(profiles)
+        self.metrics = list(metrics)
+        self.axes = [np.asarray(a, dtype=np.float64) for a in axes]
+        self.values = np.asarray(values, dtype=np.float64)
+        self.max_abs_error = np.asarray(max_abs_error, dtype=np.float64)
+        self.max_rel_error = np.asarray(max_rel_error, dtype=np.float64)
+        self.meta = meta
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "MetricSurrogate":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"unsupported surrogate version {meta.get('version')}")
+            return cls(data["profiles"].tolist(), data["metrics"].tolist(), [data[a] for a in AXES],
+                       data["values"], data["max_abs_error"], data["max_rel_error"], meta)
+
+    def _profile_index(self, profile: str) -> int:
+        try:
+            return self.profiles.index(profile)
+        except ValueError:
+            raise ValueError(f"profile '{profile}' not in surrogate grid") from None
+
+    def inside(self, rate_hz: ArrayLike, units: ArrayLike) -> NDArray[np.bool_]:
+        r, u = np.broadcast_arrays(np.asarray(rate_hz, dtype=np.float64), np.asarray(units, dtype=np.float64))
+        return ((r >= self.axes[0][0]) & (r <= self.axes[0][-1]) & (u >= self.axes[1][0]) & (u <= self.axes[1][-1]))
+
+    def query_batch(self, profile: str, rate_hz: ArrayLike, units: ArrayLike, *, fallback: bool = True) -> Dict[str, NDArray]:
+        """Metrics for many ``(rate_hz, units)`` points; ``source`` marks grid or simulated values.
+
+        A profile missing from the grid is simulated point by point when
+        ``fallback`` is set, like points outside the grid.
+        """
+        p = self._profile_index(profile) if not fallback or profile in self.profiles else None
+        r, u = np.broadcast_arrays(np.atleast_1d(np.asarray(rate_hz, dtype=np.float64)),
+                                   np.atleast_1d(np.asarray(units, dtype=np.float64)))
+        r, u = r.ravel(), u.ravel()
+        inside = self.inside(r, u) & (p is not None)
+        if not fallback and not inside.all():
+            raise ValueError("query outside the surrogate grid")
+        out = np.empty((r.size, len(self.metrics)))
+        if inside.any():
+            out[inside] = multilinear(self.axes, self.values[p], np.stack([r[inside], u[inside]], axis=1))
+        for idx in np.flatnonzero(~inside):
+            out[idx] = _simulate(profile, r[idx], u[idx], self.meta["sim"])
+        result = {m: out[:, k] for k, m in enumerate(self.metrics)}
+        result["source"] = np.where(inside, "grid", "sim")
+        return result
+
+    def query(self, profile: str, rate_hz: float, units: int, *, fallback: bool = True) -> dict:
+        """Metrics for one point, with the grid's recorded interpolation error bounds."""
+        res = self.query_batch(profile, rate_hz, units, fallback=fallback)
+        source = str(res["source"][0])
+        return {
+            **{m: float(res[m][0]) for m in self.metrics},
+            "source": source,
+            "max_rel_error": (dict(zip(self.metrics, self.max_rel_error[self._profile_index(profile)].tolist()))
+                              if source == "grid" else None),
+        }
@@ -0,0 +1,35 @@
+"""``neuromotorica surrogate-build``: precompute the interpolated metric grid offline."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+from typing import List, Optional
+
+import typer
+
+from ..profiles import ProfileNotFoundError
+from .surrogate import DEFAULT_RATES, DEFAULT_UNITS, MetricSurrogate, build_surrogate
+
+
+def main(
+    out: pathlib.Path = typer.Option(pathlib.Path("data/surrogate/metrics.npz"), "--out"),
+    profile: Optional[List[str]] = typer.Option(None, "--profile", "-p", help="Default: all bundled profiles"),
+    rate: List[float] = typer.Option(list(DEFAULT_RATES), "--rate"),
+    units: List[int] = typer.Option(list(DEFAULT_UNITS), "--units"),
+    seconds: float = typer.Option(1.0, "--seconds"),
+    dt: float = typer.Option(1e-3, "--dt"),
+    seed: int = typer.Option(42, "--seed"),
+    error_samples: int = typer.Option(6, "--error-samples"),
+):
+    """Build the metric surrogate grid offline and print its interpolation error bounds."""
+    try:
+        path = build_surrogate(out, profile or None, rate, units, seconds=seconds, dt=dt, seed=seed,
+                               error_samples=error_samples)
+    except (ProfileNotFoundError, ValueError) as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=2)
+    sur = MetricSurrogate.load(path)
+    errors = {p: dict(zip(sur.metrics, [round(v, 4) for v in sur.max_rel_error[i].tolist()]))
+              for i, p in enumerate(sur.profiles)}
+    typer.echo(json.dumps({"path": str(path), "max_rel_error": errors}, ensure_ascii=False))
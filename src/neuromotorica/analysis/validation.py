@@ -1,5 +1,7 @@
 from __future__ import annotations
-import time, json, pathlib
+import json, pathlib
+from contextlib import nullcontext
+from time import perf_counter
 import numpy as np
 from numpy.typing import NDArray
 from ..models.nmj import NMJ
@@ -7,6 +9,9 @@ from ..models.enhanced_nmj import EnhancedNMJ, OptimizedEnhancedNMJ
 from ..models.muscle import Muscle
 from ..profiles import build_profile_params
 from ..models.pool import Pool
+from ..models.multirate import decimate
+from ..storage.traces import TraceStore
+from ..common.stages import StageRecorder
 
 def twitch_metrics(force: NDArray[np.float64], dt: float, window_s: float = 0.3) -> dict:
     Tn = len(force)
@@ -37,6 +42,52 @@ def twitch_metrics(force: NDArray[np.float64], dt: float, window_s: float = 0.3)
     return {"time_to_peak_ms": round(ttp, 2), "half_relaxation_time_ms": round(half_rel, 2),
             "peak_force_N": round(peak, 3), "contraction_velocity_Ns": round(contr_vel, 3)}
 
+def twitch_metrics_batch(
+    forces: NDArray[np.float64],
+    dt: float,
+    window_s: float = 0.3,
+    chunk_rows: int = 4096,
+) -> dict[str, NDArray[np.float64]]:
+    """Row-wise :func:`twitch_metrics` over a ``[batch, Tn]`` force array.
+
+    Returns unrounded ``[batch]`` arrays under the same keys. Rows are processed
+    in chunks of ``chunk_rows`` to bound the ``[chunk, window]`` temporaries.
+    """
+    arr = np.asarray(forces, dtype=np.float64)
+    if arr.ndim != 2:
+        raise ValueError("forces must be [batch, Tn]")
+    B, Tn = arr.shape
+    win = min(Tn, int(window_s / dt))
+    if win < 1:
+        raise ValueError("window must cover at least one sample")
+    keys = ("time_to_peak_ms", "half_relaxation_time_ms", "peak_force_N", "contraction_velocity_Ns")
+    out = {k: np.empty(B, dtype=np.float64) for k in keys}
+    cols = np.arange(win)
+    for start in range(0, B, max(int(chunk_rows), 1)):
+        seg = arr[start : start + chunk_rows, :win]
+        rows = np.arange(seg.shape[0])
+        baseline = seg[:, 0]
+        peak = np.max(seg, axis=1)
+        slope_idx = np.argmax(np.diff(seg, axis=1), axis=1) if win > 1 else np.zeros(seg.shape[0], dtype=np.intp)
+        rise_threshold = baseline + 0.1 * (peak - baseline)
+        above = seg >= rise_threshold[:, None]
+        first = np.argmax(above, axis=1)
+        threshold_idx = np.where((rise_threshold > baseline) & above[rows, first], first, 0)
+        onset_idx = np.maximum(slope_idx, threshold_idx)
+        ttp_idx = np.argmax(seg, axis=1)
+        ttp = np.maximum(ttp_idx - onset_idx, 0) * dt * 1000.0
+        # First sample at or after the peak closest to half the peak force.
+        dist = np.abs(seg - (peak / 2.0)[:, None])
+        dist[cols[None, :] < ttp_idx[:, None]] = np.inf
+        hr_idx = np.argmin(dist, axis=1)
+        half_rel = np.where(win - ttp_idx > 1, (hr_idx - ttp_idx) * dt * 1000.0, 0.0)
+        sl = slice(start, start + seg.shape[0])
+        out["time_to_peak_ms"][sl] = ttp
+        out["half_relaxation_time_ms"][sl] = half_rel
+        out["peak_force_N"][sl] = peak
+        out["contraction_velocity_Ns"][sl] = peak / np.maximum(ttp / 1000.0, 1e-9)
+    return out
+
 def scenario_sim(
     seconds: float = 1.0,
     dt: float = 0.001,
@@ -45,7 +96,34 @@ def scenario_sim(
     seed: int = 42,
     profile: str = "baseline",
     fft_threshold: int | None = None,
+    trace_dir: str | None = None,
+    force_decimation: int = 1,
+    instrument: bool = False,
+    trace_memory: bool = True,
 ) -> dict:
+    if force_decimation < 1:
+        raise ValueError("force_decimation must be >= 1")
+    recorder = StageRecorder(trace_memory=trace_memory) if instrument else None
+    with recorder.activate() if recorder is not None else nullcontext():
+        result = _scenario_sim(seconds, dt, units, rate_hz, seed, profile, fft_threshold, trace_dir,
+                               force_decimation)
+    if recorder is not None:
+        result["runtime"]["stages"] = recorder.summary()
+    return result
+
+
+def _scenario_sim(
+    seconds: float,
+    dt: float,
+    units: int,
+    rate_hz: float,
+    seed: int,
+    profile: str,
+    fft_threshold: int | None,
+    trace_dir: str | None,
+    force_decimation: int,
+) -> dict:
+    t_start = perf_counter()
     pool = Pool(units=units, dt=dt, T=seconds)
     nmjp, enhp, mp, meta = build_profile_params(profile)
     nmj = NMJ(nmjp, dt, seconds, fft_threshold=fft_threshold)
@@ -57,21 +135,56 @@ def scenario_sim(
     burst = pool.burst(int(0.2/dt), int(0.3/dt), units=units)
     rand = pool.poisson_spikes(rate_hz=rate_hz, seed=seed)
 
+    # Muscle force and all downstream metrics run at dt * force_decimation.
+    force_dt = dt * force_decimation
+
+    config = {
+        "seconds": seconds,
+        "dt": dt,
+        "units": units,
+        "rate_hz": rate_hz,
+        "profile": profile,
+        "profile_description": meta.get("description", ""),
+        "fft_threshold": fft_threshold,
+        "force_decimation": force_decimation,
+    }
+
     def run(spikes: NDArray[np.float64]):
         base = nmj.calcium_activation(spikes)
         enh = enm.dual_transmission_activation(spikes)
         opt = onmj.physiologically_realistic_activation(spikes)
+        if force_decimation > 1:
+            base, enh, opt = (decimate(a, force_decimation) for a in (base, enh, opt))
         Fb, _ = muscle.force(base)
         Fe, _ = muscle.force(enh)
         Fo, _ = muscle.force(opt)
         return (base, enh, opt, Fb, Fe, Fo)
 
-    t0 = time.time()
-    b0, e0, o0, Fb0, Fe0, Fo0 = run(single)
-    single_runtime = time.time() - t0
+    # The store is opened up front and each scenario is appended as soon as it
+    # finishes, so an interrupted run leaves the completed scenarios on disk.
+    writer = (TraceStore.create(trace_dir, dt=force_dt, config=config, profile=profile, seed=seed)
+              if trace_dir is not None else None)
+
+    def record(scen: str, outputs: tuple) -> None:
+        if writer is None:
+            return
+        ab, ae, ao, fb, fe, fo = outputs
+        for model, act, force in (("baseline", ab, fb), ("enhanced", ae, fe), ("optimized", ao, fo)):
+            writer.append(f"{scen}.{model}.activation", act)
+            writer.append(f"{scen}.{model}.force", force)
 
-    b1, e1, o1, Fb1, Fe1, Fo1 = run(rand)
-    b2, e2, o2, Fb2, Fe2, Fo2 = run(burst)
+    with writer if writer is not None else nullcontext():
+        t0 = perf_counter()
+        single_out = run(single)
+        single_runtime = perf_counter() - t0
+        record("single_spike", single_out)
+        rand_out = run(rand)
+        record("random_poisson", rand_out)
+        burst_out = run(burst)
+        record("burst", burst_out)
+    b0, e0, o0, Fb0, Fe0, Fo0 = single_out
+    b1, e1, o1, Fb1, Fe1, Fo1 = rand_out
+    b2, e2, o2, Fb2, Fe2, Fo2 = burst_out
 
     def snr(act: NDArray[np.float64]) -> float:
         m = float(np.mean(act))
@@ -80,24 +193,56 @@ def scenario_sim(
 
     fusion_freq = 1.0 / (mp.tau_act + mp.tau_deact)
 
-    return {
-        "config": {
-            "seconds": seconds,
-            "dt": dt,
-            "units": units,
-            "rate_hz": rate_hz,
-            "profile": profile,
-            "profile_description": meta.get("description", ""),
-            "fft_threshold": fft_threshold,
-        },
-        "runtime": {"single_spike_sec": round(single_runtime, 4)},
-        "single_spike": {"twitch": twitch_metrics(Fo0, dt), "fusion_frequency_Hz": round(fusion_freq, 3),
+    runtime = {"single_spike_sec": round(single_runtime, 4), "total_sec": round(perf_counter() - t_start, 4)}
+    traces = {"path": str(trace_dir), "names": list(writer.store.names())} if writer is not None else None
+
+    result = {
+        "config": config,
+        "runtime": runtime,
+        "single_spike": {"twitch": twitch_metrics(Fo0, force_dt), "fusion_frequency_Hz": round(fusion_freq, 3),
                          "forces_N": {"baseline": float(np.max(Fb0)), "enhanced": float(np.max(Fe0)), "optimized": float(np.max(Fo0))}},
         "random_poisson": {"forces_N": {"baseline": float(np.max(Fb1)), "enhanced": float(np.max(Fe1)), "optimized": float(np.max(Fo1))},
                            "snr": {"baseline": round(snr(b1), 4), "enhanced": round(snr(e1), 4), "optimized": round(snr(o1), 4)}},
         "burst": {"forces_N": {"baseline": float(np.max(Fb2)), "enhanced": float(np.max(Fe2)), "optimized": float(np.max(Fo2))},
                   "summation_efficiency": round(float(np.mean(Fo2)) / max(float(np.mean(Fb2)), 1e-9), 3)},
     }
+    if traces is not None:
+        result["traces"] = traces
+    return result
+
+
+def twitch_metrics_from_store(
+    store: TraceStore | str,
+    name: str = "single_spike.optimized.force",
+    window_s: float = 0.3,
+) -> dict:
+    """Compute :func:`twitch_metrics` reading only the twitch window from a trace store."""
+    if not isinstance(store, TraceStore):
+        store = TraceStore.open(store)
+    trace = store[name]
+    win = min(trace.length, int(window_s / store.dt))
+    return twitch_metrics(trace.read(0, win), store.dt, window_s=window_s)
+
+
+def result_from_store(store: TraceStore | str) -> dict:
+    """Rebuild the ``single_spike`` section of a :func:`scenario_sim` result from stored traces."""
+    if not isinstance(store, TraceStore):
+        store = TraceStore.open(store)
+    _, _, mp, _ = build_profile_params(store.profile or "baseline")
+    forces = {}
+    for model in ("baseline", "enhanced", "optimized"):
+        peak = 0.0
+        for _, block in store[f"single_spike.{model}.force"].iter_chunks():
+            peak = max(peak, float(np.max(block)))
+        forces[model] = peak
+    return {
+        "config": dict(store.config),
+        "single_spike": {
+            "twitch": twitch_metrics_from_store(store),
+            "fusion_frequency_Hz": round(1.0 / (mp.tau_act + mp.tau_deact), 3),
+            "forces_N": forces,
+        },
+    }
 
 def validate_against_benchmarks(result: dict, bench_path: str) -> dict:
     data = json.loads(pathlib.Path(bench_path).read_text(encoding="utf-8"))
@@ -108,3 +253,32 @@ def validate_against_benchmarks(result: dict, bench_path: str) -> dict:
     ff = result["single_spike"]["fusion_frequency_Hz"]
     ff_ok = data["fusion_frequency_Hz"][0] <= ff <= data["fusion_frequency_Hz"][1]
     return {"time_to_peak_in_range": ttp_ok, "half_relax_in_range": hr_ok, "fusion_freq_in_range": ff_ok}
+
+
+def validate_against_benchmarks_batch(
+    twitch: dict[str, NDArray[np.float64]],
+    bench_path: str,
+    fusion_frequency_Hz: float | NDArray[np.float64] | None = None,
+) -> dict:
+    """Range checks for :func:`twitch_metrics_batch` output.
+
+    Returns boolean ``[batch]`` arrays under the keys of
+    :func:`validate_against_benchmarks`, plus ``all_in_range`` and per-check
+    ``pass_rate`` fractions. The fusion check is skipped when
+    ``fusion_frequency_Hz`` is not given.
+    """
+    data = json.loads(pathlib.Path(bench_path).read_text(encoding="utf-8"))
+    ttp = np.asarray(twitch["time_to_peak_ms"], dtype=np.float64)
+    hr = np.asarray(twitch["half_relaxation_time_ms"], dtype=np.float64)
+    lo, hi = data["twitch"]["time_to_peak_ms"]
+    checks = {"time_to_peak_in_range": (ttp >= lo) & (ttp <= hi)}
+    lo, hi = data["twitch"]["half_relaxation_time_ms"]
+    checks["half_relax_in_range"] = (hr >= lo) & (hr <= hi)
+    if fusion_frequency_Hz is not None:
+        ff = np.broadcast_to(np.asarray(fusion_frequency_Hz, dtype=np.float64), ttp.shape)
+        lo, hi = data["fusion_frequency_Hz"]
+        checks["fusion_freq_in_range"] = (ff >= lo) & (ff <= hi)
+    all_ok = np.logical_and.reduce(list(checks.values()))
+    rates = {k: float(np.mean(v)) if v.size else 0.0 for k, v in checks.items()}
+    rates["all_in_range"] = float(np.mean(all_ok)) if all_ok.size else 0.0
+    return {**checks, "all_in_range": all_ok, "pass_rate": rates}
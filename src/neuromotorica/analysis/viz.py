@@ -8,7 +8,9 @@ from ..models.pool import Pool
 from ..models.nmj import NMJ
 from ..models.enhanced_nmj import EnhancedNMJ, OptimizedEnhancedNMJ
 from ..models.muscle import Muscle
+from ..models.multirate import decimate, upsample
 from ..profiles import build_profile_params
+from ..storage.traces import TraceStore
 
 def plot_scenarios(
     outdir: str = "outputs",
@@ -19,6 +21,7 @@ def plot_scenarios(
     seed: int = 42,
     profile: str = "baseline",
     fft_threshold: int | None = None,
+    force_decimation: int = 1,
 ) -> dict:
     od = pathlib.Path(outdir); od.mkdir(parents=True, exist_ok=True)
     pool = Pool(units=units, dt=dt, T=seconds)
@@ -37,10 +40,16 @@ def plot_scenarios(
         a0 = nmj.calcium_activation(spikes)
         a1 = enm.dual_transmission_activation(spikes)
         a2 = onmj.physiologically_realistic_activation(spikes)
-        Fb, _ = muscle.force(a0)
-        Fe, _ = muscle.force(a1)
-        Fo, _ = muscle.force(a2)
-        return (a0, a1, a2, Fb, Fe, Fo)
+        forces = []
+        for a in (a0, a1, a2):
+            if force_decimation > 1:
+                # Force runs at the decimated rate and is upsampled back onto t for plotting.
+                F, _ = muscle.force(decimate(a, force_decimation))
+                F = upsample(F, force_decimation, a.shape[1])
+            else:
+                F, _ = muscle.force(a)
+            forces.append(F)
+        return (a0, a1, a2, *forces)
 
     a0s, a1s, a2s, Fb0, Fe0, Fo0 = actF(spikes_single)
     a0r, a1r, a2r, Fb1, Fe1, Fo1 = actF(spikes_rand)
@@ -65,3 +74,41 @@ def plot_scenarios(
     files["poisson_force.png"] = save_plot(t, {"Base": Fb1, "Enhanced": Fe1, "Optimized": Fo1}, "poisson_force.png", "t, s", "force (N)")
     files["burst_force.png"] = save_plot(t, {"Base": Fb2, "Enhanced": Fe2, "Optimized": Fo2}, "burst_force.png", "t, s", "force (N)")
     return files
+
+
+def plot_trace_store(
+    store_path: str,
+    outdir: str = "outputs",
+    names: list[str] | None = None,
+    start_s: float = 0.0,
+    stop_s: float | None = None,
+    max_points: int = 5000,
+) -> dict:
+    """Plot traces from a :class:`TraceStore` without recomputing the simulation.
+
+    Only the requested time window is read, decimated to at most ``max_points``
+    samples; multi-unit traces are averaged over units.
+    """
+    od = pathlib.Path(outdir); od.mkdir(parents=True, exist_ok=True)
+    store = TraceStore.open(store_path)
+    dt = store.dt
+    files = {}
+    for name in names or store.names():
+        trace = store[name]
+        start = int(start_s / dt)
+        stop = trace.length if stop_s is None else min(trace.length, int(stop_s / dt))
+        step = max(1, (stop - start) // max(max_points, 1))
+        y = trace.read(start, stop, step)
+        if y.ndim > 1:
+            y = y.reshape(-1, y.shape[-1]).mean(axis=0)
+        t = store.time_axis(name, start, stop, step)
+        plt.figure()
+        plt.plot(t, y, label=name)
+        plt.xlabel("t, s"); plt.ylabel("force (N)" if name.endswith("force") else "activation"); plt.legend()
+        plt.tight_layout()
+        fname = f"{name}.png"
+        p = od / fname
+        plt.savefig(p)
+        plt.close()
+        files[fname] = str(p)
+    return files
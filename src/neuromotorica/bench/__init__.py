@@ -5,13 +5,16 @@ from typing import List, Dict, Any, Optional
 import numpy as np
 import typer
 from .runner import BenchRunner, BenchScenario, load_thresholds, Heatmap
+from .scaling import compare_scaling, scaling_report
+from .history import DEFAULT_PATH as HISTORY_PATH, BenchHistory, host_fingerprint
+from .frontier import FRONTIER_GRID, REFERENCE, run_frontier
 from .report import render_html
 
 app = typer.Typer(help="Neuromotorica benchmark suite")
 
 @app.command("run")
 def bench(
-    scenario: List[str] = typer.Option(["thompson","linucb","egreedy"], "--scenario","-s"),
+    scenario: List[str] = typer.Option(["thompson","linucb","egreedy"], "--scenario","-s", help="Scenario name, base name (e.g. convolve_traces), family (sim, bandits) or all"),
     data_sizes: List[int] = typer.Option([1000,10000], "--n","-n"),
     profile: str = typer.Option("standard", "--profile","-p"),
     seed: int = typer.Option(42, "--seed"),
@@ -21,6 +24,17 @@ def bench(
     baseline: Optional[pathlib.Path] = typer.Option(None, "--baseline"),
     thresholds_path: pathlib.Path = typer.Option(pathlib.Path("benchmarks/thresholds.yml"), "--thresholds"),
     fail_on_regress: bool = typer.Option(True, "--fail-on-regress/--no-fail-on-regress"),
+    warmup: int = typer.Option(1, "--warmup", help="Untimed calls before the timing pass"),
+    min_time: float = typer.Option(0.0, "--min-time", help="Keep repeating until this many seconds were timed"),
+    max_repeats: int = typer.Option(1000, "--max-repeats"),
+    split_memory: bool = typer.Option(True, "--split-memory/--combined", help="Separate timing and tracemalloc passes"),
+    gc_off: bool = typer.Option(True, "--no-gc/--gc", help="Pause the cyclic GC while timing"),
+    stat: str = typer.Option("mannwhitney", "--stat", help="Baseline comparison: mannwhitney, bootstrap or delta"),
+    alpha: float = typer.Option(0.05, "--alpha"),
+    threads: List[int] = typer.Option([1], "--threads", "-t", help="Thread counts for parallel scenarios"),
+    history_path: pathlib.Path = typer.Option(HISTORY_PATH, "--history", help="SQLite run history"),
+    record: bool = typer.Option(True, "--record/--no-record", help="Append this run to the history"),
+    rolling: int = typer.Option(0, "--rolling-baseline", help="Compare against the median of the last N runs on this host"),
 ):
     np.random.seed(seed)
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
@@ -29,23 +43,148 @@ def bench(
     runner = BenchRunner(profile=profile, seed=seed)
     thresholds = load_thresholds(thresholds_path)
     rows: List[Dict[str, Any]] = []
-    for sc in scenario:
+    try:
+        selected = runner.expand(scenario)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--scenario")
+    for sc in selected:
         scen = runner.get_scenario(sc)
         for n in data_sizes:
-            row = runner.measure(scen, n=n, repeats=repeats)
-            row.update({"scenario": sc, "n": n, "profile": profile, "seed": seed, "timestamp": ts})
-            rows.append(row)
-            Heatmap.plot(row["latency_samples"], run_dir / f"{sc}_{n}_heatmap.png", f"{sc} n={n}")
+            for k in (threads if scen.parallel else [1]):
+                row = runner.measure(scen, n=n, repeats=repeats, warmup=warmup, min_time_s=min_time,
+                                     max_repeats=max_repeats, split_memory=split_memory, disable_gc=gc_off, threads=k)
+                row.update({"scenario": sc, "family": scen.family, "n": n, "profile": profile, "seed": seed, "timestamp": ts})
+                rows.append(row)
+                suffix = "" if k == 1 else f"_t{k}"
+                Heatmap.plot(row["latency_samples"], run_dir / f"{sc}_{n}{suffix}_heatmap.png", f"{sc} n={n} threads={k}")
     if "json" in fmt:
         (run_dir/"results.json").write_text(json.dumps(rows, indent=2), encoding="utf-8")
     if "csv" in fmt:
         import csv
         with (run_dir/"results.csv").open("w", newline="") as f:
             w = csv.DictWriter(f, fieldnames=sorted(rows[0].keys())); w.writeheader(); w.writerows(rows)
-    cmp_ = runner.compare_with_baseline(rows, baseline, thresholds)
+    history = BenchHistory(history_path) if (record or rolling > 0 or "html" in fmt) else None
+    keys = sorted({(r["scenario"], r["n"], r["profile"], r.get("threads", 1)) for r in rows})
+    base_rows = history.rolling_baseline(keys, last=rolling) if history and rolling > 0 else None
+    try:
+        cmp_ = runner.compare_with_baseline(rows, baseline, thresholds, method=stat, alpha=alpha, baseline_rows=base_rows)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--stat")
+    scaling = scaling_report(rows)
+    cmp_["scaling"] = scaling
+    cmp_["checks"].extend(compare_scaling(scaling, scaling_report(base_rows if base_rows is not None else runner.load_baseline(baseline)),
+                                          lambda sc: runner.thresholds_for(sc, thresholds)))
     (run_dir/"compare.json").write_text(json.dumps(cmp_, indent=2), encoding="utf-8")
+    if history and record:
+        history.record(rows)
     if "html" in fmt:
-        (run_dir/"report.html").write_text(render_html(rows, cmp_, f"Benchmark {ts}", run_dir), encoding="utf-8")
+        trends = {f"{sc} n={n} t={k}": [t["latency_ms_avg"] for t in history.trend(sc, n=n, profile=p, threads=k, host=host_fingerprint())]
+                  for sc, n, p, k in keys} if history else None
+        (run_dir/"report.html").write_text(render_html(rows, cmp_, f"Benchmark {ts}", run_dir, trends=trends), encoding="utf-8")
+    if history:
+        history.close()
     fails = [c for c in cmp_["checks"] if c["status"] == "fail"]
     if fail_on_regress and fails:
         raise typer.Exit(code=2)
+
+
+@app.command("trend")
+def trend_cmd(
+    scenario: str = typer.Option(..., "--scenario", "-s"),
+    n: Optional[int] = typer.Option(None, "--n", "-n"),
+    profile: Optional[str] = typer.Option(None, "--profile", "-p"),
+    threads: int = typer.Option(1, "--threads", "-t"),
+    metric: str = typer.Option("latency_ms_avg", "--metric"),
+    last: int = typer.Option(20, "--last"),
+    all_hosts: bool = typer.Option(False, "--all-hosts", help="Include runs from other machines"),
+    history_path: pathlib.Path = typer.Option(HISTORY_PATH, "--history"),
+):
+    """Print the recent history of one scenario with drift versus the oldest shown run."""
+    history = BenchHistory(history_path)
+    points = history.trend(scenario, n=n, profile=profile, threads=threads,
+                           host=None if all_hosts else host_fingerprint(), last=last)
+    history.close()
+    if not points:
+        typer.echo("no runs recorded"); raise typer.Exit(code=1)
+    first = points[0][metric] or 0.0
+    for pt in points:
+        drift = 0.0 if not first else (pt[metric] - first) / first * 100.0
+        typer.echo(f"{pt['ts']}  {pt['git_rev']:<12}  n={pt['n']:<8} {metric}={pt[metric]:.4f}  ({drift:+.1f}%)")
+
+@app.command("baseline")
+def baseline_cmd(
+    scenario: List[str] = typer.Option(["thompson","linucb","egreedy"], "--scenario", "-s"),
+    data_sizes: List[int] = typer.Option([1000,10000], "--n", "-n"),
+    profile: str = typer.Option("standard", "--profile", "-p"),
+    threads: List[int] = typer.Option([1], "--threads", "-t"),
+    last: int = typer.Option(5, "--last", help="Median over the last N runs on this host"),
+    out: pathlib.Path = typer.Option(pathlib.Path("benchmarks/baseline/rolling.json"), "--out"),
+    history_path: pathlib.Path = typer.Option(HISTORY_PATH, "--history"),
+):
+    """Export a rolling baseline from the history, usable with ``bench run --baseline``."""
+    runner = BenchRunner(profile=profile, seed=0)
+    try:
+        selected = runner.expand(scenario)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--scenario")
+    history = BenchHistory(history_path)
+    rows = history.rolling_baseline([(sc, n, profile, k) for sc in selected for n in data_sizes for k in threads], last=last)
+    history.close()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    typer.echo(f"{len(rows)} baseline rows -> {out}")
+
+@app.command("frontier")
+def frontier_cmd(
+    profile: List[str] = typer.Option(["baseline"], "--profile", "-p", help="Simulation profiles"),
+    model: List[str] = typer.Option(["scenario_sim", "simulate_extended"], "--model", "-m"),
+    seconds: float = typer.Option(1.0, "--seconds"),
+    units: int = typer.Option(32, "--units"),
+    rate: float = typer.Option(10.0, "--rate"),
+    seed: int = typer.Option(7, "--seed"),
+    dt: List[float] = typer.Option(list(FRONTIER_GRID["dt"]), "--dt"),
+    fft_threshold: List[int] = typer.Option(list(FRONTIER_GRID["fft_threshold"]), "--fft-threshold"),
+    decimation: List[int] = typer.Option(list(FRONTIER_GRID["force_decimation"]), "--decimation"),
+    ref_dt: float = typer.Option(REFERENCE["dt"], "--ref-dt"),
+    repeats: int = typer.Option(1, "--repeats", "-r"),
+    out: pathlib.Path = typer.Option(pathlib.Path("outputs/frontier.json"), "--out"),
+):
+    """Measure runtime/memory versus error of fast-mode settings and print the Pareto frontier."""
+    grid = {"dt": dt, "fft_threshold": fft_threshold, "force_decimation": decimation}
+    try:
+        res = run_frontier(profile, seconds=seconds, units=units, rate_hz=rate, seed=seed, grid=grid,
+                           reference={"dt": ref_dt}, models=model, repeats=repeats)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc))
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(res, indent=2), encoding="utf-8")
+    for prof, by_model in res["frontier"].items():
+        for mdl, front in by_model.items():
+            typer.echo(f"[{prof}] {mdl}")
+            for p in front:
+                cfg = " ".join(f"{k}={v}" for k, v in p["config"].items())
+                typer.echo(f"  {p['runtime_ms']:9.1f} ms  x{p['speedup']:.2f}  err {p['error']*100:6.2f}%  {cfg}")
+    typer.echo(str(out))
+
+@app.command("loadtest")
+def loadtest_cmd(
+    rate: float = typer.Option(50.0, "--rate", help="Baseline requests per second"),
+    multiplier: List[float] = typer.Option([1.0, 5.0], "--multiplier", "-x", help="Offered load as multiples of --rate"),
+    duration: float = typer.Option(5.0, "--duration"),
+    users: int = typer.Option(200, "--users"),
+    url: Optional[str] = typer.Option(None, "--url", help="Load a running server instead of the in-process app"),
+    seed: bool = typer.Option(True, "--seed/--no-seed", help="Upload synthetic outcomes before measuring"),
+    max_flatness: Optional[float] = typer.Option(None, "--max-flatness", help="Fail if p99(max)/p99(min) exceeds this"),
+    out: pathlib.Path = typer.Option(pathlib.Path("outputs/policy_loadtest.json"), "--out"),
+):
+    """Open-loop load test of GET /policy/best; reports p50/p95/p99 per offered rate."""
+    from .loadtest import run_load
+    res = run_load([rate * m for m in multiplier], duration_s=duration, users=users, url=url, seed=seed)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(res, indent=2), encoding="utf-8")
+    for r in res["rows"]:
+        typer.echo(f"{r['rate']:8.1f} rps  p50 {r['p50_ms']:7.2f}  p95 {r['p95_ms']:7.2f}  p99 {r['p99_ms']:7.2f} ms"
+                   f"  errors {r['errors']}")
+    typer.echo(f"p99 flatness: {res['flatness']:.2f}" if res["flatness"] else "p99 flatness: n/a")
+    if max_flatness is not None and (res["flatness"] or 0) > max_flatness:
+        raise typer.Exit(code=1)
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Accuracy-versus-speed frontier for the simulation fast-mode levers.
+
+Each configuration of ``dt``, ``fft_threshold`` and ``force_decimation`` is run
+against a fine-``dt`` float64 reference of :func:`scenario_sim` and
+:func:`simulate_extended`. Errors are relative to the reference per metric; the
+scalar ``error`` is their maximum. Stochastic metrics (Poisson force, SNR,
+jitter) also carry spike-sampling differences, because the spike train is
+drawn on each configuration's own ``dt`` grid.
+"""
+from __future__ import annotations
+import gc, itertools, time, tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+FRONTIER_GRID = {"dt": (1e-3, 5e-4), "fft_threshold": (64, 2048, 1 << 20), "force_decimation": (1, 4)}
+REFERENCE = {"dt": 1e-4, "fft_threshold": 2048, "force_decimation": 1}
+
+def _scenario_metrics(res: Dict[str, Any]) -> Dict[str, float]:
+    tw = res["single_spike"]["twitch"]
+    return {
+        "time_to_peak_ms": tw["time_to_peak_ms"],
+        "half_relaxation_time_ms": tw["half_relaxation_time_ms"],
+        "twitch_peak_N": tw["peak_force_N"],
+        "poisson_force_N": res["random_poisson"]["forces_N"]["optimized"],
+        "snr": res["random_poisson"]["snr"]["optimized"],
+    }
+
+def _extended_metrics(res: Dict[str, Any]) -> Dict[str, float]:
+    m = res["metrics"]
+    return {k: m[k] for k in ("peak_force_N", "mean_force_N", "snr", "jitter_ms")}
+
+def _models() -> Dict[str, tuple]:
+    from ..analysis.extended_validation import simulate_extended
+    from ..analysis.validation import scenario_sim
+    return {"scenario_sim": (scenario_sim, _scenario_metrics), "simulate_extended": (simulate_extended, _extended_metrics)}
+
+def _run(fn: Callable[..., Dict[str, Any]], kwargs: Dict[str, Any], repeats: int) -> tuple:
+    times = []
+    for _ in range(max(repeats, 1)):
+        gc.collect()
+        t0 = time.perf_counter(); res = fn(**kwargs); times.append((time.perf_counter() - t0) * 1000.0)
+    tracemalloc.start()
+    try:
+        fn(**kwargs)
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+    return res, min(times), peak
+
+def relative_errors(values: Dict[str, float], reference: Dict[str, float]) -> Dict[str, float]:
+    return {k: abs(values[k] - ref) / abs(ref) if ref else abs(values[k]) for k, ref in reference.items()}
+
+def pareto_front(points: Sequence[Dict[str, Any]], x: str = "runtime_ms", y: str = "error") -> List[Dict[str, Any]]:
+    """Points not dominated in (``x``, ``y``), both minimised, sorted by ``x``."""
+    front: List[Dict[str, Any]] = []
+    for p in sorted(points, key=lambda p: (p[x], p[y])):
+        if not front or p[y] < front[-1][y]: front.append(p)
+    return front
+
+def grid_configs(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+def run_frontier(profiles: Sequence[str], *, seconds: float = 1.0, units: int = 32, rate_hz: float = 10.0,
+                 seed: int = 7, grid: Optional[Dict[str, Iterable[Any]]] = None,
+                 reference: Optional[Dict[str, Any]] = None, models: Sequence[str] = ("scenario_sim", "simulate_extended"),
+                 repeats: int = 1) -> Dict[str, Any]:
+    available = _models()
+    unknown = [m for m in models if m not in available]
+    if unknown: raise ValueError(f"Unknown model(s): {', '.join(unknown)}")
+    ref_cfg = dict(REFERENCE, **(reference or {}))
+    configs = grid_configs(grid or FRONTIER_GRID)
+    out: Dict[str, Any] = {"reference_config": ref_cfg, "references": {}, "points": [], "frontier": {}}
+    for profile in profiles:
+        for model in models:
+            fn, extract = available[model]
+            base = {"seconds": seconds, "units": units, "rate_hz": rate_hz, "seed": seed, "profile": profile}
+            ref_res, ref_ms, ref_mem = _run(fn, {**base, **ref_cfg}, repeats)
+            ref_vals = extract(ref_res)
+            out["references"].setdefault(profile, {})[model] = {"runtime_ms": ref_ms, "mem_peak_mb": ref_mem, "metrics": ref_vals}
+            points = []
+            for cfg in configs:
+                res, ms, mem = _run(fn, {**base, **cfg}, repeats)
+                vals = extract(res)
+                errors = relative_errors(vals, ref_vals)
+                points.append({"model": model, "profile": profile, "config": cfg, "runtime_ms": ms, "mem_peak_mb": mem,
+                               "speedup": ref_ms / ms if ms > 0 else None, "metrics": vals, "errors": errors,
+                               "error": max(errors.values())})
+            out["points"].extend(points)
+            out["frontier"].setdefault(profile, {})[model] = pareto_front(points)
+    return out
@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: Apache-2.0
+"""SQLite history of benchmark runs for trends and rolling baselines.
+
+Every row of a ``bench run`` is stored with the host fingerprint and git
+revision, so baselines can be taken as the median of the last N runs on the same
+machine instead of a single checked-in JSON file.
+"""
+from __future__ import annotations
+import hashlib, json, os, pathlib, platform, sqlite3, subprocess
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+DEFAULT_PATH = pathlib.Path("benchmarks/history.sqlite")
+METRICS = ("latency_ms_avg", "latency_ms_p95", "mem_peak_mb", "throughput_ops_per_s")
+
+def host_fingerprint() -> str:
+    parts = [platform.node(), platform.machine(), platform.processor(), platform.python_version(),
+             str(os.cpu_count()), np.__version__]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+def git_revision(cwd: Optional[pathlib.Path] = None) -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short=12", "HEAD"], cwd=cwd, capture_output=True,
+                             text=True, timeout=5)
+        if out.returncode == 0 and out.stdout.strip(): return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return os.environ.get("GITHUB_SHA", "unknown")[:12]
+
+class BenchHistory:
+    def __init__(self, path: pathlib.Path = DEFAULT_PATH):
+        self.path = pathlib.Path(path)
+        if str(path) != ":memory:": self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bench_results(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                scenario TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                profile TEXT NOT NULL,
+                threads INTEGER NOT NULL DEFAULT 1,
+                host TEXT NOT NULL,
+                git_rev TEXT NOT NULL,
+                latency_ms_avg REAL,
+                latency_ms_p95 REAL,
+                mem_peak_mb REAL,
+                throughput_ops_per_s REAL,
+                row TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_bench_key ON bench_results(scenario, n, profile, threads, host, ts)"
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record(self, rows: List[Dict[str, Any]], host: Optional[str] = None, git_rev: Optional[str] = None) -> int:
+        host = host or host_fingerprint(); git_rev = git_rev or git_revision()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO bench_results(ts, scenario, n, profile, threads, host, git_rev, latency_ms_avg,"
+                " latency_ms_p95, mem_peak_mb, throughput_ops_per_s, row) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                [(r["timestamp"], r["scenario"], r["n"], r["profile"], r.get("threads", 1), host, git_rev,
+                  *(r.get(m) for m in METRICS), json.dumps(r)) for r in rows],
+            )
+        return len(rows)
+
+    def trend(self, scenario: str, n: Optional[int] = None, profile: Optional[str] = None, threads: int = 1,
+              host: Optional[str] = None, last: int = 50) -> List[Dict[str, Any]]:
+        """Oldest-first history of one scenario, optionally narrowed by n, profile and host."""
+        sql = ("SELECT ts, scenario, n, profile, threads, host, git_rev, " + ", ".join(METRICS) +
+               " FROM bench_results WHERE scenario = ? AND threads = ?")
+        args: List[Any] = [scenario, threads]
+        for col, val in (("n", n), ("profile", profile), ("host", host)):
+            if val is not None: sql += f" AND {col} = ?"; args.append(val)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"; args.append(last)
+        return [dict(r) for r in self.conn.execute(sql, args).fetchall()][::-1]
+
+    def rolling_baseline(self, keys: List[tuple], host: Optional[str] = None, last: int = 5,
+                         before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Baseline rows (median metrics, pooled latency samples) from the last ``last`` runs per key.
+
+        ``keys`` are ``(scenario, n, profile, threads)`` tuples; ``before`` excludes
+        runs at or after that timestamp (e.g. the run being compared).
+        """
+        host = host or host_fingerprint()
+        out: List[Dict[str, Any]] = []
+        for scenario, n, profile, threads in keys:
+            sql = ("SELECT row FROM bench_results WHERE scenario = ? AND n = ? AND profile = ? AND threads = ?"
+                   " AND host = ?")
+            args: List[Any] = [scenario, n, profile, threads, host]
+            if before is not None: sql += " AND ts < ?"; args.append(before)
+            sql += " ORDER BY ts DESC, id DESC LIMIT ?"; args.append(last)
+            runs = [json.loads(r["row"]) for r in self.conn.execute(sql, args).fetchall()]
+            if not runs: continue
+            base = {"scenario": scenario, "n": n, "profile": profile, "threads": threads, "runs": len(runs),
+                    "latency_samples": [x for r in runs for x in r.get("latency_samples", [])]}
+            base.update({m: float(np.median([r[m] for r in runs if m in r])) for m in METRICS if any(m in r for r in runs)})
+            out.append(base)
+        return out
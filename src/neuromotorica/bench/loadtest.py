@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Open-loop load test of ``GET /policy/best`` against the in-process policy API.
+
+Requests are fired on a fixed schedule (``rate`` per second) whatever the
+server's response times, and each latency is measured from the scheduled
+send time, so queueing inside the server shows up in the tail instead of
+silently lowering the offered load (coordinated omission). The app runs on
+the same event loop through ``httpx.ASGITransport``; anything that blocks the
+loop therefore inflates every in-flight request, which is what the async
+service layer is meant to prevent. In-process numbers also include the
+client's own overhead on that loop; pass ``url`` to load a real server
+(e.g. uvicorn with several workers) instead.
+"""
+from __future__ import annotations
+import asyncio, os, pathlib, tempfile, time
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+def _percentiles(lat_ms: List[float]) -> Dict[str, float]:
+    a = np.asarray(lat_ms or [0.0])
+    return {f"p{q}_ms": float(np.percentile(a, q)) for q in (50, 95, 99)} | {"max_ms": float(a.max())}
+
+async def _drive(client, rate: float, duration_s: float, users: int, exercises: int) -> Dict[str, Any]:
+    n = max(int(rate * duration_s), 1)
+    lat: List[float] = []; errors = 0
+    t0 = time.perf_counter()
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        scheduled = t0 + i / rate
+        await asyncio.sleep(max(scheduled - time.perf_counter(), 0.0))
+        r = await client.get(f"/policy/best/user{i % users}/ex{i % exercises}", params={"k": 3})
+        if r.status_code != 200: errors += 1
+        else: lat.append((time.perf_counter() - scheduled) * 1000.0)
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - t0
+    return {"rate": rate, "requests": n, "errors": errors, "achieved_rps": n / elapsed, **_percentiles(lat)}
+
+async def _seed(client, users: int, exercises: int, cues: int, chunk: int = 1000) -> None:
+    rng = np.random.default_rng(0)
+    outcomes = [
+        {"user_id": f"user{u}", "exercise_id": f"ex{e}", "cue_text": f"cue{c}", "success": bool(rng.random() < 0.6),
+         "profile": "healthy"}
+        for u in range(users) for e in range(exercises) for c in range(cues) for _ in range(3)
+    ]
+    for start in range(0, len(outcomes), chunk):
+        r = await client.post("/policy/outcomes:batch", json=outcomes[start:start + chunk])
+        r.raise_for_status()
+
+def run_load(rates: Sequence[float], *, duration_s: float = 5.0, users: int = 200, exercises: int = 4,
+             cues: int = 8, url: str | None = None, seed: bool = True) -> Dict[str, Any]:
+    """Seed the policy database and measure latency percentiles at each offered ``rate``.
+
+    Without ``url`` a fresh temporary database backs the in-process app.
+    ``flatness`` is p99 at the highest rate divided by p99 at the lowest.
+    """
+    import httpx
+
+    async def go(client) -> List[Dict[str, Any]]:
+        if seed: await _seed(client, users, exercises, cues)
+        await _drive(client, min(rates), min(duration_s, 1.0), users, exercises)  # warm-up
+        return [await _drive(client, r, duration_s, users, exercises) for r in rates]
+
+    async def remote() -> List[Dict[str, Any]]:
+        async with httpx.AsyncClient(base_url=url, timeout=30.0) as client:
+            return await go(client)
+
+    rows = asyncio.run(remote()) if url else _in_process(go)
+    lo, hi = min(rows, key=lambda r: r["rate"]), max(rows, key=lambda r: r["rate"])
+    return {"target": url or "in-process", "duration_s": duration_s, "users": users, "exercises": exercises,
+            "rows": rows, "flatness": hi["p99_ms"] / lo["p99_ms"] if lo["p99_ms"] > 0 else None}
+
+def _in_process(go) -> List[Dict[str, Any]]:
+    import httpx
+    from ..cloud.api import main
+
+    tmp = tempfile.TemporaryDirectory()
+    path = pathlib.Path(tmp.name) / "policy.sqlite3"
+    old_env = os.environ.get("NEUROMOTORICA_POLICY_DB")
+    os.environ["NEUROMOTORICA_POLICY_DB"] = str(path)
+    main.app.state._policy_service = None; main.app.state._async_policy_service = None
+
+    async def local() -> List[Dict[str, Any]]:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://policy") as client:
+            return await go(client)
+
+    try:
+        return asyncio.run(local())
+    finally:
+        wrapper = main.app.state._async_policy_service
+        if wrapper is not None: wrapper.close()
+        compactor = getattr(main.app.state, "_outcome_compactor", None)
+        if compactor is not None: compactor.close()
+        service = main.app.state._policy_service
+        if service is not None: service.close(); service.db.close()
+        main.app.state._policy_service = None; main.app.state._async_policy_service = None
+        main.app.state._outcome_compactor = None
+        if old_env is None: os.environ.pop("NEUROMOTORICA_POLICY_DB", None)
+        else: os.environ["NEUROMOTORICA_POLICY_DB"] = old_env
+        tmp.cleanup()
@@ -1,18 +1,38 @@
 # SPDX-License-Identifier: Apache-2.0
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-def render_html(results: List[Dict[str,Any]], compare: Dict[str,Any], title:str, run_dir:Path)->str:
+def _sparkline(values: List[float], width:int=240, height:int=48)->str:
+    if len(values) < 2: return ""
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1.0
+    step = width / (len(values) - 1)
+    pts = " ".join(f"{i*step:.1f},{height - 4 - (v - lo) / span * (height - 8):.1f}" for i, v in enumerate(values))
+    return (f"<svg width='{width}' height='{height}' viewBox='0 0 {width} {height}'>"
+            f"<polyline fill='none' stroke='steelblue' stroke-width='1.5' points='{pts}'/></svg>")
+
+def render_html(results: List[Dict[str,Any]], compare: Dict[str,Any], title:str, run_dir:Path,
+                trends: Optional[Dict[str,List[float]]] = None)->str:
     import html
+    trend_rows = "".join(
+        f"<tr><td>{html.escape(k)}</td><td>{len(v)}</td><td>{v[-1]:.3f}</td>"
+        f"<td>{(v[-1]/v[0]-1)*100 if v[0] else 0.0:+.1f}%</td><td>{_sparkline(v)}</td></tr>"
+        for k, v in (trends or {}).items() if v
+    )
+    trends_html = (f"<h2>Trends (latency avg ms, this host)</h2><table border=\"1\" cellpadding=\"4\" cellspacing=\"0\">"
+                   f"<tr><th>key</th><th>runs</th><th>latest</th><th>drift</th><th>history</th></tr>{trend_rows}</table>"
+                   if trend_rows else "")
     rows = "".join(
         f"<tr><td>{r['scenario']}</td><td>{r['n']}</td><td>{r['profile']}</td>"
         f"<td>{r['latency_ms_p95']:.2f}</td><td>{r['throughput_ops_per_s']:.1f}</td>"
         f"<td>{r['mem_peak_mb']:.2f}</td></tr>"
         for r in results
     )
+    colors = {"fail": "crimson", "noise": "darkorange", "warn": "darkorange"}
     checks = "".join(
-        f"<li>{c['key']} • {c.get('metric')} → <b style='color:{'crimson' if c['status']=='fail' else 'green'}'>{c['status']}</b>"
-        f"{' ('+str(round(c.get('delta_pct',0),1))+'% ≥ '+str(c.get('limit_pct',''))+'%)' if 'delta_pct'in c else ''}</li>"
+        f"<li>{c['key']} • {c.get('metric')} → <b style='color:{colors.get(c['status'], 'green')}'>{c['status']}</b>"
+        f"{' ('+str(round(c.get('delta_pct',0),1))+'% ≥ '+str(c.get('limit_pct',''))+'%)' if 'delta_pct'in c else ''}"
+        f"{' p='+format(c['p_value'],'.3g')+', CI ['+format(c['ci_pct'][0],'.1f')+', '+format(c['ci_pct'][1],'.1f')+']%' if 'p_value' in c else ''}</li>"
         for c in compare['checks']
     )
     return f"""<!doctype html><meta charset="utf-8">
@@ -26,5 +46,6 @@ def render_html(results: List[Dict[str,Any]], compare: Dict[str,Any], title:str,
 <tr><th>scenario</th><th>n</th><th>profile</th><th>p95 ms</th><th>ops/s</th><th>mem MB</th></tr>
 {rows}
 </table>
+{trends_html}
 <p>Artifacts: <a href="results.json">results.json</a> • <a href="results.csv">results.csv</a> • <a href="compare.json">compare.json</a></p>
 """
@@ -1,14 +1,32 @@
 # SPDX-License-Identifier: Apache-2.0
 from __future__ import annotations
-import time, tracemalloc, json, pathlib
-from dataclasses import dataclass
+import gc, time, tracemalloc, json, pathlib
+from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
 import numpy as np, yaml, importlib
+from .stats import bootstrap_delta_ci, mann_whitney_greater
+
+# Simulation hot paths, benchmarked over a units x dt grid; ``n`` is the number of time samples.
+SIM_SCENARIOS = {
+    "convolve_traces": "neuromotorica.bench.sim:bench_convolve_traces",
+    "lowpass": "neuromotorica.bench.sim:bench_lowpass",
+    "lowpass_biquad_filtfilt": "neuromotorica.bench.sim:bench_lowpass_biquad_filtfilt",
+    "muscle_force": "neuromotorica.bench.sim:bench_muscle_force",
+    "scenario_sim": "neuromotorica.bench.sim:bench_scenario_sim",
+    "simulate_extended": "neuromotorica.bench.sim:bench_simulate_extended",
+}
+SIM_GRID = {"units": (16, 64), "dt": (1e-3, 1e-4)}
+# Unit-separable paths that accept ``threads``.
+SIM_PARALLEL = {"convolve_traces", "lowpass", "lowpass_biquad_filtfilt", "muscle_force"}
 
 @dataclass
 class BenchScenario:
     name: str
     fn: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    family: str = "bandits"
+    base: Optional[str] = None
+    parallel: bool = False
     def load(self):
         mod, func = self.fn.split(":")
         return getattr(importlib.import_module(mod), func)
@@ -21,20 +39,67 @@ class BenchRunner:
             "linucb":   BenchScenario("linucb",   "neuromotorica.algo.bandits:bench_linucb"),
             "egreedy":  BenchScenario("egreedy",  "neuromotorica.algo.bandits:bench_egreedy"),
         }
+        for base, fn in SIM_SCENARIOS.items():
+            for units in SIM_GRID["units"]:
+                for dt in SIM_GRID["dt"]:
+                    name = f"{base}_u{units}_dt{round(dt*1e6)}us"
+                    self.registry[name] = BenchScenario(name, fn, {"units": units, "dt": dt}, "sim", base,
+                                                        parallel=base in SIM_PARALLEL)
     def get_scenario(self, name: str)->BenchScenario:
         if name not in self.registry: raise ValueError(f"Unknown scenario: {name}")
         return self.registry[name]
-    def measure(self, scen: BenchScenario, n:int, repeats:int)->Dict[str,Any]:
+    def expand(self, names: List[str])->List[str]:
+        """Resolve aliases: ``all``, a family (``sim``, ``bandits``) or a base name selecting its grid."""
+        out: List[str] = []
+        for name in names:
+            if name in self.registry: picked = [name]
+            elif name == "all": picked = list(self.registry)
+            else: picked = [k for k, s in self.registry.items() if name in (s.family, s.base)]
+            if not picked: raise ValueError(f"Unknown scenario: {name}")
+            out.extend(p for p in picked if p not in out)
+        return out
+    def thresholds_for(self, scenario: str, thresholds: Dict[str,Any])->Dict[str,Any]:
+        scen = self.registry.get(scenario)
+        for key in (scenario, scen and scen.base, scen and scen.family):
+            if key and key in thresholds: return thresholds[key]
+        return thresholds.get("_default", {})
+    def measure(self, scen: BenchScenario, n:int, repeats:int, *, warmup:int=1, min_time_s:float=0.0,
+                max_repeats:int=1000, split_memory:bool=True, mem_repeats:int=1, disable_gc:bool=True,
+                threads:int=1)->Dict[str,Any]:
+        """Time ``scen`` at size ``n``.
+
+        With ``split_memory`` the timing pass runs without ``tracemalloc`` (which
+        otherwise inflates latency) and peaks come from ``mem_repeats`` separate
+        runs. The timing pass repeats at least ``repeats`` times and until
+        ``min_time_s`` has elapsed (capped by ``max_repeats``), after ``warmup``
+        untimed calls; ``disable_gc`` collects once and pauses the cyclic GC.
+        ``threads`` > 1 is only valid for ``parallel`` scenarios.
+        """
+        if threads != 1 and not scen.parallel: raise ValueError(f"Scenario {scen.name} does not support threads")
         fn = scen.load()
+        extra = {"threads": threads} if scen.parallel else {}
+        call = lambda: fn(n=n, seed=self.seed, profile=self.profile, **scen.params, **extra)
         lat, mem, ops_total = [], [], 0
-        for _ in range(repeats):
-            tracemalloc.start()
-            t0 = time.perf_counter()
-            ops = fn(n=n, seed=self.seed, profile=self.profile)
-            dt = time.perf_counter() - t0
-            peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
-            lat.append(dt*1000.0); mem.append(peak/(1024*1024)); ops_total += ops
-        import numpy as np
+        gc_was_enabled = gc.isenabled()
+        try:
+            for _ in range(warmup): call()
+            if disable_gc: gc.collect(); gc.disable()
+            started = time.perf_counter()
+            while len(lat) < max(repeats, 1) or (time.perf_counter() - started < min_time_s and len(lat) < max_repeats):
+                if not split_memory: tracemalloc.start()
+                t0 = time.perf_counter()
+                ops = call()
+                dt = time.perf_counter() - t0
+                if not split_memory:
+                    mem.append(tracemalloc.get_traced_memory()[1]/(1024*1024)); tracemalloc.stop()
+                lat.append(dt*1000.0); ops_total += ops
+            if split_memory:
+                for _ in range(max(mem_repeats, 1)):
+                    gc.collect(); tracemalloc.start()
+                    call()
+                    mem.append(tracemalloc.get_traced_memory()[1]/(1024*1024)); tracemalloc.stop()
+        finally:
+            if gc_was_enabled: gc.enable()
         return {
             "latency_ms_avg": float(np.mean(lat)),
             "latency_ms_p95": float(np.percentile(lat, 95)),
@@ -42,34 +107,65 @@ class BenchRunner:
             "mem_peak_mb": float(max(mem) if mem else 0.0),
             "latency_samples": [float(x) for x in lat],
             "mem_samples_mb": [float(x) for x in mem],
-            "repeats": repeats,
+            "repeats": len(lat),
+            "warmup": warmup,
+            "mode": "split" if split_memory else "combined",
+            "threads": threads,
         }
-    def compare_with_baseline(self, current, baseline_path: Optional[pathlib.Path], thresholds: Dict[str,Any]):
-        base = {}
+    def load_baseline(self, baseline_path: Optional[pathlib.Path])->List[Dict[str,Any]]:
         paths = []
         if baseline_path and baseline_path.exists():
             paths = [baseline_path] if baseline_path.is_file() else list(baseline_path.glob("*.json"))
         else:
             paths = list(pathlib.Path("benchmarks/baseline").glob("*.json"))
+        rows = []
         for p in paths:
             try:
-                for r in json.loads(p.read_text()):
-                    base[(r["scenario"], r["n"], r["profile"])] = r
+                rows.extend(json.loads(p.read_text()))
             except Exception:
                 pass
+        return rows
+    def compare_with_baseline(self, current, baseline_path: Optional[pathlib.Path], thresholds: Dict[str,Any],
+                              method: str = "mannwhitney", alpha: float = 0.05,
+                              baseline_rows: Optional[List[Dict[str,Any]]] = None):
+        """Check rows against the baseline.
+
+        ``method="delta"`` fails on the raw percent change alone. ``"mannwhitney"``
+        and ``"bootstrap"`` additionally require the latency regression to be
+        significant: a one-sided Mann-Whitney p-value below ``alpha``, or a
+        bootstrap CI of the change lying entirely above zero. Memory peaks are
+        near-deterministic and always use the raw delta. ``baseline_rows`` (e.g. a
+        rolling baseline from the history store) replaces the JSON files.
+        """
+        if method not in ("delta", "mannwhitney", "bootstrap"): raise ValueError(f"Unknown method: {method}")
+        rows = baseline_rows if baseline_rows is not None else self.load_baseline(baseline_path)
+        base = {_row_key(r): r for r in rows}
         checks=[]
         for row in current:
-            key=(row["scenario"], row["n"], row["profile"])
+            key=_row_key(row)
             if key not in base:
                 checks.append({"key": key, "metric":"baseline_missing","status":"warn"}); continue
-            th = thresholds.get(row["scenario"], thresholds.get("_default", {}))
+            th = self.thresholds_for(row["scenario"], thresholds)
             for metric in ["latency_ms_p95","latency_ms_avg","mem_peak_mb"]:
                 limit = th.get(metric, {}).get("max_regression_pct", 30.0)
                 cur, old = row[metric], base[key][metric]
                 pct = 0.0 if old==0 else ((cur-old)/old)*100.0
-                checks.append({"key":key,"metric":metric,"baseline":old,"current":cur,"delta_pct":pct,"limit_pct":limit,"status":"pass" if pct<=limit else "fail"})
+                check = {"key":key,"metric":metric,"baseline":old,"current":cur,"delta_pct":pct,"limit_pct":limit}
+                status = "pass" if pct<=limit else "fail"
+                cur_s, old_s = row.get("latency_samples", []), base[key].get("latency_samples", [])
+                if method != "delta" and metric != "mem_peak_mb" and cur_s and old_s:
+                    _, p_value = mann_whitney_greater(cur_s, old_s)
+                    lo, hi = bootstrap_delta_ci(cur_s, old_s, metric, alpha=alpha, seed=self.seed)
+                    significant = p_value < alpha if method == "mannwhitney" else lo > 0.0
+                    check.update({"p_value": p_value, "ci_pct": [lo, hi], "method": method})
+                    if status == "fail" and not significant: status = "noise"
+                checks.append({**check, "status": status})
         return {"checks": checks}
 
+def _row_key(r: Dict[str,Any])->tuple:
+    key = (r["scenario"], r["n"], r["profile"])
+    return key if r.get("threads", 1) == 1 else key + (r["threads"],)
+
 def load_thresholds(path: pathlib.Path)->Dict[str,Any]:
     if path.exists():
         return yaml.safe_load(path.read_text()) or {}
@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Scaling-curve fits across data sizes and thread counts.
+
+Latency and memory of each scenario are fitted as ``y = a * n**b`` (least
+squares in log-log space) and as ``y = a * n log n``. Small sizes are dominated
+by fixed overhead, so the exponent between the two largest sizes
+(``tail_exponent``) is what regression checks gate on: an accidental O(n^2)
+shows up there even when absolute times at small ``n`` look fine.
+"""
+from __future__ import annotations
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import numpy as np
+
+METRICS = {"latency": "latency_ms_avg", "memory": "mem_peak_mb"}
+
+def fit_scaling(ns: Sequence[float], ys: Sequence[float]) -> Dict[str, Any]:
+    n = np.asarray(ns, dtype=np.float64); y = np.asarray(ys, dtype=np.float64)
+    keep = (n > 0) & (y > 0)
+    n, y = n[keep], y[keep]
+    if n.size < 2 or np.unique(n).size < 2:
+        return {"points": int(n.size), "model": None, "exponent": None, "tail_exponent": None}
+    ln, ly = np.log(n), np.log(y)
+    b, log_a = np.polyfit(ln, ly, 1)
+    power_rmse = float(np.sqrt(np.mean((log_a + b * ln - ly) ** 2)))
+    nlogn = n * np.log(np.maximum(n, 2.0))
+    log_c = float(np.mean(ly - np.log(nlogn)))
+    nlogn_rmse = float(np.sqrt(np.mean((log_c + np.log(nlogn) - ly) ** 2)))
+    order = np.argsort(n)
+    n1, n2 = n[order[-2]], n[order[-1]]
+    y1, y2 = y[order[-2]], y[order[-1]]
+    tail = float(np.log(y2 / y1) / np.log(n2 / n1)) if n2 != n1 else None
+    ss_tot = float(np.sum((ly - ly.mean()) ** 2))
+    r2 = 1.0 - float(np.sum((log_a + b * ln - ly) ** 2)) / ss_tot if ss_tot > 0 else 1.0
+    return {
+        "points": int(n.size),
+        "model": "nlogn" if nlogn_rmse < power_rmse else "power",
+        "exponent": float(b),
+        "coefficient": float(np.exp(log_a)),
+        "r2": r2,
+        "tail_exponent": tail,
+        "rmse_log": {"power": power_rmse, "nlogn": nlogn_rmse},
+    }
+
+def _group(rows: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], Tuple]) -> Dict[Tuple, List[Dict[str, Any]]]:
+    out: Dict[Tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for r in rows: out[key(r)].append(r)
+    return out
+
+def scaling_report(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-scenario, per-profile size fits (single-threaded rows) and thread-scaling efficiency.
+
+    Both sections are nested ``[scenario][profile]`` so that runs of one
+    scenario under several profiles do not overwrite each other.
+    """
+    sizes: Dict[str, Any] = {}
+    for (scenario, profile), grp in _group([r for r in rows if r.get("threads", 1) == 1],
+                                           lambda r: (r["scenario"], r["profile"])).items():
+        ns = [r["n"] for r in grp]
+        sizes.setdefault(scenario, {})[profile] = {
+            "n": sorted(ns), **{name: fit_scaling(ns, [r[col] for r in grp]) for name, col in METRICS.items()}}
+    threads: Dict[str, Any] = {}
+    for (scenario, n, profile), grp in _group(rows, lambda r: (r["scenario"], r["n"], r["profile"])).items():
+        by_t = {r.get("threads", 1): r["latency_ms_avg"] for r in grp}
+        if len(by_t) < 2 or 1 not in by_t: continue
+        t1 = by_t[1]
+        threads.setdefault(scenario, {}).setdefault(profile, {})[str(n)] = {
+            str(k): {"latency_ms_avg": v, "speedup": t1 / v if v > 0 else None,
+                     "efficiency": t1 / (k * v) if v > 0 else None}
+            for k, v in sorted(by_t.items())
+        }
+    return {"sizes": sizes, "threads": threads}
+
+def compare_scaling(current: Dict[str, Any], baseline: Dict[str, Any],
+                    thresholds_for: Callable[[str], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fail when a tail exponent exceeds its absolute cap or grows by more than ``max_delta`` over baseline.
+
+    Thresholds live under ``latency_exponent`` / ``mem_exponent`` with keys
+    ``max`` and ``max_delta`` (default 0.25).
+    """
+    checks: List[Dict[str, Any]] = []
+    for scenario, profiles in current.get("sizes", {}).items():
+        th = thresholds_for(scenario)
+        for profile, cur in profiles.items():
+            old = baseline.get("sizes", {}).get(scenario, {}).get(profile, {})
+            for name, th_key in (("latency", "latency_exponent"), ("memory", "mem_exponent")):
+                exp = cur[name]["tail_exponent"]
+                if exp is None: continue
+                limits = th.get(th_key, {})
+                max_delta = limits.get("max_delta", 0.25)
+                base_exp = old.get(name, {}).get("tail_exponent")
+                status = "pass"
+                if "max" in limits and exp > limits["max"]: status = "fail"
+                if base_exp is not None and exp - base_exp > max_delta: status = "fail"
+                checks.append({"key": [scenario, profile], "metric": th_key, "current": exp, "baseline": base_exp,
+                               "max": limits.get("max"), "max_delta": max_delta, "status": status})
+    return checks
@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Benchmark entry points for the simulation hot paths.
+
+Each function follows the bandit bench signature ``fn(n, seed, profile, **params)``
+and returns the number of processed unit-samples. ``n`` is the number of time
+samples (``seconds = n * dt``); ``units`` and ``dt`` come from the scenario grid.
+Unit-separable paths accept ``threads`` and shard the units axis over a thread
+pool (NumPy releases the GIL inside the heavy kernels). ``profile`` selects the
+physiological profile of the end-to-end scenarios; bench labels that are not
+simulation profiles (the CLI default ``standard``) fall back to ``SIM_PROFILE``.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+from ..models.kernels import cached_normalized_kernel, convolve_traces
+from ..models.filters import lowpass, lowpass_biquad_filtfilt
+from ..models.muscle import Muscle, MuscleParams
+from ..models.nmj import NMJParams
+from ..profiles import available_profiles
+
+SIM_PROFILE = "baseline"
+
+def _sim_profile(profile: str) -> str:
+    return profile if profile in available_profiles() else SIM_PROFILE
+
+def _spikes(n: int, units: int, dt: float, seed: int, rate_hz: float = 20.0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((units, n)) < rate_hz * dt).astype(np.float64)
+
+def _activation(n: int, units: int, seed: int):
+    return np.random.default_rng(seed).random((units, n))
+
+def _sharded(x, threads: int, fn):
+    if threads <= 1: return [fn(x)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(fn, np.array_split(x, threads, axis=0)))
+
+def bench_convolve_traces(n: int, seed: int, profile: str, units: int = 64, dt: float = 1e-3, threads: int = 1) -> int:
+    p = NMJParams()
+    kernel = cached_normalized_kernel(0.5, dt, p.tau_rise, p.tau_decay)
+    _sharded(_spikes(n, units, dt, seed), threads, lambda s: convolve_traces(s, kernel))
+    return units * n
+
+def bench_lowpass(n: int, seed: int, profile: str, units: int = 64, dt: float = 1e-3, threads: int = 1) -> int:
+    _sharded(_activation(n, units, seed), threads, lambda a: lowpass(a, dt, NMJParams().ach_decay, axis=1))
+    return units * n
+
+def bench_lowpass_biquad_filtfilt(n: int, seed: int, profile: str, units: int = 64, dt: float = 1e-3, threads: int = 1) -> int:
+    _sharded(_activation(n, units, seed), threads, lambda a: lowpass_biquad_filtfilt(a, dt, NMJParams().ach_decay, axis=1))
+    return units * n
+
+@lru_cache(maxsize=64)
+def _muscle(units: int, dt: float, T: float) -> Muscle:
+    # Built on the warm-up call, so construction stays out of the timed repeats.
+    return Muscle(MuscleParams(), dt, T, units=units)
+
+def bench_muscle_force(n: int, seed: int, profile: str, units: int = 64, dt: float = 1e-3, threads: int = 1) -> int:
+    _sharded(_activation(n, units, seed), threads, lambda a: _muscle(a.shape[0], dt, n * dt).force(a))
+    return units * n
+
+def bench_scenario_sim(n: int, seed: int, profile: str, units: int = 64, dt: float = 1e-3) -> int:
+    from ..analysis.validation import scenario_sim
+    scenario_sim(seconds=n * dt, dt=dt, units=units, seed=seed, profile=_sim_profile(profile))
+    return units * n
+
+def bench_simulate_extended(n: int, seed: int, profile: str, units: int = 64, dt: float = 1e-3) -> int:
+    from ..analysis.extended_validation import simulate_extended
+    simulate_extended(seconds=n * dt, dt=dt, units=units, seed=seed, profile=_sim_profile(profile))
+    return units * n
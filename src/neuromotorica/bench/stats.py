@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Small-sample statistics for benchmark comparisons (no SciPy dependency)."""
+from __future__ import annotations
+import math
+from typing import Callable, Dict, Sequence, Tuple
+import numpy as np
+
+STATISTICS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "latency_ms_avg": lambda a: np.mean(a, axis=-1),
+    "latency_ms_p95": lambda a: np.percentile(a, 95, axis=-1),
+    "mem_peak_mb": lambda a: np.max(a, axis=-1),
+}
+
+def _rankdata(x: np.ndarray) -> np.ndarray:
+    order = np.argsort(x, kind="mergesort")
+    ranks = np.empty(x.size, dtype=np.float64)
+    ranks[order] = np.arange(1, x.size + 1, dtype=np.float64)
+    # Average the ranks of tied values.
+    _, inv, counts = np.unique(x, return_inverse=True, return_counts=True)
+    sums = np.bincount(inv, weights=ranks)
+    return (sums / counts)[inv]
+
+def mann_whitney_greater(current: Sequence[float], baseline: Sequence[float]) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U test that ``current`` is stochastically larger.
+
+    Returns ``(U, p)`` using the normal approximation with tie and continuity
+    correction; ``p == 1.0`` when either sample is empty or all values tie.
+    """
+    a, b = np.asarray(current, dtype=np.float64), np.asarray(baseline, dtype=np.float64)
+    n1, n2 = a.size, b.size
+    if n1 == 0 or n2 == 0: return 0.0, 1.0
+    ranks = _rankdata(np.concatenate([a, b]))
+    u = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2.0)
+    n = n1 + n2
+    _, counts = np.unique(np.concatenate([a, b]), return_counts=True)
+    tie = float(np.sum(counts**3 - counts)) / (n * (n - 1)) if n > 1 else 0.0
+    var = n1 * n2 / 12.0 * ((n + 1) - tie)
+    if var <= 0: return u, 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(var)
+    return u, 0.5 * math.erfc(z / math.sqrt(2.0))
+
+def bootstrap_delta_ci(current: Sequence[float], baseline: Sequence[float], metric: str = "latency_ms_avg",
+                       n_boot: int = 2000, alpha: float = 0.05, seed: int = 0) -> Tuple[float, float]:
+    """Percentile bootstrap CI of the relative change ``(cur/base - 1) * 100`` of ``metric``'s statistic."""
+    a, b = np.asarray(current, dtype=np.float64), np.asarray(baseline, dtype=np.float64)
+    if a.size == 0 or b.size == 0: return float("-inf"), float("inf")
+    stat = STATISTICS.get(metric, STATISTICS["latency_ms_avg"])
+    rng = np.random.default_rng(seed)
+    cur = stat(a[rng.integers(0, a.size, size=(n_boot, a.size))])
+    old = stat(b[rng.integers(0, b.size, size=(n_boot, b.size))])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(old > 0, (cur / old - 1.0) * 100.0, 0.0)
+    lo, hi = np.percentile(pct, [100.0 * alpha / 2.0, 100.0 * (1.0 - alpha / 2.0)])
+    return float(lo), float(hi)
@@ -3,6 +3,10 @@ import typer
 from neuromotorica.i18n.core import activate, _
 from neuromotorica.bench.__init__ import app as bench_app
 from neuromotorica.validate.__init__ import app as validate_app
+from neuromotorica.analysis.profile_cli import main as profile_main
+from neuromotorica.analysis.surrogate_cli import main as surrogate_build_main
+from neuromotorica.cloud.export_cli import main as policy_export_main
+from neuromotorica.cloud.reshard_cli import main as policy_reshard_main
 
 app = typer.Typer(no_args_is_help=True, help="Neuromotorica CLI")
 
@@ -12,6 +16,10 @@ def main(lang: str = typer.Option(None, "--lang", help="Interface language (uk/e
 
 app.add_typer(bench_app, name="bench")
 app.add_typer(validate_app, name="validate")
+app.command("profile", help="Profile simulations (cProfile hotspots, collapsed stacks)")(profile_main)
+app.command("surrogate-build", help="Precompute the metric surrogate grid")(surrogate_build_main)
+app.command("policy-reshard", help="Reshard the policy database offline")(policy_reshard_main)
+app.command("policy-export", help="Stream the policy table as NDJSON")(policy_export_main)
 
 if __name__ == "__main__":
     app()
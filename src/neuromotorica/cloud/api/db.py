@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import pathlib
+import queue
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 
-SCHEMA_VERSION = 3
+SCHEMA_VERSION = 7
+
+# Wall-clock milliseconds, evaluated by SQLite inside the writing statement (after the write lock is taken).
+NOW_MS_SQL = "CAST((julianday('now') - 2440587.5) * 86400000.0 AS INTEGER)"
 
 
 def _create_base_schema(cur: sqlite3.Cursor) -> None:
@@ -21,12 +30,144 @@ def _create_base_schema(cur: sqlite3.Cursor) -> None:
             reps INTEGER,
             metrics TEXT,
             extended INTEGER DEFAULT 0,
+            updated_at INTEGER NOT NULL DEFAULT 0,
             PRIMARY KEY (user_id, exercise_id, profile, cue_text)
         )
         """
     )
 
 
+def _create_totals_schema(cur: sqlite3.Cursor) -> None:
+    """Cross-profile totals kept in step with ``cue_stats`` by triggers."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cue_totals(
+            user_id TEXT,
+            exercise_id TEXT,
+            cue_text TEXT,
+            success INTEGER DEFAULT 0,
+            failure INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, exercise_id, cue_text)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS cue_totals_insert AFTER INSERT ON cue_stats
+        BEGIN
+            INSERT INTO cue_totals(user_id, exercise_id, cue_text, success, failure)
+            VALUES (NEW.user_id, NEW.exercise_id, NEW.cue_text, NEW.success, NEW.failure)
+            ON CONFLICT(user_id, exercise_id, cue_text) DO UPDATE SET
+              success = cue_totals.success + excluded.success,
+              failure = cue_totals.failure + excluded.failure;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS cue_totals_update AFTER UPDATE OF success, failure ON cue_stats
+        BEGIN
+            UPDATE cue_totals SET
+              success = success + NEW.success - OLD.success,
+              failure = failure + NEW.failure - OLD.failure
+            WHERE user_id = NEW.user_id AND exercise_id = NEW.exercise_id AND cue_text = NEW.cue_text;
+        END
+        """
+    )
+    # Recreated on every open so databases created with the older trigger drop emptied totals too.
+    cur.execute("DROP TRIGGER IF EXISTS cue_totals_delete")
+    cur.execute(
+        """
+        CREATE TRIGGER cue_totals_delete AFTER DELETE ON cue_stats
+        BEGIN
+            UPDATE cue_totals SET
+              success = success - OLD.success,
+              failure = failure - OLD.failure
+            WHERE user_id = OLD.user_id AND exercise_id = OLD.exercise_id AND cue_text = OLD.cue_text;
+            DELETE FROM cue_totals
+            WHERE user_id = OLD.user_id AND exercise_id = OLD.exercise_id AND cue_text = OLD.cue_text
+              AND success = 0 AND failure = 0;
+        END
+        """
+    )
+    cur.execute("DELETE FROM cue_totals WHERE success = 0 AND failure = 0")
+
+
+def _create_versions_schema(cur: sqlite3.Cursor) -> None:
+    """Per (user, exercise) write counter, bumped by triggers; backs cache validation and ETags."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cue_versions(
+            user_id TEXT,
+            exercise_id TEXT,
+            version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, exercise_id)
+        )
+        """
+    )
+    for event, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS cue_versions_{event.lower()} AFTER {event} ON cue_stats
+            BEGIN
+                INSERT INTO cue_versions(user_id, exercise_id, version)
+                VALUES ({ref}.user_id, {ref}.exercise_id, 1)
+                ON CONFLICT(user_id, exercise_id) DO UPDATE SET version = cue_versions.version + 1;
+            END
+            """
+        )
+
+
+def _create_events_schema(cur: sqlite3.Cursor) -> None:
+    """Append-only outcome log, its per-day rollup and the metric-name dictionary of their blobs."""
+    cur.execute("CREATE TABLE IF NOT EXISTS metric_names(id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    # No secondary indexes: appends stay cheap and the compactor walks the table in rowid order.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outcome_events(
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            exercise_id TEXT NOT NULL,
+            profile TEXT NOT NULL DEFAULT '',
+            cue_text TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            reps INTEGER,
+            extended INTEGER,
+            metrics BLOB
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outcome_daily(
+            user_id TEXT,
+            exercise_id TEXT,
+            profile TEXT,
+            cue_text TEXT,
+            day INTEGER,
+            events INTEGER NOT NULL,
+            success INTEGER NOT NULL,
+            reps INTEGER NOT NULL,
+            metrics BLOB,
+            PRIMARY KEY (user_id, exercise_id, profile, cue_text, day)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _backfill_totals(cur: sqlite3.Cursor) -> None:
+    cur.execute("DELETE FROM cue_totals")
+    cur.execute(
+        """
+        INSERT INTO cue_totals(user_id, exercise_id, cue_text, success, failure)
+        SELECT user_id, exercise_id, cue_text, SUM(success), SUM(failure)
+        FROM cue_stats
+        GROUP BY user_id, exercise_id, cue_text
+        """
+    )
+
+
 def _migrate_to_v3(conn: sqlite3.Connection) -> None:
     cur = conn.cursor()
     cur.execute("ALTER TABLE cue_stats RENAME TO cue_stats_old")
@@ -45,6 +186,7 @@ def _migrate_to_v3(conn: sqlite3.Connection) -> None:
 
 def _ensure_schema(conn: sqlite3.Connection) -> None:
     cur = conn.cursor()
+    version = cur.execute("PRAGMA user_version").fetchone()[0]
     _create_base_schema(cur)
 
     cur.execute("PRAGMA table_info(cue_stats)")
@@ -74,18 +216,300 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
     if "extended" not in existing_columns:
         cur.execute("ALTER TABLE cue_stats ADD COLUMN extended INTEGER DEFAULT 0")
         cur.execute("UPDATE cue_stats SET extended = 0 WHERE extended IS NULL")
+    if "updated_at" not in existing_columns:
+        # Rows from before v6 count as changed at epoch 0, so the first export picks them up.
+        cur.execute("ALTER TABLE cue_stats ADD COLUMN updated_at INTEGER NOT NULL DEFAULT 0")
+
+    _create_totals_schema(cur)
+    _create_versions_schema(cur)
+    _create_events_schema(cur)
+    if version < 4 or needs_profile_migration:
+        _backfill_totals(cur)
 
     cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
 
 
+def default_path() -> str:
+    """``NEUROMOTORICA_POLICY_DB`` if set, else ``policy.sqlite3`` next to this module."""
+    return os.environ.get("NEUROMOTORICA_POLICY_DB") or str(pathlib.Path(__file__).with_name("policy.sqlite3"))
+
+
 def get_db(path: str | None = None) -> sqlite3.Connection:
-    if os.environ.get("PYTEST_CURRENT_TEST"):
-        conn = sqlite3.connect(":memory:", check_same_thread=False)
-    else:
-        if path is None:
-            path = str(pathlib.Path(__file__).with_name("policy.sqlite3"))
-        conn = sqlite3.connect(path, check_same_thread=False)
+    if path is None:
+        path = default_path()
+    conn = sqlite3.connect(path, check_same_thread=False)
+    if path != ":memory:":
+        # WAL lets readers proceed while the (group-commit) writer holds a transaction.
+        conn.execute("PRAGMA journal_mode=WAL")
     conn.row_factory = sqlite3.Row
     _ensure_schema(conn)
     return conn
+
+
+class ConnectionManager:
+    """One writer connection plus a bounded pool of read-only connections to a SQLite file.
+
+    The database runs in WAL mode, so readers on their own connections never
+    wait for the writer; writes are serialized on the single writer connection
+    behind a lock. At most ``max_readers`` read-only connections are opened;
+    a thread checks one out for the duration of :meth:`reader` and returns it
+    to the pool, waiting up to ``busy_timeout_ms`` when all are in use.
+    ``busy_timeout_ms`` also bounds how long a connection waits on a lock held
+    by another process, and ``cached_statements`` sizes each connection's
+    prepared-statement cache. An in-memory database cannot be shared between
+    connections, so ``":memory:"`` (and :meth:`from_connection`) fall back to
+    one connection guarded by the lock.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        *,
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 128,
+        max_readers: int = 8,
+    ):
+        if max_readers < 1:
+            raise ValueError("max_readers must be >= 1")
+        self.path = str(path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.max_readers = max_readers
+        self._shared = self.path == ":memory:"
+        self._init_pool()
+        self._writer = self._connect(self.path)
+        if not self._shared:
+            self._writer.execute("PRAGMA journal_mode=WAL")
+        _ensure_schema(self._writer)
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> "ConnectionManager":
+        """Wrap an existing connection; reads and writes share it under the lock."""
+        manager = cls.__new__(cls)
+        manager.path = ":memory:"
+        manager.busy_timeout_ms = 0
+        manager.cached_statements = 0
+        manager.max_readers = 1
+        manager._shared = True
+        manager._init_pool()
+        manager._writer = conn
+        return manager
+
+    def _init_pool(self) -> None:
+        self._lock = threading.RLock()
+        self._pool_lock = threading.Lock()
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._readers: list[sqlite3.Connection] = []
+        self._closed = False
+
+    def _connect(self, target: str, *, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            target = pathlib.Path(target).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(
+            target,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            uri=readonly,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if readonly:
+            conn.isolation_level = None
+            conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The writer connection (use :meth:`writer` for thread-safe access)."""
+        return self._writer
+
+    @property
+    def open_readers(self) -> int:
+        return len(self._readers)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            yield self._writer
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        if self._shared:
+            with self._lock:
+                yield self._writer
+            return
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection manager is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if len(self._readers) < self.max_readers:
+                conn = self._connect(self.path, readonly=True)
+                self._readers.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=max(self.busy_timeout_ms, 1) / 1000.0)
+        except queue.Empty:
+            raise sqlite3.OperationalError("no reader connection available") from None
+
+    def close(self) -> None:
+        """Close the writer and every pooled reader; readers in use close when returned."""
+        with self._pool_lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._readers.clear()
+        with self._lock:
+            self._writer.close()
+
+    def route(self, user_id: str) -> "ConnectionManager":
+        """Manager holding ``user_id``'s rows (this single file)."""
+        return self
+
+    def shards(self) -> list["ConnectionManager"]:
+        return [self]
+
+
+MANIFEST = "manifest.json"
+
+
+def shard_index(user_id: str, shards: int) -> int:
+    """Stable shard of ``user_id``: independent of process, platform and ``PYTHONHASHSEED``."""
+    digest = hashlib.blake2b(user_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+class ShardedConnectionManager:
+    """``shards`` SQLite files in ``directory``, one :class:`ConnectionManager` each.
+
+    Users are routed by :func:`shard_index`, so all rows of a user live in one
+    file and every per-user query (outcome upserts, ``topk``, versions) stays
+    single-shard; each shard has its own writer lock, so writes for users on
+    different shards proceed in parallel. The shard count is recorded in
+    ``manifest.json``; opening a directory with a different count is refused
+    (use :func:`reshard`).
+    """
+
+    def __init__(self, directory: str | pathlib.Path, shards: int, **options):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self.directory / MANIFEST
+        if manifest.exists():
+            recorded = json.loads(manifest.read_text())["shards"]
+            if recorded != shards:
+                raise ValueError(f"{self.directory} holds {recorded} shards, not {shards}; reshard it first")
+        else:
+            manifest.write_text(json.dumps({"shards": shards, "hash": "blake2b-64"}))
+        self._shards = [
+            ConnectionManager(self.directory / f"shard-{i:04d}.sqlite3", **options) for i in range(shards)
+        ]
+
+    @classmethod
+    def open(cls, directory: str | pathlib.Path, **options) -> "ShardedConnectionManager":
+        """Open an existing sharded directory with its recorded shard count."""
+        shards = json.loads((pathlib.Path(directory) / MANIFEST).read_text())["shards"]
+        return cls(directory, shards, **options)
+
+    def route(self, user_id: str) -> ConnectionManager:
+        return self._shards[shard_index(user_id, len(self._shards))]
+
+    def shards(self) -> list[ConnectionManager]:
+        return list(self._shards)
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.close()
+
+
+COPY_COLUMNS = (
+    "user_id", "exercise_id", "profile", "cue_text", "success", "failure", "reps", "metrics", "extended", "updated_at"
+)
+
+
+def reshard(
+    source: str | pathlib.Path, target: str | pathlib.Path, shards: int, *, chunk_rows: int = 5000
+) -> dict[str, int]:
+    """Copy ``cue_stats`` from ``source`` into a new ``shards``-way store at ``target`` (offline).
+
+    ``source`` is a sharded directory or a single policy database file.
+    ``cue_totals`` and ``cue_versions`` are rebuilt by the target's triggers;
+    the outcome log and its daily rollups are copied with remapped metric ids.
+    The target directory must not already hold a store. Returns row counts
+    per target shard.
+    """
+    source = pathlib.Path(source)
+    target = pathlib.Path(target)
+    if (target / MANIFEST).exists():
+        raise ValueError(f"{target} already holds a sharded store")
+    if source.is_dir():
+        src: ConnectionManager | ShardedConnectionManager = ShardedConnectionManager.open(source)
+    else:
+        src = ConnectionManager(source)
+    dst = ShardedConnectionManager(target, shards)
+    counts = [0] * shards
+    select = f"SELECT {', '.join(COPY_COLUMNS)} FROM cue_stats ORDER BY user_id"
+    insert = f"INSERT INTO cue_stats({', '.join(COPY_COLUMNS)}) VALUES ({', '.join('?' * len(COPY_COLUMNS))})"
+    try:
+        for shard in src.shards():
+            with shard.reader() as conn:
+                cur = conn.execute(select)
+                while True:
+                    rows = cur.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    routed: dict[int, list[tuple]] = {}
+                    for row in rows:
+                        routed.setdefault(shard_index(row[0], shards), []).append(tuple(row))
+                    for index, part in routed.items():
+                        with dst.shards()[index].writer() as out:
+                            with out:
+                                out.executemany(insert, part)
+                        counts[index] += len(part)
+        from ..services.outcome_log import copy_history  # services build on this module
+
+        for shard in src.shards():
+            copy_history(shard, dst, chunk_rows=chunk_rows)
+    finally:
+        src.close()
+        dst.close()
+    return {f"shard-{i:04d}": n for i, n in enumerate(counts)}
+
+
+def get_manager(
+    path: str | None = None,
+    *,
+    shards: int = 1,
+    busy_timeout_ms: int = 5000,
+    cached_statements: int = 128,
+    max_readers: int = 8,
+) -> ConnectionManager | ShardedConnectionManager:
+    """Connection manager for the policy database at ``path`` (default: :func:`default_path`).
+
+    With ``shards > 1`` the path is a directory of shard files (default ``policy_shards``).
+    """
+    options = {"busy_timeout_ms": busy_timeout_ms, "cached_statements": cached_statements, "max_readers": max_readers}
+    if shards > 1:
+        directory = path or os.environ.get("NEUROMOTORICA_POLICY_DB") or str(
+            pathlib.Path(__file__).with_name("policy_shards")
+        )
+        return ShardedConnectionManager(directory, shards, **options)
+    return ConnectionManager(path or default_path(), **options)
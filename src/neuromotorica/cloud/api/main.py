@@ -1,15 +1,38 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os
-from fastapi import FastAPI, Query
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from .db import get_db
-from ..services.policy_service import PolicyService
-from .schemas import OutcomeIn, PolicyBestResponse, RankedCue
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from .db import get_manager
+from ..services.policy_service import DURABILITY_MODES, IngestUnavailable, PolicyService
+from ..services.async_policy_service import AsyncPolicyService, ServiceOverloaded
+from ..services.outcome_log import OutcomeCompactor
+from ..services.policy_export import export_watermark, iter_export, ndjson_chunks
+from ..services.ranked_cache import RankedCache
+from .schemas import (
+    OutcomeBatchItem,
+    OutcomeBatchResponse,
+    OutcomeIn,
+    PolicyBestBatchRequest,
+    PolicyBestResponse,
+    RankedCue,
+)
 
 LOGGER = logging.getLogger(__name__)
 
+MAX_OUTCOME_BATCH = 1000
+MAX_BEST_BATCH = 10_000
+NDJSON_CHUNK_LINES = 500
+
 FALSEY = {"0", "false", "no", "off"}
 TRUTHY = {"1", "true", "yes", "on"}
 
@@ -57,44 +80,272 @@ def _setup_metrics(app: FastAPI) -> None:
     app.state.metrics_instrumentator = instrumentator
     LOGGER.info("Prometheus metrics instrumentation enabled at /metrics")
 
-app = FastAPI(title="NeuroMotorica Policy API", version="0.5.0")
+
+def _durability() -> str:
+    value = os.getenv("NEUROMOTORICA_POLICY_DURABILITY", "commit").strip().lower()
+    if value not in DURABILITY_MODES:
+        LOGGER.warning("Unrecognized value '%s' for NEUROMOTORICA_POLICY_DURABILITY; using commit", value)
+        return "commit"
+    return value
+
+
+def _float_from_env(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        LOGGER.warning("Unrecognized value '%s' for %s; using default", value, name)
+        return default
+
+
+def _ranked_cache() -> RankedCache | None:
+    size = int(_float_from_env("NEUROMOTORICA_POLICY_CACHE_SIZE", 4096))
+    if size <= 0:
+        return None
+    max_mb = _float_from_env("NEUROMOTORICA_POLICY_CACHE_MB", 16.0)
+    return RankedCache(max_entries=size, max_bytes=max(1, int(max_mb * 1024 * 1024)))
+
+
+def _service_options() -> dict:
+    return {
+        "cache": _ranked_cache(),
+        "durability": _durability(),
+        "batch_size": int(_float_from_env("NEUROMOTORICA_POLICY_BATCH_SIZE", 256)),
+        "flush_interval_s": _float_from_env("NEUROMOTORICA_POLICY_FLUSH_MS", 50.0) / 1000.0,
+        "max_queue": int(_float_from_env("NEUROMOTORICA_POLICY_QUEUE_MAX", 10_000)),
+    }
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    async_service = getattr(app.state, "_async_policy_service", None)
+    if async_service is not None:
+        async_service.close()
+        app.state._async_policy_service = None
+    compactor = getattr(app.state, "_outcome_compactor", None)
+    if compactor is not None:
+        compactor.close()
+        app.state._outcome_compactor = None
+    service = getattr(app.state, "_policy_service", None)
+    if service is not None:
+        service.close()
+        service.db.close()
+        app.state._policy_service = None
+
+
+app = FastAPI(title="NeuroMotorica Policy API", version="0.5.0", lifespan=_lifespan)
 
 
 def _service() -> PolicyService:
     service = getattr(app.state, "_policy_service", None)
     if service is None:
-        service = PolicyService(get_db())
+        db = get_manager(
+            shards=int(_float_from_env("NEUROMOTORICA_POLICY_SHARDS", 1)),
+            busy_timeout_ms=int(_float_from_env("NEUROMOTORICA_POLICY_BUSY_TIMEOUT_MS", 5000)),
+            cached_statements=int(_float_from_env("NEUROMOTORICA_POLICY_STMT_CACHE", 128)),
+            max_readers=int(_float_from_env("NEUROMOTORICA_POLICY_READERS", 8)),
+        )
+        service = PolicyService(db, **_service_options())
         app.state._policy_service = service
+        app.state._outcome_compactor = _compactor(db).start()
     return service
 
+
+def _compactor(db) -> OutcomeCompactor:
+    daily_days = int(_float_from_env("NEUROMOTORICA_POLICY_DAILY_RETENTION_DAYS", 0))
+    return OutcomeCompactor(
+        db,
+        retention_s=_float_from_env("NEUROMOTORICA_POLICY_EVENT_RETENTION_DAYS", 30.0) * 86_400,
+        interval_s=_float_from_env("NEUROMOTORICA_POLICY_COMPACT_INTERVAL_S", 3600.0),
+        daily_retention_days=daily_days if daily_days > 0 else None,
+    )
+
+
+def _async_service() -> AsyncPolicyService:
+    service = _service()
+    wrapper = getattr(app.state, "_async_policy_service", None)
+    if wrapper is None or wrapper.service is not service:
+        if wrapper is not None:
+            wrapper.close()
+        wrapper = AsyncPolicyService(
+            service,
+            max_workers=int(_float_from_env("NEUROMOTORICA_POLICY_DB_THREADS", 8)),
+            max_concurrency=int(_float_from_env("NEUROMOTORICA_POLICY_MAX_INFLIGHT", 64)),
+            acquire_timeout_s=_float_from_env("NEUROMOTORICA_POLICY_ACQUIRE_MS", 1000.0) / 1000.0,
+        )
+        app.state._async_policy_service = wrapper
+    return wrapper
+
+
+def _unavailable(exc: IngestUnavailable) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
 @app.post("/policy/outcome")
-def policy_outcome(inp: OutcomeIn) -> dict:
+async def policy_outcome(inp: OutcomeIn) -> dict:
     metrics_payload = inp.metrics.root if inp.metrics is not None else None
-    outcome = _service().update_outcome(
-        inp.user_id,
-        inp.exercise_id,
-        inp.cue_text,
-        inp.success,
-        reps=inp.reps,
-        metrics=metrics_payload,
-        extended=inp.extended,
-        profile=inp.profile,
-    )
+    try:
+        outcome = await _async_service().update_outcome(
+            inp.user_id,
+            inp.exercise_id,
+            inp.cue_text,
+            inp.success,
+            reps=inp.reps,
+            metrics=metrics_payload,
+            extended=inp.extended,
+            profile=inp.profile,
+        )
+    except IngestUnavailable as exc:
+        raise _unavailable(exc) from exc
+    if outcome is None:
+        return {"status": "queued", "outcome": None}
     return {"status": "ok", "outcome": outcome}
 
+@app.post("/policy/outcomes:batch", response_model=OutcomeBatchResponse)
+async def policy_outcomes_batch(payload: list[dict[str, Any]] = Body(...)) -> OutcomeBatchResponse:
+    if len(payload) > MAX_OUTCOME_BATCH:
+        raise HTTPException(status_code=413, detail=f"batch exceeds {MAX_OUTCOME_BATCH} outcomes")
+    items: list[OutcomeBatchItem] = []
+    valid: list[dict[str, Any]] = []
+    for index, raw in enumerate(payload):
+        try:
+            inp = OutcomeIn.model_validate(raw)
+        except ValidationError as exc:
+            items.append(OutcomeBatchItem(index=index, status="invalid", detail=str(exc.errors()[0]["msg"])))
+            continue
+        outcome = inp.model_dump()
+        outcome["metrics"] = inp.metrics.root if inp.metrics is not None else None
+        valid.append(outcome)
+        items.append(OutcomeBatchItem(index=index, status="pending"))
+    service = _async_service()
+    try:
+        rows = await service.update_outcomes(valid)
+    except IngestUnavailable as exc:
+        raise _unavailable(exc) from exc
+    applied = "queued" if service.service.durability == "group" else "ok"
+    for item in items:
+        if item.status == "pending":
+            item.status = applied
+    return OutcomeBatchResponse(
+        status=applied if valid else "rejected",
+        accepted=len(valid),
+        rejected=len(items) - len(valid),
+        rows=rows,
+        items=items,
+    )
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _best_response(
+    service: PolicyService, if_none_match: str | None, user_id: str, exercise_id: str, k: int, profile: str | None
+) -> Response:
+    version = service.version(user_id, exercise_id)
+    # Derived from the database version, so every worker process agrees on it.
+    tag = hashlib.blake2b(f"{user_id}\0{exercise_id}\0{profile}\0{k}".encode(), digest_size=8).hexdigest()
+    etag = f'"{tag}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    cache = service.cache
+    key = (user_id, exercise_id, profile, k)
+    body = cache.get(key, version) if cache is not None else None
+    if body is None:
+        ranked = service.topk(user_id, exercise_id, k=k, profile=profile)
+        body = PolicyBestResponse(
+            user_id=user_id,
+            exercise_id=exercise_id,
+            profile=profile,
+            recommendations=[RankedCue(cue_text=c, score=s) for c, s in ranked],
+        ).model_dump_json().encode()
+        if cache is not None:
+            cache.put(key, body, len(body), version)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/policy/best/{user_id}/{exercise_id}", response_model=PolicyBestResponse)
-def policy_best(
+async def policy_best(
+    request: Request,
     user_id: str,
     exercise_id: str,
     k: int = Query(3, ge=1, le=10),
     profile: str | None = Query(default=None, description="Optional profile label for filtering"),
 ):
-    ranked = _service().topk(user_id, exercise_id, k=k, profile=profile)
-    return PolicyBestResponse(
-        user_id=user_id,
-        exercise_id=exercise_id,
-        profile=profile,
-        recommendations=[RankedCue(cue_text=c, score=s) for c, s in ranked],
-    )
+    service = _async_service()
+    try:
+        # Version check, cache lookup and ranking share one trip to the DB executor.
+        return await service.run(
+            _best_response, service.service, request.headers.get("if-none-match"), user_id, exercise_id, k, profile
+        )
+    except IngestUnavailable as exc:
+        raise _unavailable(exc) from exc
+
+
+def _best_lines(
+    pairs: list[tuple[str, str]], ranked: list[list[tuple[str, float]]], profile: str | None
+) -> Iterator[bytes]:
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for start in range(0, len(pairs), NDJSON_CHUNK_LINES):
+        yield "".join(
+            encode({
+                "user_id": user_id,
+                "exercise_id": exercise_id,
+                "profile": profile,
+                "recommendations": [{"cue_text": c, "score": s} for c, s in best],
+            }) + "\n"
+            for (user_id, exercise_id), best in zip(
+                pairs[start:start + NDJSON_CHUNK_LINES], ranked[start:start + NDJSON_CHUNK_LINES]
+            )
+        ).encode()
+
+
+@app.post("/policy/best:batch", response_class=StreamingResponse)
+async def policy_best_batch(payload: PolicyBestBatchRequest) -> StreamingResponse:
+    """Top-``k`` cues for many (user, exercise) pairs as NDJSON, one line per pair in request order."""
+    if len(payload.pairs) > MAX_BEST_BATCH:
+        raise HTTPException(status_code=413, detail=f"batch exceeds {MAX_BEST_BATCH} pairs")
+    pairs = [(p.user_id, p.exercise_id) for p in payload.pairs]
+    try:
+        ranked = await _async_service().topk_many(pairs, k=payload.k, profile=payload.profile)
+    except IngestUnavailable as exc:
+        raise _unavailable(exc) from exc
+    return StreamingResponse(_best_lines(pairs, ranked, payload.profile), media_type="application/x-ndjson")
+
+
+@app.get("/policy/export", response_class=StreamingResponse)
+async def policy_export(
+    since: int = Query(0, ge=0, description="Only rows changed at or after this watermark (ms since epoch)"),
+    page_size: int = Query(1000, ge=1, le=10_000),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+) -> StreamingResponse:
+    """Stream ``cue_stats`` as NDJSON; ``X-Export-Watermark`` is the ``since`` for the next incremental run."""
+    service = _async_service()
+    db = service.service.db
+    try:
+        watermark = await service.run(export_watermark, db, since)
+    except IngestUnavailable as exc:
+        raise _unavailable(exc) from exc
+    chunks = ndjson_chunks(iter_export(db, since=since, page_size=page_size), compress=gzip)
+
+    async def body() -> AsyncIterator[bytes]:
+        while True:
+            try:
+                chunk = await service.run(next, chunks, None)
+            except ServiceOverloaded:
+                continue  # headers are out; wait for a slot rather than truncate the stream
+            if chunk is None:
+                return
+            yield chunk
+
+    headers = {"X-Export-Watermark": str(watermark)}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers=headers)
 
 _setup_metrics(app)
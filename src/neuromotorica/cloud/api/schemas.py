@@ -33,6 +33,20 @@ class OutcomeIn(BaseModel):
     profile: str | None = Field(default=None, description="Optional pathology/profile label for the session.")
 
 
+class OutcomeBatchItem(BaseModel):
+    index: int
+    status: str = Field(..., description="'ok', 'queued' or 'invalid'.")
+    detail: str | None = Field(default=None, description="Validation error for rejected items.")
+
+
+class OutcomeBatchResponse(BaseModel):
+    status: str
+    accepted: int
+    rejected: int
+    rows: int = Field(..., description="Distinct (user, exercise, profile, cue) rows written or queued.")
+    items: list[OutcomeBatchItem]
+
+
 class RankedCue(BaseModel):
     cue_text: str
     score: float
@@ -43,3 +57,14 @@ class PolicyBestResponse(BaseModel):
     exercise_id: str
     profile: str | None = Field(default=None)
     recommendations: list[RankedCue]
+
+
+class PolicyPair(BaseModel):
+    user_id: str = Field(..., min_length=1)
+    exercise_id: str = Field(..., min_length=1)
+
+
+class PolicyBestBatchRequest(BaseModel):
+    pairs: list[PolicyPair]
+    k: int = Field(default=3, ge=1, le=10)
+    profile: str | None = Field(default=None, description="Optional profile label applied to every pair.")
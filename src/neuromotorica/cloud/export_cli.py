@@ -0,0 +1,47 @@
+"""``neuromotorica policy-export``: stream the policy table to NDJSON while the API keeps writing."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+
+import typer
+
+from .api.db import ConnectionManager, ShardedConnectionManager
+from .services.policy_export import export_watermark, iter_export, ndjson_chunks
+
+
+def main(
+    source: pathlib.Path = typer.Argument(..., help="Policy database file or sharded directory"),
+    out: str = typer.Option("-", "--out", "-o", help="Output file, '-' for stdout"),
+    since: int = typer.Option(0, "--since", min=0, help="Watermark printed by the previous export"),
+    gzip: bool = typer.Option(False, "--gzip", help="Write a gzip stream"),
+    page_size: int = typer.Option(1000, "--page-size", min=1),
+):
+    """Export cue_stats as NDJSON with keyset pagination; prints the watermark for the next --since."""
+    if not source.exists():
+        typer.echo(f"{source} does not exist", err=True)
+        raise typer.Exit(code=2)
+    db = ShardedConnectionManager.open(source) if source.is_dir() else ConnectionManager(source)
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for row in iter_export(db, since=since, page_size=page_size):
+            rows += 1
+            yield row
+
+    try:
+        watermark = export_watermark(db, since)
+        sink = sys.stdout.buffer if out == "-" else open(out, "wb")
+        try:
+            for chunk in ndjson_chunks(counted(), compress=gzip):
+                sink.write(chunk)
+            sink.flush()
+        finally:
+            if sink is not sys.stdout.buffer:
+                sink.close()
+    finally:
+        db.close()
+    typer.echo(json.dumps({"rows": rows, "since": since, "watermark": watermark}), err=out == "-")
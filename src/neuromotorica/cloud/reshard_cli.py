@@ -0,0 +1,28 @@
+"""``neuromotorica policy-reshard``: offline copy of the policy database into N hash shards."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+
+import typer
+
+from .api.db import reshard
+
+
+def main(
+    source: pathlib.Path = typer.Argument(..., help="Policy database file or sharded directory"),
+    target: pathlib.Path = typer.Argument(..., help="New directory for the resharded store"),
+    shards: int = typer.Option(4, "--shards", "-n", min=1),
+    chunk_rows: int = typer.Option(5000, "--chunk-rows", min=1),
+):
+    """Reshard the policy database while the API is stopped; point NEUROMOTORICA_POLICY_DB at the target."""
+    if not source.exists():
+        typer.echo(f"{source} does not exist")
+        raise typer.Exit(code=2)
+    try:
+        counts = reshard(source, target, shards, chunk_rows=chunk_rows)
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=2)
+    typer.echo(json.dumps({"target": str(target), "shards": shards, "rows": counts}))
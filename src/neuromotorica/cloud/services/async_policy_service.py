@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from .policy_service import IngestUnavailable, PolicyService
+
+T = TypeVar("T")
+
+
+class ServiceOverloaded(IngestUnavailable):
+    """Raised when no request slot frees up within ``acquire_timeout_s``."""
+
+
+class AsyncPolicyService:
+    """Awaitable facade over :class:`PolicyService`.
+
+    Blocking SQLite calls run on a dedicated executor of ``max_workers``
+    threads, so they never occupy the event loop or Starlette's shared
+    threadpool. At most ``max_concurrency`` calls are admitted at once; a call
+    that cannot get a slot within ``acquire_timeout_s`` raises
+    :class:`ServiceOverloaded` (the API answers 503) instead of queueing
+    without bound, which is what keeps tail latency flat under bursts.
+    """
+
+    def __init__(
+        self,
+        service: PolicyService,
+        *,
+        max_workers: int = 8,
+        max_concurrency: int = 64,
+        acquire_timeout_s: float = 1.0,
+    ):
+        if max_workers < 1 or max_concurrency < 1:
+            raise ValueError("max_workers and max_concurrency must be >= 1")
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self.acquire_timeout_s = acquire_timeout_s
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="policy-db")
+        # asyncio primitives bind to one loop; tests and embedded servers may use several.
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the DB executor within the concurrency limit."""
+        sem = self._semaphore()
+        try:
+            await asyncio.wait_for(sem.acquire(), self.acquire_timeout_s)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ServiceOverloaded("policy service is overloaded; retry later") from None
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            sem.release()
+
+    async def update_outcome(self, *args: Any, **kwargs: Any) -> dict[str, Any] | None:
+        return await self.run(self.service.update_outcome, *args, **kwargs)
+
+    async def update_outcomes(self, outcomes: list[dict[str, Any]]) -> int:
+        return await self.run(self.service.update_outcomes, outcomes)
+
+    async def topk(self, user_id: str, exercise_id: str, **kwargs: Any) -> list[tuple[str, float]]:
+        return await self.run(self.service.topk, user_id, exercise_id, **kwargs)
+
+    async def topk_many(self, pairs: list[tuple[str, str]], **kwargs: Any) -> list[list[tuple[str, float]]]:
+        return await self.run(self.service.topk_many, pairs, **kwargs)
+
+    async def get_outcome(self, user_id: str, exercise_id: str, cue_text: str, **kwargs: Any) -> dict[str, Any] | None:
+        return await self.run(self.service.get_outcome, user_id, exercise_id, cue_text, **kwargs)
+
+    def close(self) -> None:
+        """Wait for in-flight calls and stop the executor (the wrapped service stays open)."""
+        self._executor.shutdown(wait=True)
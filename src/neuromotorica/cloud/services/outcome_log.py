@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import sqlite3
+import struct
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from ..api.db import NOW_MS_SQL, ConnectionManager, ShardedConnectionManager, shard_index
+
+LOGGER = logging.getLogger(__name__)
+
+DAY_MS = 86_400_000
+
+# Metric blobs start with the dictionary ids of their n metrics (uint32, see ``metric_names``):
+# events then hold n float64 values; daily rollups hold n uint32 counts and n float64 sums, minima, maxima.
+EVENT_RECORD = 12
+DAILY_RECORD = 32
+
+EVENT_COLUMNS = ("ts", "user_id", "exercise_id", "profile", "cue_text", "success", "reps", "extended", "metrics")
+DAILY_COLUMNS = ("user_id", "exercise_id", "profile", "cue_text", "day", "events", "success", "reps", "metrics")
+
+INSERT_EVENT_SQL = f"""
+    INSERT INTO outcome_events(ts, user_id, exercise_id, profile, cue_text, success, reps, extended, metrics)
+    VALUES ({NOW_MS_SQL}, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_DAILY_SQL = """
+    INSERT OR REPLACE INTO outcome_daily(user_id, exercise_id, profile, cue_text, day, events, success, reps, metrics)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def metric_ids(conn: sqlite3.Connection, names: Iterable[str]) -> dict[str, int]:
+    """Dictionary ids of ``names`` in this database, registering new ones; call inside the write transaction."""
+    names = sorted(set(names))
+    if not names:
+        return {}
+    conn.executemany("INSERT OR IGNORE INTO metric_names(name) VALUES (?)", [(n,) for n in names])
+    ids: dict[str, int] = {}
+    for start in range(0, len(names), 500):
+        part = names[start:start + 500]
+        query = f"SELECT name, id FROM metric_names WHERE name IN ({', '.join('?' * len(part))})"
+        ids.update((row[0], row[1]) for row in conn.execute(query, part))
+    return ids
+
+
+def metric_names(conn: sqlite3.Connection) -> dict[int, str]:
+    return {row[0]: row[1] for row in conn.execute("SELECT id, name FROM metric_names")}
+
+
+def pack_metrics(metrics: Mapping[str, float] | None, ids: Mapping[str, int]) -> bytes | None:
+    if metrics is None:
+        return None
+    n = len(metrics)
+    return struct.pack(f"<{n}I{n}d", *(ids[name] for name in metrics), *metrics.values())
+
+
+def unpack_metrics(blob: bytes | None, names: Mapping[int, str]) -> dict[str, float] | None:
+    if blob is None:
+        return None
+    n = len(blob) // EVENT_RECORD
+    values = struct.unpack(f"<{n}I{n}d", blob)
+    return {names[i]: v for i, v in zip(values[:n], values[n:])}
+
+
+def _pack_daily(stats: Mapping[int, list]) -> bytes:
+    n = len(stats)
+    columns = list(zip(*stats.values())) if n else [(), (), (), ()]
+    return struct.pack(f"<{n}I{n}I{n}d{n}d{n}d", *stats, *columns[0], *columns[1], *columns[2], *columns[3])
+
+
+def _unpack_daily(blob: bytes | None) -> dict[int, list]:
+    if not blob:
+        return {}
+    n = len(blob) // DAILY_RECORD
+    values = struct.unpack(f"<{n}I{n}I{n}d{n}d{n}d", blob)
+    return {values[i]: [values[n + i], values[2 * n + i], values[3 * n + i], values[4 * n + i]] for i in range(n)}
+
+
+def _remap(blob: bytes | None, record: int, mapping: Mapping[int, int]) -> bytes | None:
+    """Rewrite the leading metric ids of ``blob`` through ``mapping``."""
+    if blob is None:
+        return None
+    n = len(blob) // record
+    return struct.pack(f"<{n}I", *(mapping[i] for i in struct.unpack_from(f"<{n}I", blob))) + blob[4 * n:]
+
+
+def log_events(conn: sqlite3.Connection, rows: Sequence[tuple]) -> None:
+    """Append one ``outcome_events`` row per raw outcome row (the :class:`PolicyService` row layout)."""
+    ids = metric_ids(conn, {name for row in rows if row[7] for name in row[7]})
+    conn.executemany(
+        INSERT_EVENT_SQL,
+        [(r[0], r[1], r[2], r[3], r[4], r[6], r[8], pack_metrics(r[7], ids)) for r in rows],
+    )
+
+
+def _add_event(agg: list, success: int, reps: int | None, blob: bytes | None) -> None:
+    agg[0] += 1
+    agg[1] += success
+    agg[2] += reps or 0
+    if blob is None:
+        return
+    n = len(blob) // EVENT_RECORD
+    values = struct.unpack(f"<{n}I{n}d", blob)
+    stats = agg[3]
+    for metric, value in zip(values[:n], values[n:]):
+        s = stats.get(metric)
+        if s is None:
+            stats[metric] = [1, value, value, value]
+        else:
+            s[0] += 1
+            s[1] += value
+            s[2] = min(s[2], value)
+            s[3] = max(s[3], value)
+
+
+def _merge_daily(agg: list, row: sqlite3.Row) -> None:
+    agg[0] += row[0]
+    agg[1] += row[1]
+    agg[2] += row[2]
+    for metric, (count, total, low, high) in _unpack_daily(row[3]).items():
+        s = agg[3].get(metric)
+        if s is None:
+            agg[3][metric] = [count, total, low, high]
+        else:
+            s[0] += count
+            s[1] += total
+            s[2] = min(s[2], low)
+            s[3] = max(s[3], high)
+
+
+def _compact_chunk(conn: sqlite3.Connection, cutoff_ms: int, chunk_rows: int) -> int:
+    rows = conn.execute(
+        """
+        SELECT id, ts, user_id, exercise_id, profile, cue_text, success, reps, metrics
+        FROM outcome_events WHERE ts < ? ORDER BY id LIMIT ?
+        """,
+        (cutoff_ms, chunk_rows),
+    ).fetchall()
+    if not rows:
+        return 0
+    daily: dict[tuple, list] = {}
+    for row in rows:
+        key = (row[2], row[3], row[4], row[5], row[1] // DAY_MS)
+        agg = daily.get(key)
+        if agg is None:
+            agg = daily[key] = [0, 0, 0, {}]
+        _add_event(agg, row[6], row[7], row[8])
+    for key, agg in daily.items():
+        existing = conn.execute(
+            """
+            SELECT events, success, reps, metrics FROM outcome_daily
+            WHERE user_id=? AND exercise_id=? AND profile=? AND cue_text=? AND day=?
+            """,
+            key,
+        ).fetchone()
+        if existing is not None:
+            _merge_daily(agg, existing)
+    conn.executemany(UPSERT_DAILY_SQL, [(*key, a[0], a[1], a[2], _pack_daily(a[3])) for key, a in daily.items()])
+    # Every event before the cutoff up to the last id was in this chunk (it was read in id order).
+    conn.execute("DELETE FROM outcome_events WHERE id <= ? AND ts < ?", (rows[-1][0], cutoff_ms))
+    return len(rows)
+
+
+def compact(
+    db: ConnectionManager | ShardedConnectionManager,
+    *,
+    retention_s: float,
+    now_ms: int | None = None,
+    chunk_rows: int = 5000,
+    daily_retention_days: int | None = None,
+) -> dict[str, int]:
+    """Roll events older than ``retention_s`` into ``outcome_daily`` and delete them.
+
+    Each chunk of ``chunk_rows`` events is aggregated, merged into its days and
+    removed in one short write transaction, so ingestion is only paused per
+    chunk and a crash never counts an event twice. With
+    ``daily_retention_days`` older daily rollups are dropped as well.
+    """
+    if now_ms is None:
+        now_ms = int(dt.datetime.now(dt.timezone.utc).timestamp() * 1000)
+    cutoff_ms = now_ms - int(retention_s * 1000)
+    compacted = pruned = 0
+    for shard in db.shards():
+        while True:
+            with shard.writer() as conn:
+                with conn:
+                    done = _compact_chunk(conn, cutoff_ms, chunk_rows)
+            compacted += done
+            if done < chunk_rows:
+                break
+        if daily_retention_days is not None:
+            with shard.writer() as conn:
+                with conn:
+                    pruned += conn.execute(
+                        "DELETE FROM outcome_daily WHERE day < ?", (now_ms // DAY_MS - daily_retention_days,)
+                    ).rowcount
+    return {"compacted": compacted, "daily_pruned": pruned}
+
+
+def outcome_history(
+    db: ConnectionManager | ShardedConnectionManager,
+    user_id: str,
+    exercise_id: str,
+    *,
+    profile: str | None = None,
+) -> list[dict[str, Any]]:
+    """Per-day outcome history of a (user, exercise), from rollups and not yet compacted events.
+
+    Entries are in day order; each has ``day`` (ISO date), ``profile``, ``cue_text``, ``events``,
+    ``success``, ``failure``, summed ``reps`` and per-metric
+    ``count``/``mean``/``min``/``max``. ``profile=None`` lists every profile.
+    Raw events are not indexed by user, so this scans the retention window.
+    """
+    where = "user_id=? AND exercise_id=?" + (" AND profile=?" if profile is not None else "")
+    params = (user_id, exercise_id) + ((profile.strip(),) if profile is not None else ())
+    daily: dict[tuple, list] = {}
+    with db.route(user_id).reader() as conn:
+        for row in conn.execute(
+            f"SELECT profile, cue_text, day, events, success, reps, metrics FROM outcome_daily WHERE {where}", params
+        ):
+            agg = daily[(row[0], row[1], row[2])] = [0, 0, 0, {}]
+            _merge_daily(agg, row[3:])
+        for row in conn.execute(
+            f"SELECT profile, cue_text, ts, success, reps, metrics FROM outcome_events WHERE {where}", params
+        ):
+            key = (row[0], row[1], row[2] // DAY_MS)
+            agg = daily.get(key)
+            if agg is None:
+                agg = daily[key] = [0, 0, 0, {}]
+            _add_event(agg, row[3], row[4], row[5])
+        names = metric_names(conn)
+    return [
+        {
+            "day": (dt.date(1970, 1, 1) + dt.timedelta(days=day)).isoformat(),
+            "profile": profile_key or None,
+            "cue_text": cue_text,
+            "events": agg[0],
+            "success": agg[1],
+            "failure": agg[0] - agg[1],
+            "reps": agg[2],
+            "metrics": {
+                names[m]: {"count": s[0], "mean": s[1] / s[0], "min": s[2], "max": s[3]} for m, s in agg[3].items()
+            },
+        }
+        for (profile_key, cue_text, day), agg in sorted(daily.items(), key=lambda item: (item[0][2], item[0][:2]))
+    ]
+
+
+def copy_history(
+    source: ConnectionManager, target: ShardedConnectionManager, *, chunk_rows: int = 5000
+) -> int:
+    """Copy ``outcome_events`` and ``outcome_daily`` of one source shard into ``target`` (used by reshard).
+
+    Metric ids are dictionary ids local to each database, so blobs are remapped.
+    """
+    shards = target.shards()
+    with source.reader() as conn:
+        names = metric_names(conn)
+    copied = 0
+    for table, columns, record, user_col in (
+        ("outcome_events", EVENT_COLUMNS, EVENT_RECORD, 1),
+        ("outcome_daily", DAILY_COLUMNS, DAILY_RECORD, 0),
+    ):
+        insert = f"INSERT INTO {table}({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with source.reader() as conn:
+            # Events keep their append order; rollups come in primary-key order.
+            cur = conn.execute(f"SELECT {', '.join(columns)} FROM {table}")
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                routed: dict[int, list[tuple]] = {}
+                for row in rows:
+                    routed.setdefault(shard_index(row[user_col], len(shards)), []).append(tuple(row))
+                for index, part in routed.items():
+                    with shards[index].writer() as out:
+                        with out:
+                            ids = metric_ids(out, names.values())
+                            mapping = {i: ids[name] for i, name in names.items()}
+                            out.executemany(insert, [(*r[:-1], _remap(r[-1], record, mapping)) for r in part])
+                    copied += len(part)
+    return copied
+
+
+class OutcomeCompactor:
+    """Background thread that runs :func:`compact` every ``interval_s`` seconds."""
+
+    def __init__(
+        self,
+        db: ConnectionManager | ShardedConnectionManager,
+        *,
+        retention_s: float = 30 * 86_400,
+        interval_s: float = 3600.0,
+        daily_retention_days: int | None = None,
+        chunk_rows: int = 5000,
+    ):
+        self.db = db
+        self.retention_s = retention_s
+        self.interval_s = interval_s
+        self.daily_retention_days = daily_retention_days
+        self.chunk_rows = chunk_rows
+        self.last_result: dict[str, int] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> dict[str, int]:
+        self.last_result = compact(
+            self.db,
+            retention_s=self.retention_s,
+            chunk_rows=self.chunk_rows,
+            daily_retention_days=self.daily_retention_days,
+        )
+        return self.last_result
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                result = self.run_once()
+            except Exception:
+                LOGGER.exception("Outcome log compaction failed; retrying in %.0f s", self.interval_s)
+            else:
+                if result["compacted"] or result["daily_pruned"]:
+                    LOGGER.info("Compacted %(compacted)d outcome events, pruned %(daily_pruned)d daily rows", result)
+
+    def start(self) -> "OutcomeCompactor":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="policy-compactor", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the thread; a compaction in progress finishes its current run first."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from ..api.db import ConnectionManager, ShardedConnectionManager
+
+EXPORT_COLUMNS = (
+    "user_id", "exercise_id", "profile", "cue_text", "success", "failure", "reps", "metrics", "extended", "updated_at"
+)
+
+_SELECT = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM cue_stats"
+_ORDER = "ORDER BY user_id, exercise_id, profile, cue_text LIMIT ?"
+FIRST_PAGE_SQL = f"{_SELECT} WHERE updated_at >= ? {_ORDER}"
+NEXT_PAGE_SQL = f"{_SELECT} WHERE (user_id, exercise_id, profile, cue_text) > (?, ?, ?, ?) AND updated_at >= ? {_ORDER}"
+
+
+def export_watermark(db: ConnectionManager | ShardedConnectionManager, since: int = 0) -> int:
+    """``since`` value for the next incremental export, to be read *before* :func:`iter_export` starts.
+
+    SQLite serializes the transactions of a database file and stamps
+    ``updated_at`` while the write lock is held, so any write not yet visible
+    here gets a stamp at or above the newest visible one. Taking the minimum
+    over shards (an empty shard keeps ``since``) therefore never skips a row;
+    rows changed during the export may be exported twice, which consumers
+    absorb by upserting on the primary key.
+    """
+    bounds = []
+    for shard in db.shards():
+        with shard.reader() as conn:
+            newest = conn.execute("SELECT MAX(updated_at) FROM cue_stats").fetchone()[0]
+        bounds.append(since if newest is None else max(int(newest), since))
+    return min(bounds, default=since)
+
+
+def iter_export(
+    db: ConnectionManager | ShardedConnectionManager, *, since: int = 0, page_size: int = 1000
+) -> Iterator[dict[str, Any]]:
+    """Rows of ``cue_stats`` with ``updated_at >= since``, shard by shard in primary-key order.
+
+    Each page of ``page_size`` rows is a separate short read that resumes
+    after the last key of the previous page, so memory stays constant and no
+    snapshot is held open while the consumer is slow.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be >= 1")
+    for shard in db.shards():
+        last: tuple | None = None
+        while True:
+            with shard.reader() as conn:
+                if last is None:
+                    rows = conn.execute(FIRST_PAGE_SQL, (since, page_size)).fetchall()
+                else:
+                    rows = conn.execute(NEXT_PAGE_SQL, (*last, since, page_size)).fetchall()
+            for row in rows:
+                yield {
+                    "user_id": row[0],
+                    "exercise_id": row[1],
+                    "profile": row[2] or None,
+                    "cue_text": row[3],
+                    "success": row[4],
+                    "failure": row[5],
+                    "reps": row[6],
+                    "metrics": json.loads(row[7]) if row[7] else None,
+                    "extended": bool(row[8]) if row[8] is not None else False,
+                    "updated_at": row[9],
+                }
+            if len(rows) < page_size:
+                break
+            last = tuple(rows[-1][:4])
+
+
+def ndjson_chunks(
+    rows: Iterable[dict[str, Any]], *, compress: bool = False, chunk_lines: int = 500
+) -> Iterator[bytes]:
+    """Encode ``rows`` as NDJSON in chunks of ``chunk_lines`` lines, optionally as one gzip stream."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    gz = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    lines: list[str] = []
+
+    def emit() -> bytes:
+        data = "".join(lines).encode()
+        lines.clear()
+        return gz.compress(data) if gz is not None else data
+
+    for row in rows:
+        lines.append(encode(row) + "\n")
+        if len(lines) >= chunk_lines:
+            chunk = emit()
+            if chunk:
+                yield chunk
+    tail = emit()
+    if gz is not None:
+        tail += gz.flush()
+    if tail:
+        yield tail
@@ -1,14 +1,146 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Mapping
+import logging
+import queue
 import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
 from typing import Any
 
+import numpy as np
+
+from ..api.db import NOW_MS_SQL, ConnectionManager, ShardedConnectionManager
+from .outcome_log import log_events
+from .ranked_cache import RankedCache
+
+LOGGER = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("commit", "group")
+
+UPSERT_SQL = f"""
+    INSERT INTO cue_stats(user_id, exercise_id, profile, cue_text, success, failure, reps, metrics, extended, updated_at)
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, {NOW_MS_SQL})
+    ON CONFLICT(user_id, exercise_id, profile, cue_text) DO UPDATE SET
+      success = cue_stats.success + excluded.success,
+      failure = cue_stats.failure + excluded.failure,
+      reps = COALESCE(excluded.reps, cue_stats.reps),
+      metrics = COALESCE(excluded.metrics, cue_stats.metrics),
+      extended = CASE
+          WHEN excluded.extended IS NULL THEN cue_stats.extended
+          ELSE excluded.extended
+      END,
+      updated_at = excluded.updated_at
+"""
+
+# Requested pairs arrive as one JSON array bound to ``?``; ``key`` is the pair's
+# position, so rows map back to requests without a temp table (readers are query-only).
+_PAIRS_CTE = """
+    WITH req(idx, user_id, exercise_id) AS (
+        SELECT key, json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)
+    )
+"""
+
+BATCH_TOTALS_SQL = _PAIRS_CTE + """
+    SELECT req.idx, t.cue_text, t.success, t.failure
+    FROM req JOIN cue_totals AS t ON t.user_id = req.user_id AND t.exercise_id = req.exercise_id
+    ORDER BY req.idx, t.cue_text
+"""
+
+BATCH_PROFILE_SQL = _PAIRS_CTE + """
+    , own AS (
+        SELECT req.idx, s.cue_text, s.success, s.failure
+        FROM req JOIN cue_stats AS s
+          ON s.user_id = req.user_id AND s.exercise_id = req.exercise_id AND s.profile = ?
+    )
+    SELECT idx, cue_text, success, failure FROM own
+    UNION ALL
+    SELECT req.idx, t.cue_text, t.success, t.failure
+    FROM req JOIN cue_totals AS t ON t.user_id = req.user_id AND t.exercise_id = req.exercise_id
+    WHERE req.idx NOT IN (SELECT idx FROM own)
+    ORDER BY 1, 2
+"""
+
+
+class IngestUnavailable(RuntimeError):
+    """The service cannot accept outcomes right now."""
+
+
+class IngestQueueFull(IngestUnavailable):
+    """Raised when the write-behind queue stays full for longer than ``put_timeout_s``."""
+
+
+class IngestClosed(IngestUnavailable):
+    """Raised when outcomes are submitted after :meth:`PolicyService.close`."""
+
+
+class IngestWriteError(RuntimeError):
+    """Raised by :meth:`PolicyService.flush` when queued outcomes could not be written."""
+
 
 class PolicyService:
-    def __init__(self, conn: sqlite3.Connection):
-        self.conn = conn
+    """Cue statistics store.
+
+    ``durability="commit"`` upserts and commits on every outcome.
+    ``durability="group"`` enqueues outcomes into a bounded in-memory queue; a
+    background writer applies them in one transaction per batch once
+    ``batch_size`` rows are pending or ``flush_interval_s`` has passed. Reads
+    lag group-mode writes by at most one flush interval; :meth:`flush` and
+    :meth:`close` drain the queue. A batch that fails is retried
+    ``max_retries`` times with exponential backoff; if it still fails its rows
+    are kept in :attr:`dead_letters` and the next :meth:`flush` raises
+    :class:`IngestWriteError`. An optional :class:`RankedCache` is
+    invalidated for every (user, exercise) pair once its write is committed.
+
+    Every outcome is also appended to ``outcome_events`` in the same
+    transaction (see :mod:`.outcome_log`), so per-rep history survives the
+    in-place counter updates of ``cue_stats``.
+
+    ``db`` is a :class:`ConnectionManager` or a
+    :class:`ShardedConnectionManager`; a bare connection is wrapped in a shared
+    single-connection manager. Every query is routed by ``user_id``.
+    """
+
+    def __init__(
+        self,
+        db: ConnectionManager | ShardedConnectionManager | sqlite3.Connection,
+        *,
+        durability: str = "commit",
+        batch_size: int = 256,
+        flush_interval_s: float = 0.05,
+        max_queue: int = 10_000,
+        put_timeout_s: float | None = 1.0,
+        cache: RankedCache | None = None,
+        max_retries: int = 3,
+        retry_backoff_s: float = 0.05,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}")
+        if batch_size < 1 or max_queue < 1:
+            raise ValueError("batch_size and max_queue must be >= 1")
+        self.db = ConnectionManager.from_connection(db) if isinstance(db, sqlite3.Connection) else db
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.put_timeout_s = put_timeout_s
+        self.cache = cache
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.failed_batches = 0
+        self.dead_letters: list[tuple] = []
+        self._closed = False
+        self._queue: queue.Queue[list[tuple] | None] | None = None
+        self._writer: threading.Thread | None = None
+        if durability == "group":
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._writer = threading.Thread(target=self._write_loop, name="policy-writer", daemon=True)
+            self._writer.start()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Writer connection of an unsharded store."""
+        return self.db.connection
 
     def _normalize_profile(self, profile: str | None) -> str | None:
         if profile is None:
@@ -27,40 +159,218 @@ class PolicyService:
         metrics: Mapping[str, float] | None = None,
         extended: bool | None = None,
         profile: str | None = None,
-    ) -> dict[str, Any]:
-        cur = self.conn.cursor()
-        metrics_json = json.dumps(dict(metrics)) if metrics is not None else None
+    ) -> dict[str, Any] | None:
+        """Record one outcome; returns the updated row, or ``None`` when queued in group mode."""
+        self._check_open()
+        row = self._outcome_row(user_id, exercise_id, cue_text, success, reps, metrics, extended, profile)
+        if self._queue is not None:
+            self._enqueue([row])
+            return None
+        self._write([row])
+        self._invalidate([row])
+        return self.get_outcome(user_id, exercise_id, cue_text, profile=profile)
+
+    def update_outcomes(self, outcomes: Iterable[Mapping[str, Any]]) -> int:
+        """Record many outcomes at once; returns the number of distinct cue rows touched.
+
+        Outcomes are pre-aggregated per (user, exercise, profile, cue) when
+        written (see :meth:`_aggregate`), so each row is upserted once. In
+        commit mode the rows are written in a single transaction; in group
+        mode the whole batch is queued atomically.
+        """
+        self._check_open()
+        rows = [
+            self._outcome_row(
+                o["user_id"],
+                o["exercise_id"],
+                o["cue_text"],
+                o["success"],
+                o.get("reps"),
+                o.get("metrics"),
+                o.get("extended"),
+                o.get("profile"),
+            )
+            for o in outcomes
+        ]
+        if not rows:
+            return 0
+        touched = len({row[:4] for row in rows})
+        if self._queue is not None:
+            self._enqueue(rows)
+            return touched
+        self._write(rows)
+        self._invalidate(rows)
+        return touched
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise IngestClosed("policy service is shut down")
+
+    def _enqueue(self, rows: list[tuple]) -> None:
+        assert self._queue is not None
+        try:
+            self._queue.put(rows, timeout=self.put_timeout_s)
+        except queue.Full:
+            raise IngestQueueFull("policy outcome queue is full; retry later") from None
+
+    def _outcome_row(
+        self,
+        user_id: str,
+        exercise_id: str,
+        cue_text: str,
+        success: bool,
+        reps: int | None,
+        metrics: Mapping[str, float] | None,
+        extended: bool | None,
+        profile: str | None,
+    ) -> tuple:
         extended_flag: int | None = None if extended is None else int(extended)
         profile_key = self._normalize_profile(profile)
         db_profile = "" if profile_key is None else profile_key
-        cur.execute(
-            """
-            INSERT INTO cue_stats(user_id, exercise_id, profile, cue_text, success, failure, reps, metrics, extended)
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(user_id, exercise_id, profile, cue_text) DO UPDATE SET
-              success = cue_stats.success + excluded.success,
-              failure = cue_stats.failure + excluded.failure,
-              reps = COALESCE(excluded.reps, cue_stats.reps),
-              metrics = COALESCE(excluded.metrics, cue_stats.metrics),
-              extended = CASE
-                  WHEN excluded.extended IS NULL THEN cue_stats.extended
-                  ELSE excluded.extended
-              END
-        """,
-            (
-                user_id,
-                exercise_id,
-                db_profile,
-                cue_text,
-                1 if success else 0,
-                0 if success else 1,
-                reps,
-                metrics_json,
-                extended_flag,
-            ),
+        return (
+            user_id,
+            exercise_id,
+            db_profile,
+            cue_text,
+            1 if success else 0,
+            0 if success else 1,
+            reps,
+            dict(metrics) if metrics is not None else None,
+            extended_flag,
         )
-        self.conn.commit()
-        return self.get_outcome(user_id, exercise_id, cue_text, profile=profile_key)
+
+    @staticmethod
+    def _aggregate(rows: list[tuple]) -> list[tuple]:
+        """One upsert row per (user, exercise, profile, cue), as if ``rows`` were applied one by one.
+
+        Success/failure counts add up; ``reps``, ``metrics`` and ``extended``
+        keep the last non-null value.
+        """
+        grouped: dict[tuple, list] = {}
+        for row in rows:
+            agg = grouped.get(row[:4])
+            if agg is None:
+                grouped[row[:4]] = list(row)
+                continue
+            agg[4] += row[4]
+            agg[5] += row[5]
+            for i in (6, 7, 8):
+                if row[i] is not None:
+                    agg[i] = row[i]
+        return [(*r[:7], json.dumps(r[7]) if r[7] is not None else None, r[8]) for r in grouped.values()]
+
+    def _write(self, rows: list[tuple]) -> None:
+        """Upsert ``rows`` and log them as events, in one transaction per shard.
+
+        A failure leaves other shards committed.
+        """
+        for shard, part in self._by_shard(rows):
+            with shard.writer() as conn:
+                with conn:
+                    conn.executemany(UPSERT_SQL, self._aggregate(part))
+                    log_events(conn, part)
+
+    def _by_shard(self, rows: list[tuple]) -> list[tuple[ConnectionManager, list[tuple]]]:
+        routed: dict[int, tuple[ConnectionManager, list[tuple]]] = {}
+        for row in rows:
+            shard = self.db.route(row[0])
+            routed.setdefault(id(shard), (shard, []))[1].append(row)
+        return list(routed.values())
+
+    def _apply(self, rows: list[tuple]) -> None:
+        # Shards commit independently, so each one is retried on its own.
+        for _, part in self._by_shard(rows):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._write(part)
+                    break
+                except Exception:
+                    if attempt == self.max_retries:
+                        self.failed_batches += 1
+                        self.dead_letters.extend(part)
+                        LOGGER.exception("Dropped %d queued policy outcomes after %d attempts", len(part), attempt + 1)
+                        break
+                    LOGGER.warning("Writing %d queued policy outcomes failed; retrying", len(part), exc_info=True)
+                    time.sleep(self.retry_backoff_s * 2**attempt)
+            self._invalidate(part)
+
+    def _invalidate(self, rows: list[tuple]) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.invalidate({(r[0], r[1]) for r in rows})
+        except Exception:
+            LOGGER.exception("Ranked cache invalidation failed; clearing cache")
+            self.cache.clear()
+
+    def _write_loop(self) -> None:
+        assert self._queue is not None
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            taken = 1
+            batch: list[tuple] = []
+            deadline = time.monotonic() + self.flush_interval_s
+            while True:
+                if item is None:
+                    stop = True
+                else:
+                    batch.extend(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+            try:
+                if batch:
+                    self._apply(batch)
+            except Exception:  # pragma: no cover - _apply already contains its failures
+                LOGGER.exception("Policy writer failed on a batch of %d outcomes", len(batch))
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        """Queued submissions not yet handed to the writer (always 0 in commit mode)."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def flush(self) -> None:
+        """Block until every queued outcome has been handled.
+
+        Raises :class:`IngestWriteError` if any outcome was dropped since the
+        last flush; the rows stay available in :attr:`dead_letters`.
+        """
+        if self._queue is not None:
+            self._queue.join()
+        if self.failed_batches:
+            failed, self.failed_batches = self.failed_batches, 0
+            raise IngestWriteError(f"{failed} batch(es) of queued policy outcomes could not be written")
+
+    def close(self) -> None:
+        """Flush pending outcomes, stop the background writer and reject further writes."""
+        self._closed = True
+        if self._queue is None or self._writer is None:
+            return
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+        if self.failed_batches:
+            LOGGER.error("%d policy outcome batch(es) were not written before shutdown", self.failed_batches)
+
+    def version(self, user_id: str, exercise_id: str) -> int:
+        """Write counter of a (user, exercise) pair; changes whenever its cue statistics change."""
+        with self.db.route(user_id).reader() as conn:
+            row = conn.execute(
+                "SELECT version FROM cue_versions WHERE user_id=? AND exercise_id=?", (user_id, exercise_id)
+            ).fetchone()
+        return int(row[0]) if row is not None else 0
 
     def topk(
         self,
@@ -70,41 +380,28 @@ class PolicyService:
         k: int = 3,
         profile: str | None = None,
     ) -> list[tuple[str, float]]:
-        cur = self.conn.cursor()
         profile_key = self._normalize_profile(profile)
-        params = [user_id, exercise_id]
-        rows: list[sqlite3.Row]
-        if profile_key is not None:
-            cur.execute(
-                """
-                SELECT cue_text, success, failure FROM cue_stats
-                WHERE user_id=? AND exercise_id=? AND profile=?
-                """,
-                (*params, profile_key),
-            )
-            rows = cur.fetchall()
-            if not rows:
-                cur.execute(
+        params = (user_id, exercise_id)
+        with self.db.route(user_id).reader() as conn:
+            if profile_key is None:
+                rows = conn.execute(
+                    "SELECT cue_text, success, failure FROM cue_totals WHERE user_id=? AND exercise_id=?",
+                    params,
+                ).fetchall()
+            else:
+                # One statement: the profile's own rows, or the cross-profile totals when it has none.
+                rows = conn.execute(
                     """
-                    SELECT cue_text, SUM(success) AS success, SUM(failure) AS failure
-                    FROM cue_stats
-                    WHERE user_id=? AND exercise_id=?
-                    GROUP BY cue_text
+                    SELECT cue_text, success, failure FROM cue_stats
+                    WHERE user_id=? AND exercise_id=? AND profile=?
+                    UNION ALL
+                    SELECT cue_text, success, failure FROM cue_totals
+                    WHERE user_id=? AND exercise_id=? AND NOT EXISTS (
+                        SELECT 1 FROM cue_stats WHERE user_id=? AND exercise_id=? AND profile=?
+                    )
                     """,
-                    params,
-                )
-                rows = cur.fetchall()
-        else:
-            cur.execute(
-                """
-                SELECT cue_text, SUM(success) AS success, SUM(failure) AS failure
-                FROM cue_stats
-                WHERE user_id=? AND exercise_id=?
-                GROUP BY cue_text
-                """,
-                params,
-            )
-            rows = cur.fetchall()
+                    (*params, profile_key, *params, *params, profile_key),
+                ).fetchall()
 
         ranked = [
             (
@@ -116,6 +413,61 @@ class PolicyService:
         ranked.sort(key=lambda x: x[1], reverse=True)
         return ranked[:k]
 
+    def topk_many(
+        self,
+        pairs: Iterable[tuple[str, str]],
+        *,
+        k: int = 3,
+        profile: str | None = None,
+        chunk_size: int = 5000,
+    ) -> list[list[tuple[str, float]]]:
+        """:meth:`topk` for many (user, exercise) pairs, returned in request order.
+
+        Distinct pairs are resolved with one set-based query per shard and
+        ``chunk_size`` pairs, and ranked together in NumPy; ties keep
+        :meth:`topk`'s order.
+        """
+        pairs = [(str(u), str(e)) for u, e in pairs]
+        unique = list(dict.fromkeys(pairs))
+        profile_key = self._normalize_profile(profile)
+        routed: dict[int, tuple[ConnectionManager, list[int]]] = {}
+        for i, (user_id, _) in enumerate(unique):
+            shard = self.db.route(user_id)
+            routed.setdefault(id(shard), (shard, []))[1].append(i)
+        ranked: list[list[tuple[str, float]]] = [[] for _ in unique]
+        for shard, members in routed.values():
+            for start in range(0, len(members), chunk_size):
+                part = members[start:start + chunk_size]
+                payload = json.dumps([unique[i] for i in part])
+                with shard.reader() as conn:
+                    if profile_key is None:
+                        rows = conn.execute(BATCH_TOTALS_SQL, (payload,)).fetchall()
+                    else:
+                        rows = conn.execute(BATCH_PROFILE_SQL, (payload, profile_key)).fetchall()
+                for local, best in self._rank_rows(rows, k):
+                    ranked[part[local]] = best
+        position = {pair: i for i, pair in enumerate(unique)}
+        return [ranked[position[pair]] for pair in pairs]
+
+    @staticmethod
+    def _rank_rows(rows: list[tuple], k: int) -> Iterable[tuple[int, list[tuple[str, float]]]]:
+        """Top-``k`` per request index of ``(idx, cue_text, success, failure)`` rows sorted by idx."""
+        if not rows:
+            return []
+        idx, cues, success, failure = zip(*rows)
+        idx = np.asarray(idx, dtype=np.int64)
+        success = np.asarray(success, dtype=np.float64)
+        score = (success + 1.0) / (success + np.asarray(failure, dtype=np.float64) + 2.0)
+        # Stable sort by (idx, -score) keeps the SQL cue order among equal scores.
+        order = np.lexsort((-score, idx))
+        idx = idx[order]
+        starts = np.flatnonzero(np.r_[True, idx[1:] != idx[:-1]])
+        sizes = np.diff(np.r_[starts, idx.size])
+        kept = order[np.arange(idx.size) - np.repeat(starts, sizes) < k]
+        best = list(zip([cues[i] for i in kept.tolist()], score[kept].tolist()))
+        ends = np.minimum(sizes, k).cumsum().tolist()
+        return zip(idx[starts].tolist(), (best[a:b] for a, b in zip([0, *ends[:-1]], ends)))
+
     def get_outcome(
         self,
         user_id: str,
@@ -124,18 +476,19 @@ class PolicyService:
         *,
         profile: str | None = None,
     ) -> dict[str, Any] | None:
-        cur = self.conn.cursor()
-        profile_key = self._normalize_profile(profile)
-        db_profile = "" if profile_key is None else profile_key
-        cur.execute(
-            """
-            SELECT user_id, exercise_id, profile, cue_text, success, failure, reps, metrics, extended
-            FROM cue_stats
-            WHERE user_id=? AND exercise_id=? AND profile=? AND cue_text=?
-        """,
-            (user_id, exercise_id, db_profile, cue_text),
-        )
-        row = cur.fetchone()
+        with self.db.route(user_id).reader() as conn:
+            cur = conn.cursor()
+            profile_key = self._normalize_profile(profile)
+            db_profile = "" if profile_key is None else profile_key
+            cur.execute(
+                """
+                SELECT user_id, exercise_id, profile, cue_text, success, failure, reps, metrics, extended
+                FROM cue_stats
+                WHERE user_id=? AND exercise_id=? AND profile=? AND cue_text=?
+            """,
+                (user_id, exercise_id, db_profile, cue_text),
+            )
+            row = cur.fetchone()
         if row is None:
             return None
         metrics_payload = json.loads(row[7]) if row[7] else None
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+_METRICS: dict[str, Any] | None = None
+
+
+def _metrics() -> dict[str, Any]:
+    """Process-wide Prometheus counters; empty when ``prometheus_client`` is unavailable."""
+    global _METRICS
+    if _METRICS is None:
+        try:
+            from prometheus_client import Counter, Gauge
+        except ImportError:  # pragma: no cover - dependency managed via pyproject
+            LOGGER.debug("prometheus_client not available; ranked cache metrics disabled")
+            _METRICS = {}
+        else:
+            _METRICS = {
+                "hits": Counter("neuromotorica_policy_cache_hits_total", "Ranked-cue cache hits"),
+                "misses": Counter("neuromotorica_policy_cache_misses_total", "Ranked-cue cache misses"),
+                "evictions": Counter("neuromotorica_policy_cache_evictions_total", "Ranked-cue LRU evictions"),
+                "invalidations": Counter(
+                    "neuromotorica_policy_cache_invalidations_total", "Ranked-cue entries dropped by writes"
+                ),
+                "bytes": Gauge("neuromotorica_policy_cache_bytes", "Bytes held by the ranked-cue cache"),
+            }
+    return _METRICS
+
+
+class RankedCache:
+    """LRU cache of serialized ranked-cue responses.
+
+    Keys are ``(user_id, exercise_id, profile, k)``. Every entry carries the
+    database version of its ``(user_id, exercise_id)`` pair (see
+    ``cue_versions``), and :meth:`get` only returns it while the caller's
+    freshly read version still matches. That keeps the cache correct when
+    several worker processes write to the same database; :meth:`invalidate`
+    additionally frees a pair's entries as soon as this process writes to it.
+    Both the number of entries and the total payload size are bounded.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 16 * 1024 * 1024):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be >= 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.nbytes = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int, int]] = OrderedDict()
+        self._by_pair: dict[tuple[str, str], set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        setattr(self, name, getattr(self, name) + amount)
+        counter = _metrics().get(name)
+        if counter is not None and amount:
+            counter.inc(amount)
+
+    def get(self, key: tuple, version: int) -> Any | None:
+        """Cached value for ``key`` if it was stored at ``version``; outdated entries are dropped."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] != version:
+                if entry is not None:
+                    self._discard(key)
+                    self._count("invalidations")
+                    self._set_bytes()
+                self._count("misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count("hits")
+            return entry[0]
+
+    def put(self, key: tuple, value: Any, size: int, version: int) -> bool:
+        """Store ``value`` computed from data at (or after) ``version``; returns False if too large."""
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, size, version)
+            self._by_pair.setdefault((key[0], key[1]), set()).add(key)
+            self.nbytes += size
+            evicted = 0
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                evicted += 1
+            self._count("evictions", evicted)
+            self._set_bytes()
+            return True
+
+    def invalidate(self, pairs: Iterable[tuple[str, str]]) -> int:
+        """Drop all entries of each ``(user_id, exercise_id)`` pair; returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for pair in pairs:
+                for key in list(self._by_pair.get(pair, ())):
+                    self._discard(key)
+                    dropped += 1
+            self._count("invalidations", dropped)
+            self._set_bytes()
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_pair.clear()
+            self.nbytes = 0
+            self._set_bytes()
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.nbytes -= entry[1]
+        pair = (key[0], key[1])
+        keys = self._by_pair.get(pair)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_pair[pair]
+
+    def _set_bytes(self) -> None:
+        gauge = _metrics().get("bytes")
+        if gauge is not None:
+            gauge.set(self.nbytes)
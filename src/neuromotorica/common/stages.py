@@ -0,0 +1,116 @@
+"""Opt-in stage timing and allocation tracking for simulation hot paths.
+
+Hot-path functions are wrapped with :func:`instrumented`. When no
+:class:`StageRecorder` is active the wrapper costs a single context-variable
+lookup; inside ``with recorder.activate():`` every call records
+``perf_counter_ns`` wall time and, optionally, the ``tracemalloc`` peak bytes
+allocated while the stage ran. Stages may nest (``nmj`` contains ``kernels``
+and ``filters``); timings are inclusive.
+"""
+
+from __future__ import annotations
+
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ACTIVE: ContextVar["StageRecorder | None"] = ContextVar("neuromotorica_stage_recorder", default=None)
+
+
+class _Stage:
+    __slots__ = ("recorder", "name", "t0", "mem0")
+
+    def __init__(self, recorder: "StageRecorder", name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        rec = self.recorder
+        if rec.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak since the last reset belongs to the enclosing stage; fold it
+            # in before resetting the counter for this stage.
+            if rec._peaks:
+                rec._peaks[-1] = max(rec._peaks[-1], peak)
+            rec._peaks.append(current)
+            tracemalloc.reset_peak()
+            self.mem0 = current
+        self.t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = perf_counter_ns() - self.t0
+        rec = self.recorder
+        entry = rec.stages.setdefault(self.name, {"calls": 0, "total_ns": 0, "max_ns": 0, "peak_bytes": 0})
+        entry["calls"] += 1
+        entry["total_ns"] += elapsed
+        entry["max_ns"] = max(entry["max_ns"], elapsed)
+        if rec.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            stage_peak = max(rec._peaks.pop(), peak)
+            entry["peak_bytes"] = max(entry["peak_bytes"], stage_peak - self.mem0)
+            if rec._peaks:
+                rec._peaks[-1] = max(rec._peaks[-1], stage_peak)
+
+
+class StageRecorder:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, int]] = {}
+        self._peaks: List[int] = []
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    @contextmanager
+    def activate(self) -> Iterator["StageRecorder"]:
+        started = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started = True
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+            if started:
+                tracemalloc.stop()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for name, entry in self.stages.items():
+            calls = max(entry["calls"], 1)
+            out[name] = {
+                "calls": entry["calls"],
+                "total_ms": round(entry["total_ns"] / 1e6, 6),
+                "mean_ms": round(entry["total_ns"] / calls / 1e6, 6),
+                "max_ms": round(entry["max_ns"] / 1e6, 6),
+                "peak_bytes": entry["peak_bytes"] if self.trace_memory else None,
+            }
+        return out
+
+
+def active_recorder() -> StageRecorder | None:
+    return _ACTIVE.get()
+
+
+def instrumented(name: str) -> Callable[[F], F]:
+    """Record calls of the wrapped function as stage ``name`` when a recorder is active."""
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            rec = _ACTIVE.get()
+            if rec is None:
+                return fn(*args, **kwargs)
+            with _Stage(rec, name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -5,6 +5,7 @@ from numpy.typing import NDArray
 from .nmj import NMJ, NMJParams
 from .kernels import cached_normalized_kernel, convolve_traces
 from .filters import lowpass, lowpass_biquad_filtfilt
+from ..common.stages import instrumented
 
 @dataclass
 class EnhancedNMJParams(NMJParams):
@@ -21,6 +22,7 @@ class EnhancedNMJ(NMJ):
         self.enhanced_p = p
         self.histamine_kernel = cached_normalized_kernel(0.5, dt, p.histamine_tau_rise, p.histamine_tau_decay)
 
+    @instrumented("nmj")
     def dual_transmission_activation(self, spikes: NDArray[np.float64]) -> NDArray[np.float64]:
         if spikes.ndim != 2:
             raise ValueError("spikes must be [units, Tn]")
@@ -40,6 +42,7 @@ class EnhancedNMJ(NMJ):
         return np.clip(combined, 0.0, 1.5, out=combined)
 
 class OptimizedEnhancedNMJ(EnhancedNMJ):
+    @instrumented("nmj")
     def physiologically_realistic_activation(self, spikes: NDArray[np.float64]) -> NDArray[np.float64]:
         if spikes.ndim != 2:
             raise ValueError("spikes must be [units, Tn]")
@@ -16,3 +16,9 @@ class ExtendedMuscle(Muscle):
     def force(self, act: NDArray[np.float64], L: float = 1.0, V: float = 0.0):
         F_total, F_mu = super().force(act, L=L, V=V)
         return F_total * self.ext_p.topography_factor, F_mu
+
+    def force_step(self, act: NDArray[np.float64], L: float = 1.0, V: float = 0.0) -> float:
+        return super().force_step(act, L=L, V=V) * self.ext_p.topography_factor
+
+    def force_batch(self, act: NDArray[np.float64], L: float = 1.0, V: float = 0.0) -> NDArray[np.float64]:
+        return super().force_batch(act, L=L, V=V) * self.ext_p.topography_factor
@@ -5,12 +5,16 @@ from numpy.typing import NDArray
 from .enhanced_nmj import EnhancedNMJParams, OptimizedEnhancedNMJ
 from .filters import lowpass_biquad_filtfilt
 from .kernels import convolve_traces
+from ..common.stages import instrumented
 
-def add_channel_noise(x: NDArray[np.float64], sigma: float, dt: float) -> NDArray[np.float64]:
-    """Vectorized Wiener noise along time axis (axis=1)."""
+@instrumented("noise")
+def add_channel_noise(
+    x: NDArray[np.float64], sigma: float, dt: float, rng: np.random.Generator | None = None
+) -> NDArray[np.float64]:
+    """Vectorized Wiener noise along time axis (axis=1); unseeded unless ``rng`` is given."""
     if sigma <= 0:
         return x
-    rng = np.random.default_rng()
+    rng = np.random.default_rng() if rng is None else rng
     noise = rng.normal(0.0, sigma * np.sqrt(dt), size=x.shape).astype(np.float64)
     noise = np.cumsum(noise, axis=1)
     y = x + noise
@@ -47,12 +51,14 @@ class ExtendedOptimizedNMJ(OptimizedEnhancedNMJ):
         onset_arr = np.asarray(onsets, dtype=np.float64) * dt * 1000.0
         return float(np.std(onset_arr, dtype=np.float64))
 
+    @instrumented("nmj")
     def extended_activation(
         self,
         spikes: NDArray[np.float64],
         *,
         failure_bias: float | None = None,
         fft_threshold: int | None = None,
+        rng: np.random.Generator | None = None,
     ) -> tuple[NDArray[np.float64], float, float, float]:
         if spikes.ndim != 2:
             raise ValueError("spikes must be [units, Tn]")
@@ -69,11 +75,22 @@ class ExtendedOptimizedNMJ(OptimizedEnhancedNMJ):
             self.dt,
             self.p.ach_decay * 1.5,
         )
+        return self.activation_from_filtered(ach_act, hist_act, failure_bias=failure_bias, rng=rng)
+
+    def activation_from_filtered(
+        self,
+        ach_act: NDArray[np.float64],
+        hist_act: NDArray[np.float64],
+        *,
+        failure_bias: float | None = None,
+        rng: np.random.Generator | None = None,
+    ) -> tuple[NDArray[np.float64], float, float, float]:
+        """Glial modulation, channel noise and metrics over the zero-phase filtered ACh/histamine traces."""
         glial_boost = self.ext_p.glial_mod_gain * np.mean(hist_act, axis=1, keepdims=True)
         dual_act = ach_act + hist_act + 0.3 * ach_act * hist_act + glial_boost
 
         # Channel noise (Wiener process)
-        noisy = add_channel_noise(dual_act, self.ext_p.noise_sigma, self.dt)
+        noisy = add_channel_noise(dual_act, self.ext_p.noise_sigma, self.dt, rng)
         clipped = np.clip(noisy, 0.0, 1.2)
 
         # Failure probability: sharp negative drops across all units
@@ -2,6 +2,8 @@ from __future__ import annotations
 import numpy as np
 from numpy.typing import NDArray
 
+from ..common.stages import instrumented
+
 
 def _normalise_axis(axis: int, ndim: int) -> int:
     """Return a normalised axis index without relying on private NumPy APIs."""
@@ -16,6 +18,7 @@ def _normalise_axis(axis: int, ndim: int) -> int:
     return int(axis)
 
 
+@instrumented("filters")
 def lowpass(
     x: NDArray[np.float64],
     dt: float,
@@ -50,6 +53,38 @@ def lowpass(
     reshaped = out.reshape(swapped.shape)
     return np.swapaxes(reshaped, axis, -1)
 
+@instrumented("filters")
+def lowpass_block(
+    x: NDArray[np.float64],
+    dt: float,
+    tau: float,
+    state: NDArray[np.float64] | None = None,
+) -> tuple[NDArray[np.float64], NDArray[np.float64] | None]:
+    """Causal :func:`lowpass` over a block along the last axis, resumable via ``state``.
+
+    ``state`` is the previous output sample per trace; ``None`` starts the filter
+    at the first input sample exactly like :func:`lowpass`, so chaining blocks
+    reproduces the single-call result.
+    """
+
+    if dt <= 0 or tau <= 0:
+        raise ValueError("dt and tau must be > 0")
+    x_arr = np.asarray(x, dtype=np.float64)
+    if x_arr.ndim == 0:
+        raise ValueError("x must have at least one dimension")
+    alpha = float(np.clip(np.exp(-dt / tau), 0.0, 1.0))
+    beta = 1.0 - alpha
+    out = np.empty_like(x_arr)
+    if x_arr.shape[-1] == 0:
+        return out, state
+    if state is None:
+        out[..., 0] = x_arr[..., 0]
+    else:
+        out[..., 0] = alpha * np.asarray(state, dtype=np.float64) + beta * x_arr[..., 0]
+    for idx in range(1, x_arr.shape[-1]):
+        out[..., idx] = alpha * out[..., idx - 1] + beta * x_arr[..., idx]
+    return out, out[..., -1].copy()
+
 def _biquad_coeffs_lowpass(fc: float, fs: float, Q: float = 0.707):
     import numpy as np
     w0 = 2 * np.pi * fc / fs
@@ -63,6 +98,7 @@ def _biquad_coeffs_lowpass(fc: float, fs: float, Q: float = 0.707):
     a2 = 1 - alpha
     return (b0/a0, b1/a0, b2/a0, a1/a0, a2/a0)
 
+@instrumented("filters")
 def lowpass_biquad_filtfilt(
     x: NDArray[np.float64],
     dt: float,
@@ -108,3 +144,44 @@ def lowpass_biquad_filtfilt(
 
     reshaped = out.reshape(swapped.shape)
     return np.swapaxes(reshaped, axis, -1)
+
+
+@instrumented("filters")
+def lowpass_biquad_block(
+    x: NDArray[np.float64],
+    dt: float,
+    tau: float,
+    state: NDArray[np.float64] | None = None,
+    Q: float = 0.707,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """One causal pass of the :func:`lowpass_biquad_filtfilt` biquad over a block along the last axis.
+
+    ``state`` stacks the previous ``(x1, x2, y1, y2)`` per trace; ``None`` starts
+    at rest on the first input sample, as each pass of
+    :func:`lowpass_biquad_filtfilt` does. Chaining blocks forward and then over
+    the time-reversed forward output reproduces :func:`lowpass_biquad_filtfilt`
+    bit for bit.
+    """
+
+    if dt <= 0 or tau <= 0:
+        raise ValueError("dt and tau must be > 0")
+    x_arr = np.asarray(x, dtype=np.float64)
+    if x_arr.ndim == 0:
+        raise ValueError("x must have at least one dimension")
+    fs = 1.0 / dt
+    fc = 1.0 / (2 * np.pi * tau)
+    b0, b1, b2, a1, a2 = _biquad_coeffs_lowpass(fc, fs, Q)
+    out = np.empty_like(x_arr)
+    if x_arr.shape[-1] == 0:
+        return out, state
+    if state is None:
+        x1 = x2 = y1 = y2 = x_arr[..., 0].copy()
+    else:
+        x1, x2, y1, y2 = (np.array(s, dtype=np.float64) for s in state)
+    for n in range(x_arr.shape[-1]):
+        xn = x_arr[..., n]
+        yn = b0 * xn + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+        out[..., n] = yn
+        x2, x1 = x1, xn
+        y2, y1 = y1, yn
+    return out, np.stack([x1, x2, y1, y2])
@@ -5,6 +5,8 @@ from functools import lru_cache
 import numpy as np
 from numpy.typing import NDArray
 
+from ..common.stages import instrumented
+
 def alpha_kernel(t: NDArray[np.float64], tau_rise: float, tau_decay: float) -> NDArray[np.float64]:
     """Stable alpha-like kernel ~ (1 - e^{-t/tr}) e^{-t/td}, t>=0.
     Numerically stable near tau_rise ≈ tau_decay.
@@ -26,13 +28,20 @@ def _t_peak(tr: float, td: float) -> float:
     ratio = np.clip(ratio, 1e-12, 1 - 1e-12)
     return -tr * float(np.log(ratio))
 
-def normalized_alpha_kernel(t: NDArray[np.float64], tau_rise: float, tau_decay: float) -> NDArray[np.float64]:
-    k = alpha_kernel(t, tau_rise, tau_decay)
+def alpha_peak(tau_rise: float, tau_decay: float) -> float | None:
+    """Analytic peak of :func:`alpha_kernel`, or ``None`` when it is not representable."""
     tr, td = float(tau_rise), float(tau_decay)
     tp = max(_t_peak(tr, td), 1e-12)
     # Direct evaluation at t_peak
     peak = (1.0 - np.exp(-tp / tr)) * np.exp(-tp / td)
     if not np.isfinite(peak) or peak <= 0:
+        return None
+    return float(peak)
+
+def normalized_alpha_kernel(t: NDArray[np.float64], tau_rise: float, tau_decay: float) -> NDArray[np.float64]:
+    k = alpha_kernel(t, tau_rise, tau_decay)
+    peak = alpha_peak(tau_rise, tau_decay)
+    if peak is None:
         peak = float(np.max(k)) if np.max(k) > 0 else 1.0
     return (k / peak).astype(np.float64, copy=False)
 
@@ -79,6 +88,7 @@ def convolve_signal(
     return y[: len(sig)]
 
 
+@instrumented("kernels")
 def convolve_traces(
     traces: NDArray[np.float64],
     kernel: NDArray[np.float64],
@@ -112,3 +122,36 @@ def convolve_traces(
     kernel_fft = np.fft.rfft(kernel_arr, n=L)
     y = np.fft.irfft(traces_fft * kernel_fft, n=L, axis=-1)
     return y[..., :time_len]
+
+
+@instrumented("kernels")
+def convolve_block(
+    traces: NDArray[np.float64],
+    kernel: NDArray[np.float64],
+    tail: NDArray[np.float64] | None = None,
+    use_fft_threshold: int = 2048,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Causal block convolution (overlap-add) carrying the kernel tail between calls.
+
+    ``tail`` holds the ``len(kernel) - 1`` samples that earlier blocks contribute
+    to the future; the updated tail is returned with the block output.
+    """
+
+    traces_arr = np.atleast_2d(np.asarray(traces, dtype=np.float64))
+    kernel_arr = np.asarray(kernel, dtype=np.float64)
+    if kernel_arr.ndim != 1:
+        raise ValueError("kernel must be 1-D")
+    lead, B = traces_arr.shape[:-1], traces_arr.shape[-1]
+    K = kernel_arr.size
+    n = B + K - 1
+    if n < use_fft_threshold:
+        rows = traces_arr.reshape(-1, B)
+        full = np.stack([np.convolve(row, kernel_arr, mode="full") for row in rows]).reshape(*lead, n)
+    else:
+        L = 1 << int(np.ceil(np.log2(n)))
+        full = np.fft.irfft(np.fft.rfft(traces_arr, n=L, axis=-1) * np.fft.rfft(kernel_arr, n=L), n=L, axis=-1)[..., :n]
+    total = np.zeros((*lead, max(n, K - 1)), dtype=np.float64)
+    total[..., :n] = full
+    if tail is not None:
+        total[..., : K - 1] += tail
+    return total[..., :B], total[..., B : B + K - 1].copy()
@@ -0,0 +1,102 @@
+"""Anti-aliased rate conversion between the NMJ and muscle stages.
+
+Spike convolution needs a fine ``dt`` while muscle force changes on
+``tau_act``/``tau_deact`` time scales, so activations can be decimated before
+:meth:`Muscle.force`. :func:`decimate` applies a linear-phase windowed-sinc
+FIR and evaluates only the retained output samples (polyphase form), centred
+so that timings are not shifted; :func:`upsample` maps coarse traces back to
+the fine grid for plotting.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..common.stages import instrumented
+from .filters import _normalise_axis
+
+
+@lru_cache(maxsize=32)
+def _antialias_taps(factor: int, taps_per_side: int, cutoff: float) -> NDArray[np.float64]:
+    half = taps_per_side * factor
+    n = np.arange(-half, half + 1, dtype=np.float64)
+    fc = cutoff / (2.0 * factor)
+    h = 2.0 * fc * np.sinc(2.0 * fc * n) * np.hamming(n.size)
+    h /= np.sum(h)
+    h.setflags(write=False)
+    return h
+
+
+def antialias_taps(factor: int, taps_per_side: int = 4, cutoff: float = 0.8) -> NDArray[np.float64]:
+    """Linear-phase low-pass FIR for decimation by ``factor``.
+
+    ``cutoff`` is the pass-band edge as a fraction of the decimated Nyquist rate.
+    """
+
+    if factor < 1:
+        raise ValueError("factor must be >= 1")
+    if taps_per_side < 1 or not 0.0 < cutoff <= 1.0:
+        raise ValueError("taps_per_side must be >= 1 and cutoff in (0, 1]")
+    return _antialias_taps(int(factor), int(taps_per_side), float(cutoff))
+
+
+@instrumented("decimate")
+def decimate(
+    x: NDArray[np.float64],
+    factor: int,
+    axis: int = -1,
+    *,
+    taps_per_side: int = 4,
+    cutoff: float = 0.8,
+) -> NDArray[np.float64]:
+    """Zero-phase anti-aliased decimation keeping samples ``0, factor, 2*factor, ...``."""
+
+    x_arr = np.asarray(x, dtype=np.float64)
+    if x_arr.ndim == 0:
+        raise ValueError("x must have at least one dimension")
+    if factor == 1:
+        return x_arr.copy()
+    h = antialias_taps(factor, taps_per_side, cutoff)
+    axis = _normalise_axis(axis, x_arr.ndim)
+    swapped = np.swapaxes(x_arr, axis, -1)
+    n = swapped.shape[-1]
+    if n == 0:
+        return np.empty_like(x_arr)
+    n_out = -(-n // factor)
+    half = (h.size - 1) // 2
+    phases = -(-h.size // factor)
+    h_poly = np.zeros(phases * factor, dtype=np.float64)
+    h_poly[: h.size] = h
+    h_poly = h_poly.reshape(phases, factor)
+    # Edge padding keeps the DC level at the boundaries (activations start at rest).
+    right = (n_out + phases) * factor - n - half
+    padded = np.pad(swapped, [(0, 0)] * (swapped.ndim - 1) + [(half, right)], mode="edge")
+    # Row j of the polyphase matrix holds input samples j*factor ... j*factor + factor - 1,
+    # so output m is the sum over j of row (m + j) weighted by the j-th block of taps.
+    rows = padded.reshape(*swapped.shape[:-1], n_out + phases, factor)
+    out = rows[..., 0:n_out, :] @ h_poly[0]
+    for j in range(1, phases):
+        out += rows[..., j : j + n_out, :] @ h_poly[j]
+    return np.swapaxes(out, axis, -1)
+
+
+def upsample(y: NDArray[np.float64], factor: int, n_out: int, axis: int = -1) -> NDArray[np.float64]:
+    """Linearly interpolate a decimated trace back onto ``n_out`` fine samples."""
+
+    y_arr = np.asarray(y, dtype=np.float64)
+    if factor < 1 or n_out < 0:
+        raise ValueError("factor must be >= 1 and n_out >= 0")
+    axis = _normalise_axis(axis, y_arr.ndim)
+    swapped = np.swapaxes(y_arr, axis, -1)
+    n_in = swapped.shape[-1]
+    if n_in == 0:
+        raise ValueError("y must not be empty")
+    fine = np.arange(n_out)
+    idx = np.minimum(fine // factor, n_in - 1)
+    nxt = np.minimum(idx + 1, n_in - 1)
+    frac = np.where(idx == nxt, 0.0, (fine - idx * factor) / factor)
+    out = swapped[..., idx] * (1.0 - frac) + swapped[..., nxt] * frac
+    return np.swapaxes(out, axis, -1)
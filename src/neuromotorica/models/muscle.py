@@ -2,6 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
 from numpy.typing import NDArray
+from ..common.stages import instrumented
 
 @dataclass
 class MuscleParams:
@@ -27,6 +28,7 @@ class Muscle:
         mu_scales = np.linspace(1.0, p.mu_size_ratio, units, dtype=np.float64)
         self.mu_weights = mu_scales / np.sum(mu_scales)
 
+    @instrumented("muscle")
     def force(self, act: NDArray[np.float64], L: float = 1.0, V: float = 0.0) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
         if act.shape[0] != self.units:
             raise ValueError("act units mismatch")
@@ -41,3 +43,31 @@ class Muscle:
         F_passive = self.p.F_max * self.p.passive_k * (np.exp(self.p.passive_exp * max(L - self.p.L0, 0.0)) - 1.0)
         F_total = np.sum(F_mu, axis=0) + F_passive
         return F_total, F_mu
+
+    def force_step(self, act: NDArray[np.float64], L: float = 1.0, V: float = 0.0) -> float:
+        """Total force for a single time sample ``act`` of shape ``[units]``."""
+        if act.shape != (self.units,):
+            raise ValueError("act units mismatch")
+        fl = np.exp(-((L - self.p.L0) ** 2) / (2 * (self.p.fl_width ** 2)))
+        denom = (self.p.Vmax + self.p.c * V)
+        fv = (self.p.Vmax - V) / denom if denom != 0 else 1.0
+        fv = max(fv, 0.1)
+        F_mu = act * self.p.F_max * self.mu_weights * fl * fv
+        F_passive = self.p.F_max * self.p.passive_k * (np.exp(self.p.passive_exp * max(L - self.p.L0, 0.0)) - 1.0)
+        return float(np.sum(F_mu) + F_passive)
+
+    @instrumented("muscle")
+    def force_batch(self, act: NDArray[np.float64], L: float = 1.0, V: float = 0.0) -> NDArray[np.float64]:
+        """Total force for ``[..., units, Tn]`` activations; returns ``[..., Tn]``.
+
+        The per-unit weighting is a single contraction over the units axis, so
+        leading batch axes (rates, trials) need no Python loop.
+        """
+        if act.ndim < 2 or act.shape[-2] != self.units:
+            raise ValueError("act units mismatch")
+        fl = np.exp(-((L - self.p.L0) ** 2) / (2 * (self.p.fl_width ** 2)))
+        denom = (self.p.Vmax + self.p.c * V)
+        fv = (self.p.Vmax - V) / denom if denom != 0 else 1.0
+        fv = max(fv, 0.1)
+        F_passive = self.p.F_max * self.p.passive_k * (np.exp(self.p.passive_exp * max(L - self.p.L0, 0.0)) - 1.0)
+        return np.einsum("...ut,u->...t", act, self.mu_weights * (self.p.F_max * fl * fv)) + F_passive
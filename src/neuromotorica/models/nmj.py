@@ -4,6 +4,7 @@ import numpy as np
 from numpy.typing import NDArray
 from .kernels import cached_normalized_kernel, convolve_traces
 from .filters import lowpass
+from ..common.stages import instrumented
 
 @dataclass
 class NMJParams:
@@ -22,6 +23,7 @@ class NMJ:
         self.fft_threshold = 2048 if fft_threshold is None else max(int(fft_threshold), 1)
         self.kernel = cached_normalized_kernel(0.5, dt, p.tau_rise, p.tau_decay)
 
+    @instrumented("nmj")
     def calcium_activation(self, spikes: NDArray[np.float64]) -> NDArray[np.float64]:
         if spikes.ndim != 2:
             raise ValueError("spikes must be [units, Tn]")
@@ -2,6 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
 from numpy.typing import NDArray
+from ..common.stages import instrumented
 
 @dataclass
 class PoolParams:
@@ -18,11 +19,31 @@ class Pool:
         self.T = T
         self.Tn = int(T / dt)
 
+    @instrumented("spikes")
     def poisson_spikes(self, rate_hz: float, seed: int | None = None) -> NDArray[np.float64]:
         rng = np.random.default_rng(seed)
         p = rate_hz * self.dt
         return (rng.random((self.units, self.Tn)) < p).astype(np.float64)
 
+    @instrumented("spikes")
+    def poisson_spikes_block(self, rate_hz: float, seed: int, start: int, stop: int) -> NDArray[np.float64]:
+        """Columns ``start:stop`` of :meth:`poisson_spikes` for ``seed``, without drawing the rest.
+
+        ``default_rng`` fills the matrix row by row with one 64-bit draw per
+        sample, so a unit's slice begins ``unit * Tn + start`` draws into the
+        PCG64 stream and is reached with ``advance``.
+        """
+        start, stop = max(int(start), 0), min(int(stop), self.Tn)
+        p = rate_hz * self.dt
+        base = np.random.PCG64(seed).state
+        out = np.empty((self.units, max(stop - start, 0)), dtype=np.float64)
+        for unit in range(self.units):
+            bit_gen = np.random.PCG64()
+            bit_gen.state = base
+            bit_gen.advance(unit * self.Tn + start)
+            out[unit] = np.random.Generator(bit_gen).random(out.shape[1]) < p
+        return out
+
     def single_spike(self, at_idx: int, unit_idx: int = 0) -> NDArray[np.float64]:
         """Return a spike train with a single unit firing once."""
 
@@ -0,0 +1,41 @@
+"""Atomic checkpoint files: NumPy arrays plus a JSON metadata document."""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+_META_KEY = "__meta__"
+
+
+def save_checkpoint(path: str | os.PathLike, arrays: Dict[str, NDArray], meta: Dict[str, Any]) -> None:
+    """Write ``arrays`` and JSON-serialisable ``meta`` to ``path`` atomically.
+
+    The file is written next to the target and moved into place, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+
+    target = pathlib.Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if _META_KEY in arrays:
+        raise ValueError(f"array name '{_META_KEY}' is reserved")
+    tmp = target.with_name(target.name + ".tmp")
+    payload = {name: np.asarray(value) for name, value in arrays.items()}
+    payload[_META_KEY] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    with tmp.open("wb") as fh:
+        np.savez(fh, **payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, target)
+
+
+def load_checkpoint(path: str | os.PathLike) -> Tuple[Dict[str, NDArray], Dict[str, Any]]:
+    with np.load(pathlib.Path(path), allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files if name != _META_KEY}
+        meta = json.loads(data[_META_KEY].tobytes().decode("utf-8"))
+    return arrays, meta
@@ -0,0 +1,218 @@
+"""Lossy compact codec for bounded activation and force traces.
+
+Samples are quantised onto a uniform grid over ``[lo, hi]`` (``uint8`` or
+``uint16`` codes), delta-encoded along time, byte-shuffled and compressed with
+``zlib``. Chunks along the time axis are encoded independently so any chunk
+can be decoded on its own; the achieved reconstruction error is measured at
+encode time and carried next to the data.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import struct
+import zlib
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+_CODE_DTYPES = {"uint8": np.uint8, "uint16": np.uint16}
+_MAGIC = b"NMQ1"
+
+
+@dataclass(frozen=True)
+class CodecSpec:
+    """Quantisation settings; ``max_error`` bounds the error for in-range samples."""
+
+    lo: float
+    hi: float
+    max_error: float | None = None
+    dtype: str = "uint16"
+    chunk_size: int = 4096
+    level: int = 6
+
+    def __post_init__(self) -> None:
+        if self.dtype not in _CODE_DTYPES:
+            raise ValueError(f"dtype must be one of {sorted(_CODE_DTYPES)}")
+        if not self.hi > self.lo:
+            raise ValueError("hi must be > lo")
+        if self.chunk_size <= 0:
+            raise ValueError("chunk_size must be > 0")
+        if self.max_error is not None:
+            if self.max_error <= 0:
+                raise ValueError("max_error must be > 0")
+            if self.levels > np.iinfo(_CODE_DTYPES[self.dtype]).max + 1:
+                raise ValueError(
+                    f"max_error={self.max_error} needs {self.levels} levels, more than {self.dtype} holds"
+                )
+
+    @property
+    def step(self) -> float:
+        if self.max_error is not None:
+            return 2.0 * float(self.max_error)
+        return (self.hi - self.lo) / float(np.iinfo(_CODE_DTYPES[self.dtype]).max)
+
+    @property
+    def levels(self) -> int:
+        return int(math.ceil((self.hi - self.lo) / self.step)) + 1
+
+    @property
+    def code_dtype(self) -> np.dtype:
+        return np.dtype(_CODE_DTYPES[self.dtype])
+
+
+def activation_spec(max_error: float = 1e-3, *, hi: float = 1.5, **kwargs: Any) -> CodecSpec:
+    """Codec for NMJ activations, which are clipped to ``[0, 1.5]`` or tighter."""
+
+    return CodecSpec(0.0, hi, max_error=max_error, **kwargs)
+
+
+def force_spec(F_max: float, topography_factor: float = 1.0, *, max_error: float | None = None,
+               activation_max: float = 1.5, **kwargs: Any) -> CodecSpec:
+    """Codec for active muscle force bounded by ``activation_max * F_max * topography_factor``."""
+
+    return CodecSpec(0.0, activation_max * F_max * topography_factor, max_error=max_error, **kwargs)
+
+
+def quantize(x: NDArray[np.float64], spec: CodecSpec) -> NDArray:
+    levels_max = min(spec.levels - 1, np.iinfo(spec.code_dtype).max)
+    q = np.rint((np.asarray(x, dtype=np.float64) - spec.lo) / spec.step)
+    return np.clip(q, 0, levels_max).astype(spec.code_dtype)
+
+
+def dequantize(q: NDArray, spec: CodecSpec) -> NDArray[np.float64]:
+    return spec.lo + q.astype(np.float64) * spec.step
+
+
+def encode_chunk(x: NDArray[np.float64], spec: CodecSpec) -> Tuple[bytes, Dict[str, float]]:
+    """Encode one block (time on the last axis) and return ``(payload, error stats)``."""
+
+    arr = np.asarray(x, dtype=np.float64)
+    q = quantize(arr, spec)
+    # Unsigned differences wrap modulo 2**bits, so the cumulative sum on decode is exact.
+    deltas = np.diff(q, axis=-1, prepend=np.zeros((*q.shape[:-1], 1), dtype=q.dtype))
+    shuffled = np.ascontiguousarray(deltas).view(np.uint8).reshape(-1, q.itemsize).T
+    payload = zlib.compress(np.ascontiguousarray(shuffled).tobytes(), spec.level)
+    err = np.abs(dequantize(q, spec) - arr)
+    stats = {
+        "max_abs_error": float(err.max()) if err.size else 0.0,
+        "sq_error_sum": float(np.sum(err * err)),
+        "samples": int(err.size),
+    }
+    return payload, stats
+
+
+def decode_chunk(payload: bytes, spec: CodecSpec, shape: Tuple[int, ...]) -> NDArray[np.float64]:
+    raw = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+    itemsize = spec.code_dtype.itemsize
+    deltas = raw.reshape(itemsize, -1).T.copy().view(spec.code_dtype).reshape(shape)
+    q = np.cumsum(deltas, axis=-1, dtype=spec.code_dtype)
+    return dequantize(q, spec)
+
+
+@dataclass
+class EncodedTrace:
+    """A trace encoded as independent time chunks with its reconstruction error."""
+
+    spec: CodecSpec
+    shape: Tuple[int, ...]
+    chunks: List[bytes] = field(default_factory=list)
+    max_abs_error: float = 0.0
+    rmse: float = 0.0
+
+    @property
+    def length(self) -> int:
+        return int(self.shape[-1])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+    @property
+    def compression_ratio(self) -> float:
+        raw = int(np.prod(self.shape)) * np.dtype(np.float64).itemsize
+        return raw / max(self.nbytes, 1)
+
+    def chunk_bounds(self, idx: int) -> Tuple[int, int]:
+        start = idx * self.spec.chunk_size
+        return start, min(start + self.spec.chunk_size, self.length)
+
+    def decode_chunk(self, idx: int) -> NDArray[np.float64]:
+        start, stop = self.chunk_bounds(idx)
+        return decode_chunk(self.chunks[idx], self.spec, (*self.shape[:-1], stop - start))
+
+    def read(self, start: int = 0, stop: int | None = None) -> NDArray[np.float64]:
+        """Decode only the chunks overlapping ``[start, stop)``."""
+
+        start, stop, _ = slice(start, stop).indices(self.length)
+        out = np.empty((*self.shape[:-1], max(stop - start, 0)), dtype=np.float64)
+        size = self.spec.chunk_size
+        for idx in range(start // size, -(-stop // size)):
+            c0, c1 = self.chunk_bounds(idx)
+            block = self.decode_chunk(idx)
+            lo, hi = max(start, c0), min(stop, c1)
+            out[..., lo - start : hi - start] = block[..., lo - c0 : hi - c0]
+        return out
+
+    def decode(self) -> NDArray[np.float64]:
+        return self.read()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "codec": asdict(self.spec),
+            "max_abs_error": self.max_abs_error,
+            "rmse": self.rmse,
+            "nbytes": self.nbytes,
+            "compression_ratio": round(self.compression_ratio, 2),
+        }
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps(
+            {**self.report(), "shape": list(self.shape), "chunk_sizes": [len(c) for c in self.chunks]}
+        ).encode("utf-8")
+        return _MAGIC + struct.pack("<I", len(header)) + header + b"".join(self.chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EncodedTrace":
+        if data[:4] != _MAGIC:
+            raise ValueError("not an encoded trace")
+        (hlen,) = struct.unpack("<I", data[4:8])
+        header = json.loads(data[8 : 8 + hlen].decode("utf-8"))
+        chunks, pos = [], 8 + hlen
+        for size in header["chunk_sizes"]:
+            chunks.append(data[pos : pos + size])
+            pos += size
+        return cls(
+            spec=CodecSpec(**header["codec"]),
+            shape=tuple(header["shape"]),
+            chunks=chunks,
+            max_abs_error=header["max_abs_error"],
+            rmse=header["rmse"],
+        )
+
+
+def encode_trace(x: NDArray[np.float64], spec: CodecSpec) -> EncodedTrace:
+    """Vectorised encode of ``x`` (time on the last axis) into independent chunks."""
+
+    arr = np.asarray(x, dtype=np.float64)
+    if arr.ndim == 0:
+        raise ValueError("x must have at least one dimension")
+    enc = EncodedTrace(spec=spec, shape=tuple(arr.shape))
+    sq_sum, samples = 0.0, 0
+    for start in range(0, arr.shape[-1], spec.chunk_size):
+        payload, stats = encode_chunk(arr[..., start : start + spec.chunk_size], spec)
+        enc.chunks.append(payload)
+        enc.max_abs_error = max(enc.max_abs_error, stats["max_abs_error"])
+        sq_sum += stats["sq_error_sum"]
+        samples += stats["samples"]
+    enc.rmse = float(np.sqrt(sq_sum / samples)) if samples else 0.0
+    return enc
+
+
+def decode_trace(enc: EncodedTrace | bytes) -> NDArray[np.float64]:
+    if isinstance(enc, (bytes, bytearray)):
+        enc = EncodedTrace.from_bytes(bytes(enc))
+    return enc.decode()
@@ -0,0 +1,342 @@
+"""Chunked on-disk store for simulation traces.
+
+A store is a directory holding a ``manifest.json`` and one sub-directory per
+trace. Each trace is split along its last (time) axis into ``.npy`` chunks
+that are memory-mapped on read, so slices of long runs can be revisited
+without loading whole files. A trace may instead be written with a
+:class:`~neuromotorica.storage.codec.CodecSpec`; its chunks are then compact
+``.nmq`` payloads and the measured reconstruction error is recorded in the
+manifest next to the trace.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .codec import CodecSpec, decode_chunk, encode_chunk
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _write_manifest(root: pathlib.Path, manifest: Dict[str, Any]) -> None:
+    tmp = root / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, root / MANIFEST_NAME)
+
+
+class Trace:
+    """Lazy view over one chunked trace; indexing reads only touched chunks."""
+
+    def __init__(self, root: pathlib.Path, name: str, meta: Dict[str, Any]):
+        self.root = root
+        self.name = name
+        self.meta = meta
+
+    @property
+    def length(self) -> int:
+        return int(self.meta["length"])
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (*self.meta["shape"], self.length)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.meta["dtype"])
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def codec(self) -> CodecSpec | None:
+        spec = self.meta.get("codec")
+        return CodecSpec(**spec) if spec else None
+
+    def _load_chunk(self, chunk: Dict[str, Any]) -> NDArray:
+        spec = self.codec
+        if spec is not None:
+            payload = (self.root / chunk["file"]).read_bytes()
+            return decode_chunk(payload, spec, (*self.meta["shape"], int(chunk["length"])))
+        return np.load(self.root / chunk["file"], mmap_mode="r")
+
+    def iter_chunks(self, start: int = 0, stop: int | None = None) -> Iterator[Tuple[int, NDArray]]:
+        """Yield ``(offset, block)`` pairs covering ``[start, stop)`` in time order."""
+
+        stop = self.length if stop is None else min(int(stop), self.length)
+        for chunk in self.meta["chunks"]:
+            c0 = int(chunk["start"])
+            c1 = c0 + int(chunk["length"])
+            if c1 <= start or c0 >= stop:
+                continue
+            data = self._load_chunk(chunk)
+            lo, hi = max(start, c0) - c0, min(stop, c1) - c0
+            yield c0 + lo, data[..., lo:hi]
+
+    def read(self, start: int = 0, stop: int | None = None, step: int = 1) -> NDArray:
+        """Materialise the time slice ``[start:stop:step]`` as a NumPy array."""
+
+        start, stop, step = slice(start, stop, step).indices(self.length)
+        if step <= 0:
+            raise ValueError("step must be > 0")
+        count = max(0, -(-(stop - start) // step))
+        out = np.empty((*self.meta["shape"], count), dtype=self.dtype)
+        for offset, block in self.iter_chunks(start, stop):
+            first = (-(offset - start)) % step
+            picked = block[..., first::step]
+            pos = (offset + first - start) // step
+            out[..., pos : pos + picked.shape[-1]] = picked
+        return out
+
+    def __getitem__(self, key: Any) -> NDArray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        if Ellipsis in key:
+            raise IndexError("ellipsis indexing is not supported on traces")
+        lead, time_key = key[:-1], key[-1]
+        if len(lead) > len(self.meta["shape"]):
+            raise IndexError("too many indices for trace")
+        if isinstance(time_key, slice):
+            data = self.read(time_key.start or 0, time_key.stop, time_key.step or 1)
+            return data[lead] if lead else data
+        idx = int(time_key)
+        if idx < 0:
+            idx += self.length
+        if not 0 <= idx < self.length:
+            raise IndexError("time index out of range")
+        data = self.read(idx, idx + 1)[..., 0]
+        return data[lead] if lead else data
+
+
+class TraceWriter:
+    """Append blocks to traces while a simulation runs.
+
+    Blocks are buffered per trace until ``chunk_size`` samples are available;
+    full chunks are flushed to disk immediately and the manifest is rewritten
+    so that a partially written store stays readable. Leaving the ``with``
+    block on an exception flushes the buffers without setting ``complete``.
+    """
+
+    def __init__(self, store: "TraceStore", chunk_size: int):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be > 0")
+        self.store = store
+        self.chunk_size = int(chunk_size)
+        self._buffers: Dict[str, List[NDArray]] = {}
+        self._buffered: Dict[str, int] = {}
+        self.closed = False
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep what was produced readable, but leave the store marked incomplete.
+            self.flush()
+            self.closed = True
+
+    def append(self, name: str, block: NDArray, *, codec: CodecSpec | None = None) -> None:
+        """Append ``block`` (time on the last axis) to trace ``name``.
+
+        ``codec`` applies only when the trace is created by this call.
+        """
+
+        if self.closed:
+            raise RuntimeError("writer is closed")
+        arr = np.asarray(block)
+        if arr.ndim == 0:
+            raise ValueError("block must have at least one dimension")
+        traces = self.store.manifest["traces"]
+        meta = traces.get(name)
+        if meta is None:
+            meta = {"shape": list(arr.shape[:-1]), "dtype": arr.dtype.str, "length": 0, "chunks": []}
+            if codec is not None:
+                meta["dtype"] = np.dtype(np.float64).str
+                meta["codec"] = asdict(codec)
+                meta["error"] = {"max_abs_error": 0.0, "rmse": 0.0, "sq_error_sum": 0.0, "samples": 0}
+            traces[name] = meta
+        elif list(arr.shape[:-1]) != meta["shape"]:
+            raise ValueError(f"block shape {arr.shape[:-1]} does not match trace '{name}' {tuple(meta['shape'])}")
+        arr = arr.astype(meta["dtype"], copy=False)
+        self._buffers.setdefault(name, []).append(arr)
+        self._buffered[name] = self._buffered.get(name, 0) + arr.shape[-1]
+        if self._buffered[name] >= self.chunk_size:
+            self._flush(name, final=False)
+
+    def _flush(self, name: str, *, final: bool) -> None:
+        pending = self._buffers.get(name)
+        if not pending:
+            return
+        data = np.concatenate(pending, axis=-1) if len(pending) > 1 else pending[0]
+        meta = self.store.manifest["traces"][name]
+        trace_dir = self.store.root / name
+        trace_dir.mkdir(parents=True, exist_ok=True)
+        pos = 0
+        total = data.shape[-1]
+        spec = CodecSpec(**meta["codec"]) if "codec" in meta else None
+        while total - pos >= self.chunk_size or (final and pos < total):
+            size = min(self.chunk_size, total - pos)
+            block = np.ascontiguousarray(data[..., pos : pos + size])
+            entry: Dict[str, Any] = {"start": meta["length"], "length": size}
+            if spec is None:
+                entry["file"] = f"{name}/chunk_{len(meta['chunks']):05d}.npy"
+                np.save(self.store.root / entry["file"], block)
+            else:
+                entry["file"] = f"{name}/chunk_{len(meta['chunks']):05d}.nmq"
+                payload, stats = encode_chunk(block, spec)
+                (self.store.root / entry["file"]).write_bytes(payload)
+                entry["max_abs_error"] = stats["max_abs_error"]
+                err = meta["error"]
+                err["max_abs_error"] = max(err["max_abs_error"], stats["max_abs_error"])
+                err["sq_error_sum"] += stats["sq_error_sum"]
+                err["samples"] += stats["samples"]
+                err["rmse"] = float(np.sqrt(err["sq_error_sum"] / err["samples"])) if err["samples"] else 0.0
+            meta["chunks"].append(entry)
+            meta["length"] += size
+            pos += size
+        rest = data[..., pos:]
+        self._buffers[name] = [rest] if rest.shape[-1] else []
+        self._buffered[name] = rest.shape[-1]
+        _write_manifest(self.store.root, self.store.manifest)
+
+    def truncate(self, name: str, length: int) -> None:
+        """Drop the samples of ``name`` from ``length`` on, discarding anything still buffered.
+
+        ``length`` must fall on a chunk boundary; a resumed run uses this to
+        roll the store back to its last checkpoint.
+        """
+
+        meta = self.store.manifest["traces"].get(name)
+        self._buffers.pop(name, None)
+        self._buffered.pop(name, None)
+        if meta is None:
+            if length:
+                raise KeyError(f"Unknown trace '{name}'")
+            return
+        if length > meta["length"]:
+            raise ValueError(f"trace '{name}' has only {meta['length']} samples, cannot keep {length}")
+        if length == meta["length"]:
+            return
+        if "codec" in meta:
+            raise ValueError(f"codec trace '{name}' cannot be truncated")
+        keep = [c for c in meta["chunks"] if int(c["start"]) + int(c["length"]) <= length]
+        if sum(int(c["length"]) for c in keep) != length:
+            raise ValueError(f"length {length} is not on a chunk boundary of trace '{name}'")
+        for chunk in meta["chunks"][len(keep):]:
+            (self.store.root / chunk["file"]).unlink(missing_ok=True)
+        meta["chunks"] = keep
+        meta["length"] = length
+        _write_manifest(self.store.root, self.store.manifest)
+
+    def flush(self) -> None:
+        """Write all buffered samples, including partial chunks."""
+
+        for name in list(self._buffers):
+            self._flush(name, final=True)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.flush()
+        self.store.manifest["complete"] = True
+        _write_manifest(self.store.root, self.store.manifest)
+        self.closed = True
+
+
+class TraceStore:
+    """Directory of chunked traces described by a JSON manifest."""
+
+    def __init__(self, root: pathlib.Path, manifest: Dict[str, Any]):
+        self.root = root
+        self.manifest = manifest
+
+    @classmethod
+    def create(
+        cls,
+        path: str | os.PathLike,
+        *,
+        dt: float,
+        config: Dict[str, Any] | None = None,
+        profile: str | None = None,
+        seed: int | None = None,
+        chunk_size: int = 8192,
+    ) -> TraceWriter:
+        """Create a new store at ``path`` and return a writer for it."""
+
+        root = pathlib.Path(path)
+        if (root / MANIFEST_NAME).exists():
+            raise FileExistsError(f"Trace store already exists at {root}")
+        root.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "dt": float(dt),
+            "config": dict(config or {}),
+            "profile": profile,
+            "seed": seed,
+            "chunk_size": int(chunk_size),
+            "complete": False,
+            "traces": {},
+        }
+        store = cls(root, manifest)
+        _write_manifest(root, manifest)
+        return TraceWriter(store, chunk_size)
+
+    @classmethod
+    def open(cls, path: str | os.PathLike) -> "TraceStore":
+        root = pathlib.Path(path)
+        manifest_path = root / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No trace store manifest at {manifest_path}")
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported trace store version: {manifest.get('version')}")
+        return cls(root, manifest)
+
+    def writer(self, chunk_size: int | None = None) -> TraceWriter:
+        """Writer that appends to this existing store; it is marked incomplete until the writer closes."""
+
+        self.manifest["complete"] = False
+        _write_manifest(self.root, self.manifest)
+        return TraceWriter(self, int(chunk_size or self.manifest["chunk_size"]))
+
+    @property
+    def dt(self) -> float:
+        return float(self.manifest["dt"])
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.manifest["config"]
+
+    @property
+    def profile(self) -> str | None:
+        return self.manifest.get("profile")
+
+    @property
+    def seed(self) -> int | None:
+        return self.manifest.get("seed")
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self.manifest["traces"])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.manifest["traces"]
+
+    def __getitem__(self, name: str) -> Trace:
+        try:
+            meta = self.manifest["traces"][name]
+        except KeyError as exc:
+            raise KeyError(f"Unknown trace '{name}'. Available traces: {', '.join(self.names())}") from exc
+        return Trace(self.root, name, meta)
+
+    def time_axis(self, name: str, start: int = 0, stop: int | None = None, step: int = 1) -> NDArray[np.float64]:
+        start, stop, step = slice(start, stop, step).indices(self[name].length)
+        return np.arange(start, stop, step, dtype=np.float64) * self.dt
@@ -3,10 +3,6 @@ from __future__ import annotations
 import json, pathlib
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
-from .validators.openapi import validate_openapi
-from .validators.configs import validate_configs
-from .validators.policies import validate_policies
-from .validators.dataq import validate_data_quality
 from .viz import charts_section
 
 class Finding(BaseModel):
@@ -30,6 +26,11 @@ class ValidationRunner:
     def __init__(self, profile: str, thresholds: Dict[str,Any], verbose: bool, run_dir: pathlib.Path):
         self.profile=profile; self.thresholds=thresholds; self.verbose=verbose; self.run_dir=run_dir
     def run_all(self, baseline: Optional[pathlib.Path]):
+        # Validators import the result models from this module, so load them lazily.
+        from .validators.openapi import validate_openapi
+        from .validators.configs import validate_configs
+        from .validators.policies import validate_policies
+        from .validators.dataq import validate_data_quality
         sections = [
             validate_openapi(self.thresholds, self.run_dir),
             validate_configs(self.thresholds, self.run_dir),
@@ -1,7 +1,8 @@
 # SPDX-License-Identifier: Apache-2.0
 from __future__ import annotations
-from typing import List
-from .run import SectionResult
+from typing import TYPE_CHECKING, List
+if TYPE_CHECKING:
+    from .run import SectionResult
 def charts_section(sections: List[SectionResult])->str:
     items=[f"<details><summary>Metrics: {s.name}</summary><pre>{s.metrics}</pre></details>" for s in sections]
     return "\n".join(items)
@@ -0,0 +1,27 @@
+import pytest
+
+from neuromotorica.cloud.api import main
+
+
+@pytest.fixture(autouse=True)
+def policy_db(tmp_path, monkeypatch):
+    """File-backed policy database per test; the API service is rebuilt on first use."""
+    path = tmp_path / "policy.sqlite3"
+    monkeypatch.setenv("NEUROMOTORICA_POLICY_DB", str(path))
+    main.app.state._policy_service = None
+    main.app.state._async_policy_service = None
+    main.app.state._outcome_compactor = None
+    yield path
+    wrapper = getattr(main.app.state, "_async_policy_service", None)
+    if wrapper is not None:
+        wrapper.close()
+    main.app.state._async_policy_service = None
+    compactor = getattr(main.app.state, "_outcome_compactor", None)
+    if compactor is not None:
+        compactor.close()
+    main.app.state._outcome_compactor = None
+    service = getattr(main.app.state, "_policy_service", None)
+    if isinstance(service, main.PolicyService):
+        service.close()
+        service.db.close()
+    main.app.state._policy_service = None
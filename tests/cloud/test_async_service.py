@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from neuromotorica.bench.loadtest import run_load
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import get_db
+from neuromotorica.cloud.services.async_policy_service import AsyncPolicyService, ServiceOverloaded
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+def test_calls_run_on_the_db_executor():
+    wrapper = AsyncPolicyService(PolicyService(get_db(":memory:")), max_workers=2)
+
+    async def go():
+        await wrapper.update_outcome("u", "ex", "a", True)
+        await wrapper.update_outcomes([{"user_id": "u", "exercise_id": "ex", "cue_text": "b", "success": False}])
+        thread = await wrapper.run(lambda: threading.current_thread().name)
+        return thread, await wrapper.topk("u", "ex"), await wrapper.get_outcome("u", "ex", "a")
+
+    thread, ranked, outcome = asyncio.run(go())
+    wrapper.close()
+    assert thread.startswith("policy-db")
+    assert ranked == [("a", 2 / 3), ("b", 1 / 3)] and outcome["success"] == 1
+    with pytest.raises(ValueError):
+        AsyncPolicyService(wrapper.service, max_concurrency=0)
+
+
+def test_admission_limit_rejects_instead_of_queueing():
+    wrapper = AsyncPolicyService(PolicyService(get_db(":memory:")), max_concurrency=1, acquire_timeout_s=0.01)
+    release = threading.Event()
+
+    async def go():
+        slow = asyncio.ensure_future(wrapper.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ServiceOverloaded):
+            await wrapper.topk("u", "ex")
+        release.set()
+        assert await slow
+
+    asyncio.run(go())
+    wrapper.close()
+    assert wrapper.rejected == 1
+
+
+def test_api_answers_503_when_overloaded(policy_db, monkeypatch):
+    monkeypatch.setenv("NEUROMOTORICA_POLICY_MAX_INFLIGHT", "1")
+    monkeypatch.setenv("NEUROMOTORICA_POLICY_ACQUIRE_MS", "1")
+    client = TestClient(main.app)
+    assert client.get("/policy/best/u/ex").status_code == 200
+    wrapper = main.app.state._async_policy_service
+    assert wrapper.max_concurrency == 1
+
+    async def overloaded(*args, **kwargs):
+        raise ServiceOverloaded("policy service is overloaded; retry later")
+
+    monkeypatch.setattr(wrapper, "run", overloaded)
+    r = client.get("/policy/best/u/ex")
+    assert r.status_code == 503 and r.headers["retry-after"] == "1"
+
+
+def test_wrapper_follows_a_replaced_service(policy_db, monkeypatch):
+    client = TestClient(main.app)
+    client.post("/policy/outcome", json={"user_id": "u", "exercise_id": "ex", "cue_text": "a", "success": True})
+    first = main.app.state._async_policy_service
+    monkeypatch.setattr(main.app.state, "_policy_service", PolicyService(get_db(":memory:")))
+    assert client.get("/policy/best/u/ex").json()["recommendations"] == []
+    assert main.app.state._async_policy_service is not first
+
+
+def test_loadtest_reports_percentiles_per_rate():
+    res = run_load([20, 40], duration_s=0.5, users=5, exercises=2, cues=3)
+    assert res["target"] == "in-process" and [r["rate"] for r in res["rows"]] == [20, 40]
+    assert all(r["errors"] == 0 and r["p99_ms"] >= r["p50_ms"] > 0 for r in res["rows"])
+    assert res["flatness"] > 0
+    assert main.app.state._async_policy_service is None
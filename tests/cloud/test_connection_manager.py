@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from neuromotorica.cloud.api.db import SCHEMA_VERSION, ConnectionManager, get_db
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+@pytest.fixture
+def manager(tmp_path):
+    mgr = ConnectionManager(tmp_path / "policy.sqlite3", busy_timeout_ms=250, cached_statements=16)
+    yield mgr
+    mgr.close()
+
+
+def test_wal_schema_and_readonly_readers(manager):
+    with manager.writer() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    with manager.reader() as conn:
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 250
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM cue_stats")
+
+
+def test_reader_pool_is_bounded_and_closed(tmp_path):
+    mgr = ConnectionManager(tmp_path / "pool.sqlite3", busy_timeout_ms=500, max_readers=2)
+    barrier = threading.Barrier(2)
+
+    def hold(_):
+        with mgr.reader() as conn:
+            barrier.wait(5)
+            return id(conn)
+
+    with ThreadPoolExecutor(2) as pool:
+        assert len(set(pool.map(hold, range(2)))) == 2
+    service = PolicyService(mgr)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: service.topk("u", "ex"), range(64)))
+    with mgr.reader(), mgr.reader():
+        with pytest.raises(sqlite3.OperationalError):
+            with mgr.reader():
+                pass
+    assert mgr.open_readers == 2
+    pooled = []
+    with mgr.reader() as conn:
+        pooled.append(conn)
+    mgr.close()
+    assert mgr.open_readers == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        pooled[0].execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        with mgr.reader():
+            pass
+
+
+def test_readers_not_blocked_by_open_write_transaction(manager):
+    service = PolicyService(manager)
+    service.update_outcome("u", "ex", "a", True)
+    with manager.writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE cue_stats SET success = 100")
+        with ThreadPoolExecutor(1) as pool:
+            assert pool.submit(service.topk, "u", "ex").result(timeout=5) == [("a", 2 / 3)]
+        conn.rollback()
+
+
+def test_concurrent_service_writes_and_reads_stay_consistent(manager):
+    service = PolicyService(manager)
+
+    def work(i):
+        service.update_outcome(f"user{i % 4}", "ex", f"cue{i % 3}", i % 2 == 0)
+        return service.topk(f"user{i % 4}", "ex", k=3)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(200)))
+    with manager.reader() as conn:
+        total = conn.execute("SELECT SUM(success) + SUM(failure) FROM cue_totals").fetchone()[0]
+    assert total == 200
+
+
+def test_bare_connection_is_wrapped():
+    service = PolicyService(get_db(":memory:"))
+    assert isinstance(service.db, ConnectionManager)
+    service.update_outcome("u", "ex", "a", True)
+    assert service.topk("u", "ex") == [("a", 2 / 3)]
+    in_memory = ConnectionManager(":memory:")
+    with in_memory.reader() as r, in_memory.writer() as w:
+        assert r is w
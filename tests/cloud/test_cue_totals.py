@@ -0,0 +1,84 @@
+import sqlite3
+
+from neuromotorica.cloud.api.db import SCHEMA_VERSION, _ensure_schema, get_db
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+def _totals(conn):
+    return {tuple(r[:3]): (r[3], r[4]) for r in conn.execute("SELECT * FROM cue_totals")}
+
+
+def _aggregated(conn):
+    rows = conn.execute(
+        "SELECT user_id, exercise_id, cue_text, SUM(success), SUM(failure) FROM cue_stats"
+        " GROUP BY user_id, exercise_id, cue_text"
+    )
+    return {tuple(r[:3]): (r[3], r[4]) for r in rows}
+
+
+def test_triggers_keep_totals_in_step():
+    service = PolicyService(get_db(":memory:"))
+    for i in range(30):
+        service.update_outcome("u", "ex", f"c{i % 4}", i % 3 == 0, profile=("healthy", "myasthenia", None)[i % 3])
+    service.update_outcomes(
+        [{"user_id": "u", "exercise_id": "ex", "cue_text": "c1", "success": True, "profile": "healthy"}] * 5
+    )
+    assert _totals(service.conn) == _aggregated(service.conn)
+    service.conn.execute("DELETE FROM cue_stats WHERE profile='healthy'")
+    assert _totals(service.conn) == _aggregated(service.conn)
+
+
+def test_deleted_cues_disappear_from_topk():
+    service = PolicyService(get_db(":memory:"))
+    service.update_outcome("u", "ex", "a", True, profile="healthy")
+    service.update_outcome("u", "ex", "b", False, profile="healthy")
+    service.update_outcome("u", "ex", "b", True, profile="myasthenia")
+    service.conn.execute("DELETE FROM cue_stats WHERE cue_text='a'")
+    service.conn.execute("DELETE FROM cue_stats WHERE cue_text='b' AND profile='healthy'")
+    assert service.topk("u", "ex") == [("b", 2 / 3)]
+    assert service.topk("u", "ex", profile="healthy") == [("b", 2 / 3)]
+
+
+def test_topk_profile_fallback_uses_totals():
+    service = PolicyService(get_db(":memory:"))
+    service.update_outcome("u", "ex", "a", True, profile="healthy")
+    service.update_outcome("u", "ex", "a", True, profile="myasthenia")
+    service.update_outcome("u", "ex", "b", False, profile="myasthenia")
+    assert service.topk("u", "ex") == [("a", 0.75), ("b", 1 / 3)]
+    assert service.topk("u", "ex", profile="healthy") == [("a", 2 / 3)]
+    assert service.topk("u", "ex", profile="unknown") == [("a", 0.75), ("b", 1 / 3)]
+
+
+def test_totals_lookup_does_not_aggregate():
+    conn = get_db(":memory:")
+    plan = " ".join(
+        r[3] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT cue_text, success, failure FROM cue_totals WHERE user_id=? AND exercise_id=?",
+            ("u", "ex"),
+        )
+    )
+    assert "USING INDEX" in plan and "B-TREE" not in plan
+
+
+def test_migration_backfills_totals(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "v3.sqlite3"))
+    conn.execute(
+        """
+        CREATE TABLE cue_stats(
+            user_id TEXT, exercise_id TEXT, profile TEXT DEFAULT '', cue_text TEXT,
+            success INTEGER DEFAULT 0, failure INTEGER DEFAULT 0, reps INTEGER, metrics TEXT,
+            extended INTEGER DEFAULT 0, PRIMARY KEY (user_id, exercise_id, profile, cue_text)
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO cue_stats(user_id, exercise_id, profile, cue_text, success, failure) VALUES (?,?,?,?,?,?)",
+        [("u", "ex", "", "a", 2, 1), ("u", "ex", "healthy", "a", 3, 0), ("u", "ex", "", "b", 0, 4)],
+    )
+    conn.execute("PRAGMA user_version = 3")
+    conn.commit()
+    _ensure_schema(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert _totals(conn) == {("u", "ex", "a"): (5, 1), ("u", "ex", "b"): (0, 4)}
+    _ensure_schema(conn)  # idempotent: no double counting on reopen
+    assert _totals(conn) == {("u", "ex", "a"): (5, 1), ("u", "ex", "b"): (0, 4)}
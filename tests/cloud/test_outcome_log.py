@@ -0,0 +1,124 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import ShardedConnectionManager, get_db, reshard
+from neuromotorica.cloud.services.outcome_log import (
+    DAY_MS,
+    OutcomeCompactor,
+    compact,
+    metric_names,
+    outcome_history,
+    unpack_metrics,
+)
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+NOW = 100 * DAY_MS + 12 * 3_600_000
+
+
+def _events(service):
+    with service.db.reader() as conn:
+        names = metric_names(conn)
+        return [
+            (r[0], r[1], r[2], unpack_metrics(r[3], names))
+            for r in conn.execute("SELECT cue_text, success, reps, metrics FROM outcome_events ORDER BY id")
+        ]
+
+
+def _age(service, days_ago):
+    """Spread events over the days before NOW, oldest first."""
+    with service.db.writer() as conn:
+        with conn:
+            ids = [r[0] for r in conn.execute("SELECT id FROM outcome_events ORDER BY id")]
+            for i, day in zip(ids, days_ago):
+                conn.execute("UPDATE outcome_events SET ts=? WHERE id=?", (NOW - day * DAY_MS, i))
+
+
+def test_every_outcome_is_logged_in_the_write_transaction():
+    service = PolicyService(get_db(":memory:"))
+    service.update_outcomes(
+        [
+            {"user_id": "u", "exercise_id": "ex", "cue_text": "a", "success": True, "reps": 5, "metrics": {"snr": 2.0}},
+            {"user_id": "u", "exercise_id": "ex", "cue_text": "a", "success": False, "metrics": {"snr": 1.5, "t": 0.4}},
+        ]
+    )
+    service.update_outcome("u", "ex", "b", True)
+    assert service.get_outcome("u", "ex", "a")["metrics"] == {"snr": 1.5, "t": 0.4}
+    assert _events(service) == [("a", 1, 5, {"snr": 2.0}), ("a", 0, None, {"snr": 1.5, "t": 0.4}), ("b", 1, None, None)]
+    with service.db.reader() as conn:
+        assert [len(r[0]) for r in conn.execute("SELECT metrics FROM outcome_events WHERE metrics IS NOT NULL")] == [
+            12,
+            24,
+        ]
+    service.conn.execute("ALTER TABLE outcome_events RENAME TO hidden")
+    with pytest.raises(Exception):
+        service.update_outcome("u", "ex", "a", True)
+    assert service.get_outcome("u", "ex", "a")["success"] == 1  # the upsert was rolled back with the log
+
+
+def test_group_mode_logs_unaggregated_outcomes():
+    service = PolicyService(get_db(":memory:"), durability="group", flush_interval_s=0.01)
+    for _ in range(5):
+        service.update_outcome("u", "ex", "a", True, metrics={"snr": 1.0})
+    service.close()
+    assert len(_events(service)) == 5 and service.get_outcome("u", "ex", "a")["success"] == 5
+
+
+def test_compaction_rolls_old_events_into_days_without_changing_history():
+    service = PolicyService(get_db(":memory:"))
+    for i in range(9):
+        service.update_outcome("u", "ex", "a", i % 3 != 0, reps=2, metrics={"snr": float(i)}, profile="healthy")
+    service.update_outcome("u", "ex", "b", True)
+    _age(service, [40, 40, 40, 35, 35, 35, 35, 1, 1, 0])
+    before = outcome_history(service.db, "u", "ex")
+    assert [(h["day"], h["cue_text"], h["events"]) for h in before][:2] == [
+        ("1970-03-02", "a", 3),
+        ("1970-03-07", "a", 4),
+    ]
+    assert before[0]["metrics"] == {"snr": {"count": 3, "mean": 1.0, "min": 0.0, "max": 2.0}}
+    assert before[0]["success"] == 2 and before[0]["failure"] == 1 and before[0]["reps"] == 6
+
+    assert compact(service.db, retention_s=30 * 86_400, now_ms=NOW, chunk_rows=2) == {"compacted": 7, "daily_pruned": 0}
+    assert len(_events(service)) == 3
+    assert outcome_history(service.db, "u", "ex") == before
+    assert outcome_history(service.db, "u", "ex", profile="missing") == []
+    assert compact(service.db, retention_s=30 * 86_400, now_ms=NOW)["compacted"] == 0
+
+    pruned = compact(service.db, retention_s=30 * 86_400, now_ms=NOW, daily_retention_days=38)
+    assert pruned == {"compacted": 0, "daily_pruned": 1}
+    assert [h["day"] for h in outcome_history(service.db, "u", "ex")][0] == "1970-03-07"
+
+
+def test_compactor_thread(tmp_path):
+    service = PolicyService(get_db(str(tmp_path / "p.sqlite3")))
+    service.update_outcome("u", "ex", "a", True)
+    compactor = OutcomeCompactor(service.db, retention_s=-1.0, interval_s=0.01).start()
+    deadline = time.monotonic() + 5
+    while compactor.last_result is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    compactor.close()
+    assert compactor.last_result["compacted"] == 1 and not _events(service)
+    assert outcome_history(service.db, "u", "ex")[0]["events"] == 1
+
+
+def test_reshard_keeps_history(tmp_path):
+    single = tmp_path / "policy.sqlite3"
+    service = PolicyService(get_db(str(single)))
+    for i in range(6):
+        service.update_outcome(f"user{i}", "ex", "a", True, metrics={f"m{i % 3}": float(i), "snr": 1.0})
+    compact(service.db, retention_s=0, now_ms=int(time.time() * 1000) + 1, chunk_rows=4)
+    service.update_outcome("user1", "ex", "b", False, metrics={"late": 3.0})
+    before = {f"user{i}": outcome_history(service.db, f"user{i}", "ex") for i in range(6)}
+    reshard(single, tmp_path / "sharded", 3)
+    db = ShardedConnectionManager.open(tmp_path / "sharded")
+    assert {u: outcome_history(db, u, "ex") for u in before} == before
+    db.close()
+
+
+def test_api_runs_a_compactor(policy_db):
+    client = TestClient(main.app)
+    client.post("/policy/outcome", json={"user_id": "u", "exercise_id": "ex", "cue_text": "a", "success": True})
+    compactor = main.app.state._outcome_compactor
+    assert compactor.db is main.app.state._policy_service.db and compactor.retention_s == 30 * 86_400
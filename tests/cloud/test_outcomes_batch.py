@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import get_db
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+def _outcome(cue, success, **extra):
+    return {"user_id": "u", "exercise_id": "ex", "cue_text": cue, "success": success, **extra}
+
+
+def test_update_outcomes_matches_sequential_updates():
+    batch = [
+        _outcome("a", True, reps=3, metrics={"snr": 1.0}),
+        _outcome("a", False, extended=True),
+        _outcome("a", True, reps=5),
+        _outcome("b", False, profile="healthy"),
+        _outcome("b", True, profile=" healthy "),
+    ]
+    bulk = PolicyService(get_db(":memory:"))
+    single = PolicyService(get_db(":memory:"))
+    assert bulk.update_outcomes(batch) == 2
+    for o in batch:
+        single.update_outcome(**o)
+    for cue, profile in (("a", None), ("b", "healthy")):
+        assert bulk.get_outcome("u", "ex", cue, profile=profile) == single.get_outcome("u", "ex", cue, profile=profile)
+    a = bulk.get_outcome("u", "ex", "a")
+    assert (a["success"], a["failure"], a["reps"], a["metrics"], a["extended"]) == (2, 1, 5, {"snr": 1.0}, True)
+    assert bulk.update_outcomes([]) == 0
+
+
+def test_update_outcomes_group_mode_queues_whole_batch():
+    service = PolicyService(get_db(":memory:"), durability="group", flush_interval_s=0.01)
+    assert service.update_outcomes([_outcome("a", True)] * 10) == 1
+    service.close()
+    assert service.get_outcome("u", "ex", "a")["success"] == 10
+
+
+def test_batch_endpoint_reports_per_item_status():
+    client = TestClient(main.app)
+    r = client.post(
+        "/policy/outcomes:batch",
+        json=[_outcome("a", True), {"user_id": "u"}, _outcome("a", False, metrics={"snr": 2})],
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["status"], body["accepted"], body["rejected"], body["rows"]) == ("ok", 2, 1, 1)
+    assert [item["status"] for item in body["items"]] == ["ok", "invalid", "ok"]
+    assert body["items"][1]["detail"]
+    best = client.get("/policy/best/u/ex").json()["recommendations"]
+    assert best == [{"cue_text": "a", "score": 0.5}]
+
+
+def test_batch_endpoint_limits(monkeypatch):
+    monkeypatch.setattr(main.app.state, "_policy_service", PolicyService(get_db(":memory:")), raising=False)
+    client = TestClient(main.app)
+    r = client.post("/policy/outcomes:batch", json=[{"cue_text": ""}])
+    assert r.json()["status"] == "rejected"
+    r = client.post("/policy/outcomes:batch", json=[_outcome("a", True)] * (main.MAX_OUTCOME_BATCH + 1))
+    assert r.status_code == 413
@@ -0,0 +1,72 @@
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import ShardedConnectionManager, get_db
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+def _seed(service, users=30):
+    rng = random.Random(0)
+    service.update_outcomes(
+        {
+            "user_id": f"user{u}",
+            "exercise_id": f"ex{e}",
+            "cue_text": f"cue{c}",
+            "success": rng.random() < 0.6,
+            "profile": rng.choice(["healthy", "myasthenia", None]),
+        }
+        for u in range(users)
+        for e in range(3)
+        for c in range(rng.randint(0, 6))
+        for _ in range(rng.randint(1, 4))
+    )
+    return [(f"user{u}", f"ex{e}") for u in range(users + 2) for e in range(3)]
+
+
+def test_topk_many_matches_topk_in_request_order():
+    service = PolicyService(get_db(":memory:"))
+    pairs = _seed(service)
+    pairs = pairs[::-1] + pairs[:5]
+    for profile in (None, "healthy", " myasthenia ", "unknown"):
+        for k in (1, 3, 10):
+            expected = [service.topk(u, e, k=k, profile=profile) for u, e in pairs]
+            assert service.topk_many(pairs, k=k, profile=profile, chunk_size=7) == expected
+    assert service.topk_many([]) == []
+
+
+def test_topk_many_on_sharded_store(tmp_path):
+    db = ShardedConnectionManager(tmp_path / "store", 3)
+    service = PolicyService(db)
+    pairs = _seed(service, users=12)
+    assert service.topk_many(pairs, profile="healthy") == [service.topk(u, e, profile="healthy") for u, e in pairs]
+    db.close()
+
+
+def test_best_batch_endpoint_streams_ndjson(policy_db):
+    client = TestClient(main.app)
+    for cue, success in (("a", True), ("b", False), ("a", True)):
+        client.post("/policy/outcome", json={"user_id": "u", "exercise_id": "ex", "cue_text": cue, "success": success})
+    body = {"pairs": [{"user_id": "u", "exercise_id": "ex"}, {"user_id": "nobody", "exercise_id": "ex"}], "k": 1}
+    r = client.post("/policy/best:batch", json=body)
+    assert r.status_code == 200 and r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines == [
+        {"user_id": "u", "exercise_id": "ex", "profile": None, "recommendations": [{"cue_text": "a", "score": 0.75}]},
+        {"user_id": "nobody", "exercise_id": "ex", "profile": None, "recommendations": []},
+    ]
+    single = client.get("/policy/best/u/ex", params={"k": 1}).json()
+    assert lines[0]["recommendations"] == single["recommendations"]
+
+
+def test_best_batch_endpoint_validation(policy_db, monkeypatch):
+    client = TestClient(main.app)
+    assert client.post("/policy/best:batch", json={"pairs": [], "k": 11}).status_code == 422
+    assert client.post("/policy/best:batch", json={"pairs": [{"user_id": ""}]}).status_code == 422
+    empty = client.post("/policy/best:batch", json={"pairs": []})
+    assert empty.status_code == 200 and empty.text == ""
+    monkeypatch.setattr(main, "MAX_BEST_BATCH", 2)
+    pairs = [{"user_id": "u", "exercise_id": "ex"}] * 3
+    assert client.post("/policy/best:batch", json={"pairs": pairs}).status_code == 413
@@ -0,0 +1,123 @@
+import gzip
+import json
+import sqlite3
+import time
+
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from neuromotorica.cli import app as cli_app
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import (
+    ConnectionManager,
+    ShardedConnectionManager,
+    _ensure_schema,
+    get_db,
+    reshard,
+)
+from neuromotorica.cloud.services.policy_export import export_watermark, iter_export, ndjson_chunks
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+def _fill(service, users=5):
+    service.update_outcomes(
+        {"user_id": f"user{u}", "exercise_id": f"ex{e}", "cue_text": cue, "success": True, "profile": profile,
+         "metrics": {"snr": 1.0} if cue == "a" else None}
+        for u in range(users) for e in range(2) for cue in ("a", "b") for profile in (None, "healthy")
+    )
+
+
+def test_keyset_pages_cover_the_table_in_key_order():
+    service = PolicyService(get_db(":memory:"))
+    _fill(service)
+    rows = list(iter_export(service.db, page_size=3))
+    keys = [(r["user_id"], r["exercise_id"], r["profile"] or "", r["cue_text"]) for r in rows]
+    assert len(keys) == 40 and keys == sorted(set(keys))
+    first = rows[0]
+    assert first["profile"] is None and first["metrics"] == {"snr": 1.0} and first["extended"] is False
+    assert all(r["updated_at"] > 1_600_000_000_000 for r in rows)
+
+
+def test_watermark_makes_exports_incremental():
+    service = PolicyService(get_db(":memory:"))
+    _fill(service)
+    watermark = export_watermark(service.db)
+    assert watermark == max(r["updated_at"] for r in iter_export(service.db))
+    time.sleep(0.005)
+    service.update_outcome("user1", "ex0", "a", False)
+    service.update_outcome("new", "ex0", "z", True)
+    changed = list(iter_export(service.db, since=watermark + 1))
+    assert [(r["user_id"], r["cue_text"], r["failure"]) for r in changed] == [("new", "z", 0), ("user1", "a", 1)]
+    assert {("new", "z"), ("user1", "a")} <= {(r["user_id"], r["cue_text"]) for r in iter_export(service.db, since=watermark)}
+    assert export_watermark(PolicyService(get_db(":memory:")).db, since=7) == 7
+
+
+def test_sharded_export_and_reshard_keep_updated_at(tmp_path):
+    single = tmp_path / "policy.sqlite3"
+    _fill(PolicyService(get_db(str(single))))
+    source = ConnectionManager(single)
+    before = {json.dumps(r) for r in iter_export(source)}
+    source.close()
+    reshard(single, tmp_path / "sharded", 3)
+    db = ShardedConnectionManager.open(tmp_path / "sharded")
+    assert {json.dumps(r) for r in iter_export(db, page_size=4)} == before
+    assert export_watermark(db) <= max(json.loads(r)["updated_at"] for r in before)
+    db.close()
+
+
+def test_migration_adds_updated_at(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "v5.sqlite3"))
+    conn.execute(
+        """
+        CREATE TABLE cue_stats(
+            user_id TEXT, exercise_id TEXT, profile TEXT DEFAULT '', cue_text TEXT,
+            success INTEGER DEFAULT 0, failure INTEGER DEFAULT 0, reps INTEGER, metrics TEXT,
+            extended INTEGER DEFAULT 0, PRIMARY KEY (user_id, exercise_id, profile, cue_text)
+        )
+        """
+    )
+    conn.execute("INSERT INTO cue_stats(user_id, exercise_id, cue_text, success) VALUES ('u', 'ex', 'a', 1)")
+    conn.execute("PRAGMA user_version = 5")
+    conn.commit()
+    _ensure_schema(conn)
+    assert conn.execute("SELECT updated_at FROM cue_stats").fetchall() == [(0,)]
+
+
+def test_ndjson_chunks_gzip_roundtrip():
+    rows = [{"i": i, "cue": "ф"} for i in range(1234)]
+    plain = b"".join(ndjson_chunks(rows, chunk_lines=100))
+    packed = b"".join(ndjson_chunks(iter(rows), compress=True, chunk_lines=100))
+    assert gzip.decompress(packed) == plain
+    assert [json.loads(line) for line in plain.decode().splitlines()] == rows
+    assert b"".join(ndjson_chunks([])) == b""
+
+
+def test_export_endpoint(policy_db):
+    client = TestClient(main.app)
+    for user in ("u1", "u2"):
+        time.sleep(0.005)  # distinct millisecond stamps
+        client.post("/policy/outcome", json={"user_id": user, "exercise_id": "ex", "cue_text": "a", "success": True})
+    r = client.get("/policy/export", params={"page_size": 1})
+    assert r.status_code == 200 and r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["user_id"] for row in rows] == ["u1", "u2"]
+    watermark = int(r.headers["x-export-watermark"])
+    assert watermark == rows[-1]["updated_at"]
+    packed = client.get("/policy/export", params={"gzip": True, "since": watermark})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert [json.loads(line)["user_id"] for line in packed.text.splitlines()] == ["u2"]
+    assert client.get("/policy/export", params={"page_size": 0}).status_code == 422
+
+
+def test_export_cli(tmp_path):
+    single = tmp_path / "policy.sqlite3"
+    _fill(PolicyService(get_db(str(single))), users=2)
+    out = tmp_path / "export.ndjson.gz"
+    res = CliRunner().invoke(cli_app, ["policy-export", str(single), "-o", str(out), "--gzip", "--page-size", "3"])
+    assert res.exit_code == 0, res.output
+    summary = json.loads(res.output)
+    lines = gzip.decompress(out.read_bytes()).decode().splitlines()
+    assert summary["rows"] == len(lines) == 16
+    again = CliRunner().invoke(cli_app, ["policy-export", str(single), "--since", str(summary["watermark"] + 1)])
+    assert again.exit_code == 0 and json.loads(again.output.strip().splitlines()[-1])["rows"] == 0
+    assert CliRunner().invoke(cli_app, ["policy-export", str(tmp_path / "nope")]).exit_code == 2
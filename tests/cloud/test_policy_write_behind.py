@@ -0,0 +1,168 @@
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import get_db
+from neuromotorica.cloud.services.policy_service import (
+    IngestClosed,
+    IngestQueueFull,
+    IngestWriteError,
+    PolicyService,
+)
+
+
+def _count(conn, cue_text):
+    row = conn.execute(
+        "SELECT SUM(success), SUM(failure) FROM cue_stats WHERE cue_text=?", (cue_text,)
+    ).fetchone()
+    return (row[0] or 0, row[1] or 0)
+
+
+def test_commit_mode_returns_updated_row():
+    service = PolicyService(get_db(":memory:"))
+    out = service.update_outcome("u", "ex", "cue", True, reps=5, metrics={"snr": 2.0})
+    assert out["success"] == 1 and out["reps"] == 5 and out["metrics"] == {"snr": 2.0}
+    service.close()
+
+
+def test_group_mode_batches_and_flushes():
+    service = PolicyService(get_db(":memory:"), durability="group", batch_size=64, flush_interval_s=0.01)
+    for i in range(500):
+        assert service.update_outcome("u", "ex", f"cue{i % 3}", i % 2 == 0, profile="healthy") is None
+    service.flush()
+    assert service.pending == 0
+    totals = [_count(service.conn, f"cue{i}") for i in range(3)]
+    assert sum(s + f for s, f in totals) == 500
+    assert sum(s for s, _ in totals) == 250
+    ranked = service.topk("u", "ex", k=3, profile="healthy")
+    assert len(ranked) == 3
+    service.close()
+
+
+def test_group_mode_close_drains_queue():
+    conn = get_db(":memory:")
+    service = PolicyService(conn, durability="group", batch_size=1000, flush_interval_s=5.0)
+    for _ in range(20):
+        service.update_outcome("u", "ex", "cue", False)
+    service.close()
+    assert _count(conn, "cue") == (0, 20)
+    service.close()  # idempotent
+
+
+def test_group_mode_backpressure_raises_when_full():
+    service = PolicyService(get_db(":memory:"), durability="group", batch_size=1, max_queue=2, put_timeout_s=0.01)
+    gate = threading.Event()
+    original = service._apply
+
+    def slow_apply(rows):
+        gate.wait(5)
+        original(rows)
+
+    service._apply = slow_apply
+    with pytest.raises(IngestQueueFull):
+        for _ in range(50):
+            service.update_outcome("u", "ex", "cue", True)
+    gate.set()
+    service.close()
+
+
+def test_failed_batch_is_dead_lettered_and_flush_raises():
+    conn = get_db(":memory:")
+    service = PolicyService(conn, durability="group", flush_interval_s=0.01, max_retries=1, retry_backoff_s=0.0)
+    conn.execute("ALTER TABLE cue_stats RENAME TO cue_stats_hidden")
+    service.update_outcome("u", "ex", "cue", True)
+    with pytest.raises(IngestWriteError):
+        service.flush()
+    assert len(service.dead_letters) == 1 and service.failed_batches == 0
+    conn.execute("ALTER TABLE cue_stats_hidden RENAME TO cue_stats")
+    service.update_outcome("u", "ex", "cue", True)
+    service.flush()
+    service.close()
+    assert _count(conn, "cue") == (1, 0)
+
+
+def test_transient_failure_is_retried():
+    service = PolicyService(get_db(":memory:"), durability="group", flush_interval_s=0.01, retry_backoff_s=0.0)
+    original = service._write
+    calls = []
+
+    def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        original(rows)
+
+    service._write = flaky
+    service.update_outcome("u", "ex", "cue", True)
+    service.flush()
+    assert len(calls) == 2 and not service.dead_letters
+    service.close()
+
+
+def test_cache_failure_does_not_stop_writer():
+    class _BrokenCache:
+        cleared = False
+
+        def invalidate(self, pairs):
+            raise RuntimeError("boom")
+
+        def clear(self):
+            self.cleared = True
+
+    cache = _BrokenCache()
+    service = PolicyService(get_db(":memory:"), durability="group", flush_interval_s=0.01, cache=cache)
+    service.update_outcome("u", "ex", "cue", True)
+    service.flush()
+    service.update_outcome("u", "ex", "cue", True)
+    service.close()
+    assert cache.cleared
+    assert service.get_outcome("u", "ex", "cue")["success"] == 2
+
+
+def test_writes_after_close_are_rejected():
+    for durability in ("group", "commit"):
+        service = PolicyService(get_db(":memory:"), durability=durability)
+        service.close()
+        with pytest.raises(IngestClosed):
+            service.update_outcome("u", "ex", "cue", True)
+        with pytest.raises(IngestClosed):
+            service.update_outcomes([{"user_id": "u", "exercise_id": "ex", "cue_text": "c", "success": True}])
+        service.flush()
+
+
+def test_invalid_durability_rejected():
+    with pytest.raises(ValueError):
+        PolicyService(sqlite3.connect(":memory:"), durability="eventually")
+
+
+def test_api_group_mode_queues_and_flushes_on_shutdown(monkeypatch, policy_db):
+    monkeypatch.setenv("NEUROMOTORICA_POLICY_DURABILITY", "group")
+    with TestClient(main.app) as client:
+        r = client.post(
+            "/policy/outcome",
+            json={"user_id": "u", "exercise_id": "ex", "cue_text": "cue", "success": True},
+        )
+        assert r.status_code == 200
+        assert r.json() == {"status": "queued", "outcome": None}
+        service = main.app.state._policy_service
+        assert service.durability == "group"
+    assert main.app.state._policy_service is None
+    assert _count(get_db(str(policy_db)), "cue") == (1, 0)
+
+
+def test_api_queue_full_maps_to_503(monkeypatch):
+    class _Full:
+        def update_outcome(self, *args, **kwargs):
+            raise IngestQueueFull("policy outcome queue is full; retry later")
+
+    monkeypatch.setattr(main.app.state, "_policy_service", _Full(), raising=False)
+    client = TestClient(main.app)
+    r = client.post(
+        "/policy/outcome",
+        json={"user_id": "u", "exercise_id": "ex", "cue_text": "cue", "success": False},
+    )
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
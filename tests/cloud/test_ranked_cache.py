@@ -0,0 +1,105 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import get_db
+from neuromotorica.cloud.services.policy_service import PolicyService
+from neuromotorica.cloud.services.ranked_cache import RankedCache
+
+
+def test_lru_bounds_and_counters():
+    cache = RankedCache(max_entries=2, max_bytes=100)
+    assert cache.put(("u", "ex", None, 1), "a", 10, 0)
+    assert cache.put(("u", "ex", None, 2), "b", 10, 0)
+    assert cache.get(("u", "ex", None, 1), 0) == "a"
+    cache.put(("u", "ex", None, 3), "c", 10, 0)
+    assert cache.get(("u", "ex", None, 2), 0) is None
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (1, 1, 1, 2)
+    cache.put(("u", "ex", None, 4), "d", 95, 0)
+    assert len(cache) == 1 and cache.nbytes == 95
+    assert not cache.put(("u", "ex", None, 5), "e", 101, 0)
+    assert cache.hit_rate == 0.5
+    with pytest.raises(ValueError):
+        RankedCache(max_entries=0)
+
+
+def test_outdated_version_is_a_miss_and_state_stays_bounded():
+    cache = RankedCache(max_entries=8)
+    cache.put(("u", "ex", None, 3), "x", 1, 4)
+    assert cache.get(("u", "ex", None, 3), 5) is None
+    assert len(cache) == 0 and cache.invalidations == 1
+    for i in range(1000):
+        cache.put((f"user{i}", "ex", None, 3), "y", 1, 0)
+        cache.invalidate([(f"user{i}", "ex")])
+    assert len(cache) == 0 and not cache._by_pair
+
+
+def test_invalidate_drops_pair():
+    cache = RankedCache()
+    cache.put(("u", "ex", None, 3), "x", 1, 0)
+    cache.put(("u", "ex", "healthy", 3), "y", 1, 0)
+    cache.put(("v", "ex", None, 3), "z", 1, 0)
+    assert cache.invalidate([("u", "ex")]) == 2
+    assert cache.get(("v", "ex", None, 3), 0) == "z"
+
+
+def test_service_writes_invalidate_cache_and_bump_version():
+    cache = RankedCache()
+    service = PolicyService(get_db(":memory:"), cache=cache)
+    assert service.version("u", "ex") == 0
+    for write in (
+        lambda: service.update_outcome("u", "ex", "a", True),
+        lambda: service.update_outcomes([{"user_id": "u", "exercise_id": "ex", "cue_text": "a", "success": True}]),
+    ):
+        before = service.version("u", "ex")
+        cache.put(("u", "ex", None, 3), "cached", 1, before)
+        write()
+        assert cache.get(("u", "ex", None, 3), before) is None
+        assert service.version("u", "ex") > before
+    group = PolicyService(get_db(":memory:"), durability="group", cache=cache, flush_interval_s=0.01)
+    cache.put(("u", "ex", None, 3), "cached", 1, 0)
+    group.update_outcome("u", "ex", "a", True)
+    group.close()
+    assert len(cache) == 0
+
+
+def test_cache_is_validated_against_other_writers(policy_db):
+    writer = PolicyService(get_db(str(policy_db)))
+    client = TestClient(main.app)
+    writer.update_outcome("u", "ex", "a", True)
+    first = client.get("/policy/best/u/ex")
+    # A write from another process bypasses this worker's invalidation hook.
+    writer.update_outcome("u", "ex", "b", True)
+    second = client.get("/policy/best/u/ex", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200 and second.headers["etag"] != first.headers["etag"]
+    assert [r["cue_text"] for r in second.json()["recommendations"]] == ["a", "b"]
+
+
+def test_best_endpoint_etag_and_invalidation(monkeypatch):
+    service = PolicyService(get_db(":memory:"), cache=RankedCache())
+    monkeypatch.setattr(main.app.state, "_policy_service", service, raising=False)
+    client = TestClient(main.app)
+    client.post("/policy/outcome", json={"user_id": "u", "exercise_id": "ex", "cue_text": "a", "success": True})
+
+    first = client.get("/policy/best/u/ex")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.json()["recommendations"] == [{"cue_text": "a", "score": 2 / 3}]
+
+    cached = client.get("/policy/best/u/ex", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag and not cached.content
+    assert client.get("/policy/best/u/ex").status_code == 200
+    assert service.cache.hits == 1
+
+    client.post("/policy/outcome", json={"user_id": "u", "exercise_id": "ex", "cue_text": "b", "success": True})
+    changed = client.get("/policy/best/u/ex", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(changed.json()["recommendations"]) == 2
+
+
+def test_best_endpoint_without_cache_still_sends_etag(monkeypatch):
+    monkeypatch.setattr(main.app.state, "_policy_service", PolicyService(get_db(":memory:")), raising=False)
+    client = TestClient(main.app)
+    r = client.get("/policy/best/u/ex", params={"k": 2})
+    assert r.status_code == 200 and r.json()["recommendations"] == []
+    assert client.get("/policy/best/u/ex", params={"k": 2}, headers={"If-None-Match": "*"}).status_code == 304
@@ -0,0 +1,101 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from neuromotorica.cli import app as cli_app
+from neuromotorica.cloud.api import main
+from neuromotorica.cloud.api.db import (
+    SCHEMA_VERSION,
+    ShardedConnectionManager,
+    get_db,
+    reshard,
+    shard_index,
+)
+from neuromotorica.cloud.services.policy_service import PolicyService
+
+
+def _fill(service, users=20):
+    for i in range(users):
+        for cue in ("a", "b"):
+            service.update_outcome(f"user{i}", "ex", cue, (i + len(cue)) % 2 == 0, profile="healthy")
+    return {f"user{i}": service.topk(f"user{i}", "ex") for i in range(users)}
+
+
+def test_shard_index_is_stable():
+    assert shard_index("athlete-42", 8) == shard_index("athlete-42", 8)
+    assert {shard_index(f"user{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_users_are_routed_to_their_shard(tmp_path):
+    db = ShardedConnectionManager(tmp_path / "store", 4)
+    service = PolicyService(db)
+    _fill(service)
+    for index, shard in enumerate(db.shards()):
+        with shard.reader() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            users = {r[0] for r in conn.execute("SELECT DISTINCT user_id FROM cue_stats")}
+        assert users and all(shard_index(u, 4) == index for u in users)
+    service.update_outcomes(
+        [{"user_id": f"user{i}", "exercise_id": "ex", "cue_text": "c", "success": True} for i in range(20)]
+    )
+    assert all(("c", 2 / 3) in service.topk(f"user{i}", "ex") for i in range(20))
+    db.close()
+    with pytest.raises(ValueError, match="reshard"):
+        ShardedConnectionManager(tmp_path / "store", 2)
+    reopened = ShardedConnectionManager.open(tmp_path / "store")
+    assert len(reopened.shards()) == 4
+    reopened.close()
+
+
+def test_shard_writers_run_in_parallel(tmp_path):
+    db = ShardedConnectionManager(tmp_path / "store", 2)
+    users = {shard_index(f"user{i}", 2): f"user{i}" for i in range(10)}
+    with db.route(users[0]).writer():
+        service = PolicyService(db)
+        with ThreadPoolExecutor(1) as pool:
+            # The other shard's writer is free while shard 0 is locked.
+            pool.submit(service.update_outcome, users[1], "ex", "a", True).result(timeout=5)
+    db.close()
+
+
+def test_reshard_preserves_rankings(tmp_path):
+    single = tmp_path / "policy.sqlite3"
+    before = _fill(PolicyService(get_db(str(single))))
+    counts = reshard(single, tmp_path / "four", 4, chunk_rows=7)
+    assert sum(counts.values()) == 40
+    four = ShardedConnectionManager.open(tmp_path / "four")
+    assert {u: PolicyService(four).topk(u, "ex") for u in before} == before
+    four.close()
+    reshard(tmp_path / "four", tmp_path / "three", 3)
+    three = ShardedConnectionManager.open(tmp_path / "three")
+    service = PolicyService(three)
+    assert {u: service.topk(u, "ex") for u in before} == before
+    assert all(service.version(u, "ex") > 0 for u in before)
+    three.close()
+    with pytest.raises(ValueError):
+        reshard(single, tmp_path / "three", 2)
+
+
+def test_reshard_cli(tmp_path):
+    single = tmp_path / "policy.sqlite3"
+    _fill(PolicyService(get_db(str(single))), users=3)
+    res = CliRunner().invoke(cli_app, ["policy-reshard", str(single), str(tmp_path / "out"), "-n", "2"])
+    assert res.exit_code == 0, res.output
+    assert sum(json.loads(res.output)["rows"].values()) == 6
+    missing = CliRunner().invoke(cli_app, ["policy-reshard", str(tmp_path / "nope"), str(tmp_path / "x")])
+    assert missing.exit_code == 2
+
+
+def test_api_on_sharded_store(monkeypatch, tmp_path):
+    monkeypatch.setenv("NEUROMOTORICA_POLICY_DB", str(tmp_path / "sharded"))
+    monkeypatch.setenv("NEUROMOTORICA_POLICY_SHARDS", "3")
+    with TestClient(main.app) as client:
+        for user in ("u1", "u2", "u3", "u4"):
+            r = client.post("/policy/outcome", json={"user_id": user, "exercise_id": "ex", "cue_text": "a", "success": True})
+            assert r.json()["outcome"]["success"] == 1
+            assert client.get(f"/policy/best/{user}/ex").json()["recommendations"] == [{"cue_text": "a", "score": 2 / 3}]
+        assert isinstance(main.app.state._policy_service.db, ShardedConnectionManager)
+    assert json.loads((tmp_path / "sharded" / "manifest.json").read_text())["shards"] == 3
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from neuromotorica.bench import app
+from neuromotorica.bench.frontier import grid_configs, pareto_front, relative_errors, run_frontier
+
+
+def test_pareto_front_and_errors():
+    pts = [{"runtime_ms": 1.0, "error": 0.5}, {"runtime_ms": 2.0, "error": 0.6},
+           {"runtime_ms": 3.0, "error": 0.1}, {"runtime_ms": 1.5, "error": 0.2}]
+    assert [p["runtime_ms"] for p in pareto_front(pts)] == [1.0, 1.5, 3.0]
+    assert relative_errors({"a": 1.1, "b": 0.5}, {"a": 1.0, "b": 0.0}) == pytest.approx({"a": 0.1, "b": 0.5})
+    assert len(grid_configs({"dt": (1e-3, 5e-4), "force_decimation": (1, 2, 4)})) == 6
+
+
+def test_run_frontier_against_reference():
+    res = run_frontier(["baseline"], seconds=0.3, units=4, grid={"dt": (1e-3,), "force_decimation": (1, 2)},
+                       reference={"dt": 5e-4})
+    assert res["reference_config"]["dt"] == 5e-4
+    assert len(res["points"]) == 4
+    ext = [p for p in res["points"] if p["model"] == "simulate_extended"]
+    assert set(ext[0]["errors"]) == {"peak_force_N", "mean_force_N", "snr", "jitter_ms"}
+    front = res["frontier"]["baseline"]["scenario_sim"]
+    assert front and all(p["mem_peak_mb"] > 0 for p in front)
+    with pytest.raises(ValueError):
+        run_frontier(["baseline"], models=("nope",))
+
+
+def test_frontier_cli(tmp_path):
+    out = tmp_path / "f.json"
+    res = CliRunner().invoke(app, ["frontier", "-m", "scenario_sim", "--seconds", "0.3", "--units", "4",
+                                   "--dt", "0.001", "--fft-threshold", "2048", "--decimation", "1",
+                                   "--ref-dt", "0.0005", "--out", str(out)])
+    assert res.exit_code == 0, res.stdout
+    data = json.loads(out.read_text())
+    assert data["frontier"]["baseline"]["scenario_sim"][0]["config"]["dt"] == 0.001
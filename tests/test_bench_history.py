@@ -0,0 +1,54 @@
+import json
+
+from typer.testing import CliRunner
+
+from neuromotorica.bench import app
+from neuromotorica.bench.history import BenchHistory, host_fingerprint
+from neuromotorica.bench.report import render_html
+
+
+def _row(ts, latency, n=100):
+    return {"timestamp": ts, "scenario": "egreedy", "n": n, "profile": "standard", "threads": 1,
+            "latency_ms_avg": latency, "latency_ms_p95": latency * 1.1, "mem_peak_mb": 1.0,
+            "throughput_ops_per_s": 1000.0 / latency, "latency_samples": [latency, latency * 1.05]}
+
+
+def test_history_trend_and_rolling_baseline(tmp_path):
+    hist = BenchHistory(tmp_path / "h.sqlite")
+    for idx, lat in enumerate([10.0, 11.0, 12.0, 100.0]):
+        hist.record([_row(f"2026010{idx}T000000Z", lat)], git_rev=f"rev{idx}")
+    hist.record([_row("20260109T000000Z", 50.0)], host="otherhost", git_rev="x")
+
+    points = hist.trend("egreedy", n=100, host=host_fingerprint())
+    assert [p["latency_ms_avg"] for p in points] == [10.0, 11.0, 12.0, 100.0]
+    assert [p["git_rev"] for p in points][-1] == "rev3"
+    assert len(hist.trend("egreedy")) == 5 and len(hist.trend("egreedy", last=2)) == 2
+
+    (base,) = hist.rolling_baseline([("egreedy", 100, "standard", 1)], last=3, before="20260103T000000Z")
+    assert base["runs"] == 3 and base["latency_ms_avg"] == 11.0 and len(base["latency_samples"]) == 6
+    assert hist.rolling_baseline([("egreedy", 999, "standard", 1)]) == []
+    hist.close()
+
+    html = render_html([], {"checks": []}, "t", tmp_path, trends={"egreedy n=100 t=1": [10.0, 11.0, 12.0]})
+    assert "<polyline" in html and "+20.0%" in html
+
+
+def test_bench_cli_records_history_and_uses_rolling_baseline(tmp_path):
+    db = tmp_path / "hist.sqlite"
+    common = ["-s", "egreedy", "-n", "50", "-r", "2", "--outdir", str(tmp_path / "out"), "--history", str(db)]
+    cli = CliRunner()
+    for _ in range(2):
+        assert cli.invoke(app, ["run", *common, "--format", "json", "--no-fail-on-regress"]).exit_code == 0
+    res = cli.invoke(app, ["run", *common, "--format", "json,html", "--rolling-baseline", "2", "--no-fail-on-regress"])
+    assert res.exit_code == 0, res.stdout
+    run_dir = max((tmp_path / "out").iterdir())
+    checks = json.loads((run_dir / "compare.json").read_text())["checks"]
+    assert "baseline_missing" not in {c["metric"] for c in checks}
+    assert "<svg" in (run_dir / "report.html").read_text()
+
+    trend = cli.invoke(app, ["trend", "-s", "egreedy", "-n", "50", "--history", str(db)])
+    assert trend.exit_code == 0 and len(trend.stdout.strip().splitlines()) == 3
+    out = tmp_path / "rolling.json"
+    exported = cli.invoke(app, ["baseline", "-s", "egreedy", "-n", "50", "--history", str(db), "--out", str(out)])
+    assert exported.exit_code == 0 and json.loads(out.read_text())[0]["runs"] == 3
+    assert cli.invoke(app, ["trend", "-s", "linucb", "--history", str(db)]).exit_code == 1
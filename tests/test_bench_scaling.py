@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+from typer.testing import CliRunner
+
+from neuromotorica.bench import app
+from neuromotorica.bench.runner import BenchRunner
+from neuromotorica.bench.scaling import compare_scaling, fit_scaling, scaling_report
+
+
+def _rows(scenario, ns, fn, threads=1, profile="standard"):
+    return [{"scenario": scenario, "n": n, "profile": profile, "threads": threads,
+             "latency_ms_avg": fn(n), "mem_peak_mb": 0.001 * n} for n in ns]
+
+
+def test_fit_scaling_recovers_exponents_and_models():
+    ns = [1000, 2000, 4000, 8000, 16000]
+    quad = fit_scaling(ns, [3e-6 * n**2 for n in ns])
+    assert abs(quad["exponent"] - 2.0) < 1e-9 and abs(quad["tail_exponent"] - 2.0) < 1e-9
+    nlogn = fit_scaling(ns, [1e-3 * n * np.log(n) for n in ns])
+    assert nlogn["model"] == "nlogn" and 1.0 < nlogn["exponent"] < 1.2
+    # Fixed overhead flattens the global fit; the tail exponent still exposes O(n^2).
+    hidden = fit_scaling(ns, [50.0 + 1e-6 * n**2 for n in ns])
+    assert hidden["exponent"] < 1.0 < hidden["tail_exponent"]
+    assert fit_scaling([1000], [1.0])["tail_exponent"] is None
+
+
+def test_scaling_report_threads_and_exponent_regression():
+    ns = [1000, 4000, 16000]
+    base = scaling_report(_rows("conv", ns, lambda n: 0.01 * n))
+    cur_rows = _rows("conv", ns, lambda n: 1e-6 * n**2) + [
+        {"scenario": "conv", "n": 16000, "profile": "standard", "threads": 4,
+         "latency_ms_avg": 1e-6 * 16000**2 / 2, "mem_peak_mb": 16.0}]
+    cur = scaling_report(cur_rows)
+    eff = cur["threads"]["conv"]["standard"]["16000"]["4"]
+    assert eff["speedup"] == 2.0 and eff["efficiency"] == 0.5
+    checks = compare_scaling(cur, base, lambda sc: {})
+    status = {c["metric"]: c["status"] for c in checks}
+    assert status == {"latency_exponent": "fail", "mem_exponent": "pass"}
+    capped = compare_scaling(base, {}, lambda sc: {"latency_exponent": {"max": 0.5}})
+    assert [c["status"] for c in capped if c["metric"] == "latency_exponent"] == ["fail"]
+
+
+def test_scaling_report_keeps_profiles_apart():
+    ns = [1000, 4000, 16000]
+    rows = _rows("conv", ns, lambda n: 0.01 * n) + _rows("conv", ns, lambda n: 1e-6 * n**2, profile="heavy")
+    report = scaling_report(rows)
+    assert set(report["sizes"]["conv"]) == {"standard", "heavy"}
+    assert abs(report["sizes"]["conv"]["standard"]["latency"]["tail_exponent"] - 1.0) < 1e-9
+    assert abs(report["sizes"]["conv"]["heavy"]["latency"]["tail_exponent"] - 2.0) < 1e-9
+    # Each profile is gated against its own baseline, not whichever profile was fitted last.
+    base = scaling_report(_rows("conv", ns, lambda n: 1e-6 * n**2, profile="heavy") + _rows("conv", ns, lambda n: 0.01 * n))
+    status = {tuple(c["key"]): c["status"] for c in compare_scaling(report, base, lambda sc: {})
+              if c["metric"] == "latency_exponent"}
+    assert status == {("conv", "standard"): "pass", ("conv", "heavy"): "pass"}
+
+
+def test_bench_cli_threads_and_scaling_section(tmp_path):
+    res = CliRunner().invoke(app, ["run", "-s", "muscle_force_u16_dt1000us", "-s", "egreedy", "-n", "200", "-n", "800",
+                                   "-r", "1", "-t", "1", "-t", "2", "--outdir", str(tmp_path), "--format", "json",
+                                   "--no-fail-on-regress", "--no-record"])
+    assert res.exit_code == 0, res.stdout
+    rows = json.loads(next(tmp_path.glob("*/results.json")).read_text())
+    assert sorted(r["threads"] for r in rows if r["scenario"] == "egreedy") == [1, 1]
+    assert sorted(r["threads"] for r in rows if r["scenario"].startswith("muscle")) == [1, 1, 2, 2]
+    cmp_ = json.loads(next(tmp_path.glob("*/compare.json")).read_text())
+    assert cmp_["scaling"]["sizes"]["egreedy"]["standard"]["latency"]["tail_exponent"] is not None
+    assert "2" in cmp_["scaling"]["threads"]["muscle_force_u16_dt1000us"]["standard"]["800"]
+    try:
+        BenchRunner("standard", 1).measure(BenchRunner("standard", 1).get_scenario("egreedy"), n=10, repeats=1, threads=2)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("threads must be rejected for serial scenarios")
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from neuromotorica.bench import app
+from neuromotorica.bench.runner import SIM_GRID, SIM_SCENARIOS, BenchRunner, load_thresholds
+
+runner = BenchRunner(profile="standard", seed=1)
+
+
+def test_sim_registry_grid_and_aliases():
+    sim = runner.expand(["sim"])
+    assert len(sim) == len(SIM_SCENARIOS) * len(SIM_GRID["units"]) * len(SIM_GRID["dt"])
+    assert runner.expand(["bandits"]) == ["thompson", "linucb", "egreedy"]
+    conv = runner.expand(["convolve_traces", "convolve_traces_u16_dt1000us"])
+    assert conv[0] == "convolve_traces_u16_dt1000us" and len(conv) == 4
+    with pytest.raises(ValueError):
+        runner.expand(["nope"])
+
+
+def test_sim_scenario_measure_and_threshold_lookup(tmp_path):
+    row = runner.measure(runner.get_scenario("muscle_force_u16_dt100us"), n=200, repeats=2)
+    assert row["throughput_ops_per_s"] > 0 and len(row["latency_samples"]) == 2
+
+    thresholds = load_thresholds(tmp_path / "missing.yml")
+    thresholds.update({"sim": {"mem_peak_mb": {"max_regression_pct": 7}},
+                       "lowpass": {"mem_peak_mb": {"max_regression_pct": 3}}})
+    assert runner.thresholds_for("lowpass_u64_dt100us", thresholds)["mem_peak_mb"]["max_regression_pct"] == 3
+    assert runner.thresholds_for("muscle_force_u16_dt100us", thresholds)["mem_peak_mb"]["max_regression_pct"] == 7
+    assert runner.thresholds_for("thompson", thresholds) == thresholds["_default"]
+
+
+def test_bench_cli_runs_sim_family_base(tmp_path):
+    res = CliRunner().invoke(app, ["run", "-s", "lowpass", "-n", "100", "-r", "1", "--outdir", str(tmp_path),
+                                   "--format", "json", "--no-fail-on-regress", "--no-record"])
+    assert res.exit_code == 0, res.stdout
+    rows = json.loads(next(tmp_path.glob("*/results.json")).read_text())
+    assert {r["scenario"] for r in rows} == set(runner.expand(["lowpass"]))
+    assert all(r["family"] == "sim" for r in rows)
+
+
+def test_sim_benches_pass_the_profile_through(monkeypatch):
+    from neuromotorica.analysis import extended_validation, validation
+    from neuromotorica.bench import sim
+
+    seen = []
+    monkeypatch.setattr(validation, "scenario_sim", lambda **kw: seen.append(kw["profile"]))
+    monkeypatch.setattr(extended_validation, "simulate_extended", lambda **kw: seen.append(kw["profile"]))
+    for profile in ("elite", "standard"):
+        sim.bench_scenario_sim(10, 0, profile, units=2)
+        sim.bench_simulate_extended(10, 0, profile, units=2)
+    assert seen == ["elite", "elite", sim.SIM_PROFILE, sim.SIM_PROFILE]
+
+
+def test_muscle_force_reuses_muscles_across_calls():
+    from neuromotorica.bench import sim
+
+    sim._muscle.cache_clear()
+    for _ in range(3):
+        assert sim.bench_muscle_force(50, 0, "standard", units=6, threads=2) == 300
+    assert sim._muscle.cache_info().misses == 1 and sim._muscle.cache_info().hits == 5
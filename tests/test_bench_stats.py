@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+from neuromotorica.bench.runner import BenchRunner
+from neuromotorica.bench.stats import bootstrap_delta_ci, mann_whitney_greater
+
+
+def test_mann_whitney_and_bootstrap_separate_shift_from_noise():
+    rng = np.random.default_rng(0)
+    base = 10.0 + rng.normal(0, 1.0, 12)
+    slower = 13.0 + rng.normal(0, 1.0, 12)
+    same = 10.0 + rng.normal(0, 1.0, 12)
+    _, p_shift = mann_whitney_greater(slower, base)
+    _, p_same = mann_whitney_greater(same, base)
+    assert p_shift < 0.01 < p_same
+    assert mann_whitney_greater([1.0, 1.0], [1.0, 1.0])[1] == 1.0
+    lo, hi = bootstrap_delta_ci(slower, base)
+    assert 0.0 < lo < 30.0 < hi
+    lo, hi = bootstrap_delta_ci(same, base)
+    assert lo < 0.0 < hi
+
+
+def test_measure_split_passes_and_min_time():
+    runner = BenchRunner(profile="light", seed=3)
+    scen = runner.get_scenario("egreedy")
+    row = runner.measure(scen, n=50, repeats=2, warmup=1, min_time_s=0.02, max_repeats=500, mem_repeats=2)
+    assert row["mode"] == "split" and len(row["mem_samples_mb"]) == 2
+    assert row["repeats"] == len(row["latency_samples"]) >= 2
+    assert row["repeats"] > 2  # min_time_s keeps the timing pass going
+    combined = runner.measure(scen, n=50, repeats=3, split_memory=False, disable_gc=False)
+    assert combined["mode"] == "combined" and len(combined["mem_samples_mb"]) == 3
+
+
+def test_compare_marks_insignificant_regressions_as_noise(tmp_path):
+    runner = BenchRunner(profile="standard", seed=1)
+    rng = np.random.default_rng(5)
+
+    def row(samples):
+        return {"scenario": "thompson", "n": 10, "profile": "standard", "mem_peak_mb": 1.0,
+                "latency_ms_avg": float(np.mean(samples)), "latency_ms_p95": float(np.percentile(samples, 95)),
+                "latency_samples": list(samples)}
+
+    base_samples = 10.0 + rng.normal(0, 4.0, 5)
+    (tmp_path / "base.json").write_text(json.dumps([row(base_samples)]))
+    thresholds = {"_default": {"latency_ms_avg": {"max_regression_pct": 1}, "latency_ms_p95": {"max_regression_pct": 1}}}
+
+    noisy = row(base_samples[::-1] * 1.02 + np.array([3.0, -3.0, 2.0, -2.0, 0.0]))
+    for method in ("mannwhitney", "bootstrap"):
+        checks = runner.compare_with_baseline([noisy], tmp_path / "base.json", thresholds, method=method)["checks"]
+        assert {c["status"] for c in checks if c["metric"] == "latency_ms_avg"} == {"noise"}
+    raw = runner.compare_with_baseline([noisy], tmp_path / "base.json", thresholds, method="delta")["checks"]
+    assert [c["status"] for c in raw if c["metric"] == "latency_ms_avg"] == ["fail"]
+
+    slow = row(base_samples + 30.0)
+    checks = runner.compare_with_baseline([slow], tmp_path / "base.json", thresholds)["checks"]
+    assert all(c["status"] == "fail" for c in checks if c["metric"].startswith("latency"))
+    with pytest.raises(ValueError):
+        runner.compare_with_baseline([slow], tmp_path / "base.json", thresholds, method="ttest")
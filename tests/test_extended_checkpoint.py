@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pytest
+
+from neuromotorica.analysis import extended_checkpoint
+from neuromotorica.analysis.extended_validation import simulate_extended
+from neuromotorica.models.filters import lowpass_biquad_block, lowpass_biquad_filtfilt
+from neuromotorica.models.pool import Pool
+from neuromotorica.storage.traces import TraceStore
+
+CONFIG = dict(seconds=0.6, dt=0.001, units=8, rate_hz=15.0, seed=11)
+CKPT = dict(block_s=0.05, checkpoint_every=2)
+
+
+def test_block_primitives_reproduce_whole_trace_passes():
+    x = np.random.default_rng(1).random((5, 1003))
+    forward, state = [], None
+    for start in range(0, 1003, 128):
+        y, state = lowpass_biquad_block(x[:, start:start + 128], 1e-3, 0.01, state)
+        forward.append(y)
+    fwd = np.concatenate(forward, axis=1)
+    backward, state = [], None
+    for hi in range(1003, 0, -128):
+        y, state = lowpass_biquad_block(fwd[:, max(hi - 128, 0):hi][:, ::-1], 1e-3, 0.01, state)
+        backward.append(y)
+    assert np.array_equal(np.concatenate(backward, axis=1)[:, ::-1], lowpass_biquad_filtfilt(x, 1e-3, 0.01))
+
+    pool = Pool(units=6, dt=1e-3, T=1.0)
+    blocks = [pool.poisson_spikes_block(20.0, 3, start, start + 300) for start in range(0, 1000, 300)]
+    assert np.array_equal(np.concatenate(blocks, axis=1), pool.poisson_spikes(20.0, seed=3))
+
+
+@pytest.fixture(scope="module")
+def reference(tmp_path_factory):
+    return simulate_extended(**CONFIG, checkpoint_dir=str(tmp_path_factory.mktemp("ref")), **CKPT)
+
+
+@pytest.mark.parametrize("fail_at, phase", [(9, "forward"), (30, "backward")])
+def test_resume_after_eviction_is_bit_identical(tmp_path, monkeypatch, reference, fail_at, phase):
+    calls = []
+
+    def evicted(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == fail_at:
+            raise RuntimeError("worker evicted")
+        return lowpass_biquad_block(*args, **kwargs)
+
+    monkeypatch.setattr(extended_checkpoint, "lowpass_biquad_block", evicted)
+    with pytest.raises(RuntimeError, match="evicted"):
+        simulate_extended(**CONFIG, checkpoint_dir=str(tmp_path), **CKPT)
+    monkeypatch.undo()
+    _, meta = extended_checkpoint.load_checkpoint(tmp_path / extended_checkpoint.STATE_NAME)
+    assert meta["phase"] == phase and 0 < meta["t"] < 600
+
+    assert simulate_extended(**CONFIG, checkpoint_dir=str(tmp_path), **CKPT) == reference
+    store = TraceStore.open(tmp_path / extended_checkpoint.TRACES_NAME)
+    assert store.manifest["complete"] is True and store["backward.ach"].shape == (8, 600)
+
+
+def test_checkpointed_run_matches_simulate_extended(tmp_path, reference):
+    plain = simulate_extended(**CONFIG)
+    assert plain == simulate_extended(**CONFIG)  # channel noise is seeded
+    for key, value in plain["metrics"].items():
+        assert reference["metrics"][key] == pytest.approx(value, rel=1e-9, abs=1e-12)
+    simulate_extended(**CONFIG, checkpoint_dir=str(tmp_path), **CKPT)
+    with pytest.raises(ValueError, match="config does not match"):
+        simulate_extended(**{**CONFIG, "seed": 12}, checkpoint_dir=str(tmp_path), **CKPT)
+
+
+def test_truncate_rolls_back_to_chunk_boundaries(tmp_path):
+    data = np.arange(50.0)
+    with TraceStore.create(tmp_path / "s", dt=1e-3, chunk_size=10) as writer:
+        writer.append("x", data)
+    writer = TraceStore.open(tmp_path / "s").writer()
+    assert writer.store.manifest["complete"] is False
+    with pytest.raises(ValueError, match="chunk boundary"):
+        writer.truncate("x", 25)
+    writer.truncate("x", 30)
+    writer.append("x", -data[30:40])
+    writer.close()
+    store = TraceStore.open(tmp_path / "s")
+    assert np.array_equal(store["x"].read(), np.concatenate([data[:30], -data[30:40]]))
+    assert json.loads((tmp_path / "s" / "manifest.json").read_text())["complete"] is True
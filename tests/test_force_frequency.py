@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from neuromotorica.analysis.force_frequency import force_frequency_curve, regular_trains
+from neuromotorica.models.enhanced_nmj import EnhancedNMJ
+from neuromotorica.models.extended_muscle import ExtendedMuscle, ExtendedMuscleParams
+from neuromotorica.models.muscle import Muscle
+from neuromotorica.profiles import build_profile_params
+
+DT, T, UNITS = 1e-3, 0.6, 6
+
+
+def test_force_batch_matches_force():
+    rng = np.random.default_rng(1)
+    act = rng.random((3, UNITS, 50))
+    _, _, mp, _ = build_profile_params("baseline")
+    muscle = Muscle(mp, DT, T, units=UNITS)
+    expected = np.stack([muscle.force(a, L=1.1, V=0.5)[0] for a in act])
+    assert np.allclose(muscle.force_batch(act, L=1.1, V=0.5), expected)
+    ext = ExtendedMuscle(ExtendedMuscleParams(topography_factor=1.3), DT, T, units=UNITS)
+    assert np.allclose(ext.force_batch(act[0]), ext.force(act[0])[0])
+    with pytest.raises(ValueError):
+        muscle.force_batch(act[:, :2])
+
+
+def test_poisson_sweep_matches_per_rate_pipeline():
+    rates = [5.0, 20.0, 60.0]
+    res = force_frequency_curve(rates, ("baseline",), seconds=T, dt=DT, units=UNITS, train="poisson", seed=3,
+                                max_rows=UNITS)  # one rate per chunk
+    nmjp, enhp, mp, _ = build_profile_params("baseline")
+    nmj, muscle = EnhancedNMJ(enhp, DT, T), Muscle(mp, DT, T, units=UNITS)
+    uniforms = np.random.default_rng(3).random((UNITS, int(T / DT)))
+    for idx, rate in enumerate(rates):
+        F, _ = muscle.force(nmj.dual_transmission_activation((uniforms < rate * DT).astype(np.float64)))
+        assert res["profiles"]["baseline"]["mean_force_N"][idx] == pytest.approx(F[300:].mean())
+    assert np.all(np.diff(res["profiles"]["baseline"]["mean_force_N"]) >= 0)
+
+
+def test_regular_sweep_fusion_and_summation():
+    spikes = regular_trains([10.0, 0.0, 250.0], DT, 100)
+    assert spikes.sum(axis=1).tolist() == [1.0, 0.0, 25.0]
+    rates = np.linspace(2.0, 80.0, 25)
+    res = force_frequency_curve(rates, ("baseline", "rehab"), seconds=1.0, dt=DT, units=8)
+    for prof in res["profiles"].values():
+        fusion = np.array(prof["fusion_index"])
+        assert fusion[0] < 0.5 and fusion[-1] > 0.95
+        assert 2.0 < prof["fusion_frequency_Hz"] < 80.0
+        assert prof["summation_efficiency"] > 1.0
+    with pytest.raises(ValueError):
+        force_frequency_curve([10.0], model="nope")
+    with pytest.raises(ValueError):
+        force_frequency_curve([], ())
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from neuromotorica.analysis.extended_validation import simulate_extended
+from neuromotorica.analysis.validation import scenario_sim
+from neuromotorica.models.multirate import antialias_taps, decimate, upsample
+
+
+def test_decimate_matches_filtered_subsampling_and_rejects_aliases():
+    rng = np.random.default_rng(9)
+    x = rng.standard_normal((3, 1003))
+    for factor in (2, 5, 10):
+        h = antialias_taps(factor)
+        half = (h.size - 1) // 2
+        padded = np.pad(x, [(0, 0), (half, half)], mode="edge")
+        expected = np.stack([np.convolve(row, h, mode="valid")[::factor] for row in padded])
+        assert np.allclose(decimate(x, factor), expected)
+
+    t = np.arange(20000) * 1e-4
+    slow = np.sin(2 * np.pi * 5.0 * t)
+    fast = np.sin(2 * np.pi * 900.0 * t)  # would alias at the decimated 1 kHz rate
+    y = decimate(slow + fast, 10)
+    assert np.max(np.abs(y[20:-20] - slow[::10][20:-20])) < 0.02
+    assert np.array_equal(decimate(x, 1), x)
+
+
+def test_upsample_interpolates_back_to_fine_grid():
+    coarse = np.array([[0.0, 1.0, 3.0]])
+    fine = upsample(coarse, 4, 11)
+    assert fine.shape == (1, 11)
+    assert np.allclose(fine[0, :9], [0.0, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 2.5, 3.0])
+    assert np.allclose(fine[0, 9:], 3.0)
+
+
+def test_scenario_force_decimation_keeps_twitch_metrics_close():
+    ref = scenario_sim(seconds=0.5, dt=1e-4, units=8)
+    dec = scenario_sim(seconds=0.5, dt=1e-4, units=8, force_decimation=10)
+    assert dec["config"]["force_decimation"] == 10
+    ref_tw, dec_tw = ref["single_spike"]["twitch"], dec["single_spike"]["twitch"]
+    assert abs(dec_tw["time_to_peak_ms"] - ref_tw["time_to_peak_ms"]) <= 1.0
+    assert abs(dec_tw["half_relaxation_time_ms"] - ref_tw["half_relaxation_time_ms"]) <= 1.0
+    assert dec_tw["peak_force_N"] == pytest.approx(ref_tw["peak_force_N"], rel=1e-3)
+    with pytest.raises(ValueError):
+        scenario_sim(seconds=0.2, force_decimation=0)
+
+
+def test_simulate_extended_force_decimation(tmp_path):
+    res = simulate_extended(seconds=0.3, units=8, dt=5e-4, force_decimation=5, trace_dir=str(tmp_path / "ext"))
+    assert res["metrics"]["peak_force_N"] > 0
+    assert res["config"]["force_decimation"] == 5
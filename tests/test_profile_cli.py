@@ -0,0 +1,50 @@
+import json
+import pstats
+
+from typer.testing import CliRunner
+
+from neuromotorica.analysis.profiling import StackSampler
+from neuromotorica.cli import app
+
+runner = CliRunner()
+
+
+def test_profile_command_writes_report_hotspots_and_collapsed_stacks(tmp_path):
+    report = tmp_path / "out" / "profile.json"
+    result = runner.invoke(app, [
+        "profile", "--seconds", "0.3", "--units", "8", "--repeats", "2",
+        "--report", str(report), "--pstats", str(tmp_path / "run.pstats"), "--interval-ms", "0.5",
+    ])
+    assert result.exit_code == 0, result.stdout
+    data = json.loads(report.read_text())
+    assert data["metrics"]["runtime_ms"]["mean"] > 0
+    assert "nmj" in data["stages"]
+    functions = {row["function"] for row in data["hotspots"]["by_cumtime"]}
+    assert "profile_simulation" in functions
+    assert data["sampling"]["samples"] > 0
+    folded = (tmp_path / "out" / "profile.folded").read_text().splitlines()
+    assert folded and all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert pstats.Stats(str(tmp_path / "run.pstats")).total_calls > 0
+    # The profiled pass is uninstrumented: tracemalloc never runs under cProfile.
+    profiled = {func for _, _, func in pstats.Stats(str(tmp_path / "run.pstats")).stats}
+    assert not any("_tracemalloc" in func for func in profiled)
+
+
+def test_profile_command_without_profilers_and_unknown_profile(tmp_path):
+    report = tmp_path / "p.json"
+    result = runner.invoke(app, ["profile", "--seconds", "0.2", "--units", "4", "--repeats", "1",
+                                 "--no-cprofile", "--no-sample", "--no-stages", "--report", str(report)])
+    assert result.exit_code == 0
+    data = json.loads(report.read_text())
+    assert "hotspots" not in data and "sampling" not in data and data["stages"] == {}
+    bad = runner.invoke(app, ["profile", "--profile", "unknown-profile", "--report", str(report)])
+    assert bad.exit_code == 2 and "Unknown profile" in bad.stdout
+
+
+def test_stack_sampler_collapsed_format():
+    with StackSampler(0.0005) as sampler:
+        total = 0
+        for idx in range(300_000):
+            total += idx
+    assert sampler.samples > 0
+    assert "test_stack_sampler_collapsed_format" in sampler.collapsed()
@@ -0,0 +1,73 @@
+import numpy as np
+
+from neuromotorica.analysis import profiling
+from neuromotorica.analysis.profiling import profile_simulation
+from neuromotorica.analysis.validation import scenario_sim
+from neuromotorica.common.stages import StageRecorder, active_recorder, instrumented
+
+
+def test_stage_recorder_nesting_and_memory():
+    @instrumented("outer")
+    def outer():
+        inner()
+        return np.ones(50_000)
+
+    @instrumented("inner")
+    def inner():
+        return np.zeros(200_000)
+
+    rec = StageRecorder()
+    assert active_recorder() is None
+    with rec.activate():
+        assert active_recorder() is rec
+        outer()
+        outer()
+    summary = rec.summary()
+    assert summary["outer"]["calls"] == 2 and summary["inner"]["calls"] == 2
+    assert summary["outer"]["total_ms"] >= summary["inner"]["total_ms"]
+    assert summary["inner"]["peak_bytes"] >= 200_000 * 8
+    assert summary["outer"]["peak_bytes"] >= summary["inner"]["peak_bytes"]
+    outer()  # inactive recorder: nothing recorded
+    assert rec.summary()["outer"]["calls"] == 2
+
+
+def test_scenario_sim_stage_breakdown():
+    plain = scenario_sim(seconds=0.3, units=6)
+    assert "stages" not in plain["runtime"]
+    res = scenario_sim(seconds=0.3, units=6, instrument=True)
+    stages = res["runtime"]["stages"]
+    for name in ("spikes", "kernels", "filters", "nmj", "muscle"):
+        assert stages[name]["calls"] > 0
+        assert stages[name]["peak_bytes"] >= 0
+    assert stages["nmj"]["total_ms"] <= res["runtime"]["total_sec"] * 1000.0
+    assert res["random_poisson"]["forces_N"] == plain["random_poisson"]["forces_N"]
+
+    prof = profile_simulation(
+        seconds=0.2, dt=1e-3, units=4, rate_hz=20.0, repeats=2, profile="baseline", fft_threshold=None, seed=1
+    )
+    assert prof["stages"]["muscle"]["calls_per_run"] > 0
+    assert prof["stages"]["muscle"]["peak_bytes_max"] >= 0
+    assert prof["metrics"]["single_spike_ms"]["mean"] <= prof["metrics"]["runtime_ms"]["mean"]
+
+
+def test_profile_simulation_times_uninstrumented_runs(monkeypatch):
+    calls = []
+
+    def spy(**kwargs):
+        calls.append((kwargs.get("instrument", False), kwargs.get("trace_memory", True)))
+        return scenario_sim(**kwargs)
+
+    monkeypatch.setattr(profiling, "scenario_sim", spy)
+    prof = profile_simulation(
+        seconds=0.2, dt=1e-3, units=4, rate_hz=20.0, repeats=2, profile="baseline", fft_threshold=None, seed=1
+    )
+    # Two timed runs, two tracemalloc-free stage runs, one allocation run.
+    assert calls == [(False, True), (False, True), (True, False), (True, False), (True, True)]
+    assert all(0 <= stage["share_pct"] <= 100 for stage in prof["stages"].values())
+    calls.clear()
+    quick = profile_simulation(
+        seconds=0.2, dt=1e-3, units=4, rate_hz=20.0, repeats=1, profile="baseline", fft_threshold=None, seed=1,
+        trace_memory=False,
+    )
+    assert calls == [(False, True), (True, False)]
+    assert quick["stages"]["nmj"]["peak_bytes_max"] is None
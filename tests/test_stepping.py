@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from neuromotorica.models.enhanced_nmj import EnhancedNMJ, EnhancedNMJParams
+from neuromotorica.models.extended_muscle import ExtendedMuscle, ExtendedMuscleParams
+from neuromotorica.models.muscle import Muscle, MuscleParams
+from neuromotorica.models.nmj import NMJ, NMJParams
+from neuromotorica.models.pool import Pool
+from neuromotorica.models.stepping import NMJStepper
+
+DT, T, UNITS = 0.001, 1.2, 6
+
+
+@pytest.mark.parametrize(
+    "model, batch",
+    [
+        (NMJ(NMJParams(), DT, T), "calcium_activation"),
+        (EnhancedNMJ(EnhancedNMJParams(), DT, T), "dual_transmission_activation"),
+    ],
+)
+def test_stepping_matches_batch_activation_and_force(model, batch):
+    spikes = Pool(units=UNITS, dt=DT, T=T).poisson_spikes(rate_hz=25.0, seed=4)
+    muscle = Muscle(MuscleParams(), DT, T, units=UNITS)
+    expected_act = getattr(model, batch)(spikes)
+    expected_force, _ = muscle.force(expected_act)
+
+    stepper = NMJStepper(model, muscle=muscle)
+    first_act, first_force = stepper.step_block(spikes[:, :333])
+    singles = [stepper.step(spikes[:, idx]) for idx in range(333, 340)]
+    rest_act, rest_force = stepper.step_block(spikes[:, 340:])
+
+    act = np.concatenate([first_act, np.stack([a for a, _ in singles], axis=1), rest_act], axis=1)
+    force = np.concatenate([first_force, [f for _, f in singles], rest_force])
+    assert np.allclose(act, expected_act, atol=1e-10)
+    assert np.allclose(force, expected_force, rtol=1e-10, atol=1e-8)
+
+    stepper.reset()
+    again, _ = stepper.step_block(spikes[:, :50])
+    assert np.allclose(again, expected_act[:, :50], atol=1e-10)
+
+
+def test_stepping_extended_muscle_and_validation():
+    muscle = ExtendedMuscle(ExtendedMuscleParams(topography_factor=1.3), DT, T, units=UNITS)
+    act = np.full(UNITS, 0.5)
+    F_total, _ = muscle.force(act[:, None])
+    assert muscle.force_step(act) == pytest.approx(F_total[0])
+
+    stepper = NMJStepper(NMJ(NMJParams(), DT, T), units=UNITS)
+    act_out, force = stepper.step(np.zeros(UNITS))
+    assert force is None and act_out.shape == (UNITS,)
+    with pytest.raises(ValueError):
+        stepper.step(np.zeros(UNITS + 1))
+    with pytest.raises(ValueError):
+        NMJStepper(NMJ(NMJParams(), DT, T))
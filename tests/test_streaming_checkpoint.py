@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from neuromotorica.analysis.streaming import ExtendedStream, simulate_extended_stream
+from neuromotorica.models.filters import lowpass, lowpass_block
+from neuromotorica.models.kernels import convolve_block, convolve_traces, normalized_alpha_kernel
+
+CONFIG = dict(seconds=0.6, dt=0.001, units=8, rate_hz=15.0, seed=11, block_s=0.05)
+
+
+@pytest.mark.parametrize("threshold", [64, 1 << 20])
+def test_block_primitives_match_batch(threshold):
+    rng = np.random.default_rng(2)
+    x = rng.standard_normal((3, 700))
+    kernel = normalized_alpha_kernel(np.arange(0.0, 0.2, 0.001), 0.005, 0.04)
+    conv_parts, lp_parts, tail, state = [], [], None, None
+    for start in range(0, 700, 90):
+        y, tail = convolve_block(x[:, start:start + 90], kernel, tail, use_fft_threshold=threshold)
+        conv_parts.append(y)
+        z, state = lowpass_block(x[:, start:start + 90], 0.001, 0.03, state)
+        lp_parts.append(z)
+    assert np.allclose(np.concatenate(conv_parts, axis=1), convolve_traces(x, kernel))
+    assert np.array_equal(np.concatenate(lp_parts, axis=1), lowpass(x, 0.001, 0.03))
+
+
+def test_restart_from_checkpoint_is_bit_identical(tmp_path):
+    reference = ExtendedStream(**CONFIG)
+    ref_forces = []
+    ref_result = reference.run(on_block=lambda act, F: ref_forces.append(F))
+
+    ckpt = tmp_path / "run.ckpt"
+    interrupted = ExtendedStream(**CONFIG)
+    forces = []
+    for _ in range(5):
+        forces.append(interrupted.step_block()[1])
+    interrupted.save_checkpoint(ckpt)
+    del interrupted  # simulated worker eviction
+
+    resumed = ExtendedStream.from_checkpoint(ckpt)
+    assert resumed.t == 5 * resumed.block_len
+    result = resumed.run(on_block=lambda act, F: forces.append(F))
+    assert np.array_equal(np.concatenate(forces), np.concatenate(ref_forces))
+    assert result == ref_result
+    assert result["progress"]["done"]
+    assert result["metrics"]["peak_force_N"] > 0
+
+
+def test_simulate_extended_stream_resumes_and_checks_config(tmp_path):
+    ckpt = tmp_path / "stream.ckpt"
+    stream = ExtendedStream(**CONFIG)
+    stream.step_block()
+    stream.save_checkpoint(ckpt)
+
+    resumed = simulate_extended_stream(checkpoint_path=ckpt, checkpoint_every=2, **CONFIG)
+    assert resumed == ExtendedStream(**CONFIG).run()
+    assert ExtendedStream.from_checkpoint(ckpt).done
+    with pytest.raises(ValueError):
+        simulate_extended_stream(checkpoint_path=ckpt, **{**CONFIG, "seed": 12})
+
+
+def test_drift_from_simulate_extended_is_bounded():
+    from neuromotorica.analysis.extended_validation import simulate_extended
+
+    keys = ("snr", "peak_force_N", "mean_force_N", "cv_force", "failure_rate")
+    full = {k: 0.0 for k in keys}
+    stream = {k: 0.0 for k in keys}
+    for seed in (0, 1, 2):
+        for acc, metrics in (
+            (full, simulate_extended(seconds=1.0, seed=seed)["metrics"]),
+            (stream, ExtendedStream(seconds=1.0, seed=seed).run()["metrics"]),
+        ):
+            for k in keys:
+                acc[k] += metrics[k] / 3
+    assert abs(stream["failure_rate"] - full["failure_rate"]) <= 0.01
+    for k, tolerance in (("snr", 0.15), ("peak_force_N", 0.1), ("mean_force_N", 0.1)):
+        assert abs(stream[k] - full[k]) <= tolerance * full[k], k
+    # The causal start-up ramp raises force variability; it must not grow beyond that.
+    assert full["cv_force"] <= stream["cv_force"] <= 2.0 * full["cv_force"]
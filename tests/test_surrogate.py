@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from neuromotorica.analysis.surrogate import METRICS, MetricSurrogate, build_surrogate, multilinear
+from neuromotorica.analysis.validation import scenario_sim
+from neuromotorica.cli import app
+
+SIM = {"seconds": 0.4, "dt": 1e-3, "seed": 5}
+
+
+def test_multilinear_is_exact_for_bilinear_functions():
+    axes = [np.array([0.0, 1.0, 3.0]), np.array([10.0, 20.0])]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+    values = np.stack([2 * grid[..., 0] + grid[..., 1], grid[..., 0] * grid[..., 1]], axis=-1)
+    pts = np.array([[0.5, 12.0], [2.0, 20.0], [3.0, 10.0]])
+    expected = np.stack([2 * pts[:, 0] + pts[:, 1], pts[:, 0] * pts[:, 1]], axis=1)
+    assert np.allclose(multilinear(axes, values, pts), expected)
+
+
+@pytest.fixture(scope="module")
+def surrogate_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("sur") / "grid.npz"
+    return build_surrogate(path, ["baseline"], rates_hz=(5, 20), units=(4, 8), error_samples=1, **SIM)
+
+
+def test_surrogate_grid_nodes_queries_and_fallback(surrogate_path):
+    sur = MetricSurrogate.load(surrogate_path)
+    assert sur.metrics == list(METRICS) and sur.max_rel_error.shape == (1, len(METRICS))
+    node = sur.query("baseline", 20.0, 8)
+    ref = scenario_sim(rate_hz=20.0, units=8, profile="baseline", **SIM)
+    assert node["source"] == "grid"
+    assert node["poisson_force_N"] == pytest.approx(ref["random_poisson"]["forces_N"]["optimized"], rel=1e-6)
+    assert node["time_to_peak_ms"] == pytest.approx(ref["single_spike"]["twitch"]["time_to_peak_ms"])
+
+    batch = sur.query_batch("baseline", [5.0, 12.5, 30.0], [4, 6, 8])
+    assert batch["source"].tolist() == ["grid", "grid", "sim"]
+    assert min(batch["snr"][:1]) > 0
+    outside = sur.query("baseline", 30.0, 8)
+    assert outside["source"] == "sim" and outside["max_rel_error"] is None
+    with pytest.raises(ValueError):
+        sur.query("baseline", 30.0, 8, fallback=False)
+
+
+def test_surrogate_unknown_profile_falls_back_to_simulation(surrogate_path):
+    sur = MetricSurrogate.load(surrogate_path)
+    res = sur.query("elite", 10.0, 8)
+    ref = scenario_sim(rate_hz=10.0, units=8, profile="elite", **SIM)
+    assert res["source"] == "sim" and res["max_rel_error"] is None
+    assert res["poisson_force_N"] == pytest.approx(ref["random_poisson"]["forces_N"]["optimized"], rel=1e-6)
+    assert sur.query_batch("elite", [5.0, 30.0], 4)["source"].tolist() == ["sim", "sim"]
+    with pytest.raises(ValueError, match="not in surrogate grid"):
+        sur.query("elite", 10.0, 8, fallback=False)
+
+
+def test_surrogate_build_cli(tmp_path):
+    out = tmp_path / "s.npz"
+    res = CliRunner().invoke(app, ["surrogate-build", "--out", str(out), "-p", "rehab", "--rate", "5", "--rate", "10",
+                                   "--units", "4", "--units", "6", "--seconds", "0.3", "--error-samples", "1"])
+    assert res.exit_code == 0, res.stdout
+    assert "rehab" in json.loads(res.stdout)["max_rel_error"]
+    assert MetricSurrogate.load(out).profiles == ["rehab"]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from neuromotorica.models.enhanced_nmj import EnhancedNMJParams, OptimizedEnhancedNMJ
+from neuromotorica.models.muscle import Muscle, MuscleParams
+from neuromotorica.models.pool import Pool
+from neuromotorica.storage.codec import (
+    CodecSpec,
+    EncodedTrace,
+    activation_spec,
+    decode_trace,
+    encode_trace,
+    force_spec,
+)
+from neuromotorica.storage.traces import TraceStore
+
+
+@pytest.fixture(scope="module")
+def traces():
+    dt, T, units = 0.001, 2.0, 16
+    spikes = Pool(units=units, dt=dt, T=T).poisson_spikes(rate_hz=15.0, seed=5)
+    act = OptimizedEnhancedNMJ(EnhancedNMJParams(), dt, T).physiologically_realistic_activation(spikes)
+    force, _ = Muscle(MuscleParams(), dt, T, units=units).force(act)
+    return act, force
+
+
+@pytest.mark.parametrize("dtype, max_error", [("uint8", 5e-3), ("uint16", 1e-4)])
+def test_activation_roundtrip_error_bound_and_ratio(traces, dtype, max_error):
+    act, _ = traces
+    enc = encode_trace(act, activation_spec(max_error, dtype=dtype, chunk_size=500))
+    out = decode_trace(enc.to_bytes())
+    assert out.shape == act.shape
+    assert np.max(np.abs(out - act)) <= max_error + 1e-12
+    assert enc.max_abs_error == pytest.approx(np.max(np.abs(out - act)))
+    assert enc.compression_ratio >= 10.0
+    # Random access decodes only the overlapping chunks.
+    assert np.array_equal(enc.read(730, 1240), out[:, 730:1240])
+    assert np.array_equal(enc.decode_chunk(2), out[:, 1000:1500])
+
+
+def test_force_codec_default_step_and_invalid_specs(traces):
+    _, force = traces
+    spec = force_spec(MuscleParams().F_max, dtype="uint16")
+    enc = EncodedTrace.from_bytes(encode_trace(force, spec).to_bytes())
+    assert enc.max_abs_error <= spec.step / 2 + 1e-9
+    assert enc.report()["compression_ratio"] >= 4.0
+    with pytest.raises(ValueError):
+        CodecSpec(0.0, 1.0, max_error=1e-4, dtype="uint8")
+    with pytest.raises(ValueError):
+        CodecSpec(1.0, 1.0)
+
+
+def test_trace_store_compressed_traces_report_error(tmp_path, traces):
+    act, _ = traces
+    spec = activation_spec(1e-3, dtype="uint16")
+    with TraceStore.create(tmp_path / "q", dt=0.001, chunk_size=256) as writer:
+        for start in range(0, act.shape[1], 300):
+            writer.append("act", act[:, start:start + 300], codec=spec)
+    store = TraceStore.open(tmp_path / "q")
+    trace = store["act"]
+    assert trace.codec == spec
+    assert np.max(np.abs(trace[:, 100:1900] - act[:, 100:1900])) <= 1e-3 + 1e-12
+    assert 0.0 < store.manifest["traces"]["act"]["error"]["max_abs_error"] <= 1e-3
+    disk = sum(p.stat().st_size for p in (tmp_path / "q" / "act").iterdir())
+    assert act.nbytes / disk >= 10.0
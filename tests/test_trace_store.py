@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+import pytest
+
+from neuromotorica.analysis.extended_validation import simulate_extended
+from neuromotorica.analysis.streaming import ExtendedStream, simulate_extended_stream
+from neuromotorica.analysis.validation import (
+    result_from_store,
+    scenario_sim,
+    twitch_metrics,
+    validate_against_benchmarks,
+)
+from neuromotorica.analysis.viz import plot_trace_store
+from neuromotorica.models.extended_muscle import ExtendedMuscle
+from neuromotorica.storage.traces import TraceStore
+
+
+def test_append_while_simulating_and_sliced_reads(tmp_path):
+    rng = np.random.default_rng(3)
+    full = rng.standard_normal((4, 1000))
+    with TraceStore.create(tmp_path / "run", dt=0.001, config={"units": 4}, profile="baseline", seed=3,
+                           chunk_size=128) as writer:
+        for start in range(0, 1000, 70):
+            writer.append("act", full[:, start:start + 70])
+            writer.append("force", full[0, start:start + 70])
+        # Flushed chunks are readable before the writer is closed.
+        partial = TraceStore.open(tmp_path / "run")
+        assert partial["act"].length == 896
+        assert partial.manifest["complete"] is False
+
+    store = TraceStore.open(tmp_path / "run")
+    assert store.manifest["complete"] is True
+    assert (store.profile, store.seed, store.config) == ("baseline", 3, {"units": 4})
+    act = store["act"]
+    assert act.shape == (4, 1000)
+    assert np.array_equal(act.read(), full)
+    assert np.array_equal(act[:, 120:500:7], full[:, 120:500:7])
+    assert np.array_equal(act[2, 250:260], full[2, 250:260])
+    assert np.array_equal(act[-1], full[:, -1])
+    assert np.array_equal(store["force"][::3], full[0, ::3])
+    with pytest.raises(RuntimeError):
+        writer.append("act", full[:, :10])
+    with pytest.raises(FileExistsError):
+        TraceStore.create(tmp_path / "run", dt=0.001)
+
+
+def test_scenario_traces_feed_validation_and_viz(tmp_path):
+    trace_dir = tmp_path / "scenario"
+    res = scenario_sim(seconds=0.5, units=8, trace_dir=str(trace_dir))
+    assert "single_spike.optimized.force" in res["traces"]["names"]
+
+    rebuilt = result_from_store(trace_dir)
+    assert rebuilt["single_spike"]["twitch"] == res["single_spike"]["twitch"]
+    assert rebuilt["single_spike"]["forces_N"] == res["single_spike"]["forces_N"]
+    bench = tmp_path / "ranges.json"
+    bench.write_text(json.dumps({
+        "twitch": {"time_to_peak_ms": [0, 1000], "half_relaxation_time_ms": [0, 1000]},
+        "fusion_frequency_Hz": [0, 100],
+    }))
+    assert validate_against_benchmarks(rebuilt, str(bench)) == validate_against_benchmarks(res, str(bench))
+
+    files = plot_trace_store(str(trace_dir), outdir=str(tmp_path / "plots"),
+                             names=["burst.optimized.force", "burst.optimized.activation"])
+    assert len(files) == 2
+
+
+def test_simulate_extended_writes_traces(tmp_path):
+    res = simulate_extended(seconds=0.3, units=8, trace_dir=str(tmp_path / "ext"))
+    store = TraceStore.open(res["traces"]["path"])
+    force = store["extended.force"].read()
+    assert force.shape == (300,)
+    assert float(np.max(force)) == res["metrics"]["peak_force_N"]
+    assert store["extended.activation"].shape == (8, 300)
+    assert twitch_metrics(force, store.dt)["peak_force_N"] > 0
+
+
+def test_interrupted_run_keeps_finished_stages(tmp_path, monkeypatch):
+    def fail(self, act):
+        raise RuntimeError("muscle stage failed")
+
+    monkeypatch.setattr(ExtendedMuscle, "force", fail)
+    with pytest.raises(RuntimeError, match="muscle stage"):
+        simulate_extended(seconds=0.3, units=8, trace_dir=str(tmp_path / "ext"))
+    store = TraceStore.open(tmp_path / "ext")
+    assert store.manifest["complete"] is False
+    assert store.names() == ("extended.activation",)
+    assert store["extended.activation"].shape == (8, 300)
+
+
+def test_stream_appends_every_block(tmp_path, monkeypatch):
+    cfg = {"seconds": 0.3, "units": 8, "block_s": 0.05}
+    res = simulate_extended_stream(trace_dir=str(tmp_path / "stream"), **cfg)
+    store = TraceStore.open(res["traces"]["path"])
+    assert store.manifest["complete"] is True and store["extended.activation"].shape == (8, 300)
+    assert float(np.max(store["extended.force"].read())) == res["metrics"]["peak_force_N"]
+    assert res["metrics"] == simulate_extended_stream(**cfg)["metrics"]
+
+    original = ExtendedStream.step_block
+
+    def step_then_fail(self):
+        if self.t >= 150:
+            raise RuntimeError("interrupted")
+        return original(self)
+
+    monkeypatch.setattr(ExtendedStream, "step_block", step_then_fail)
+    with pytest.raises(RuntimeError):
+        simulate_extended_stream(trace_dir=str(tmp_path / "partial"), **cfg)
+    partial = TraceStore.open(tmp_path / "partial")
+    assert partial.manifest["complete"] is False
+    assert np.array_equal(partial["extended.force"].read(), store["extended.force"].read(0, 150))
+
+    ckpt = tmp_path / "ckpt.npz"
+    stream = ExtendedStream(**cfg)
+    original(stream)
+    stream.save_checkpoint(ckpt)
+    with pytest.raises(ValueError, match="resuming"):
+        simulate_extended_stream(checkpoint_path=ckpt, trace_dir=str(tmp_path / "resumed"), **cfg)
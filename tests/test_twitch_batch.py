@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+from neuromotorica.analysis.validation import (
+    twitch_metrics,
+    twitch_metrics_batch,
+    validate_against_benchmarks,
+    validate_against_benchmarks_batch,
+)
+
+DT = 1e-3
+
+
+def _forces(batch=64, n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * DT
+    tr, td = rng.uniform(0.005, 0.03, (batch, 1)), rng.uniform(0.04, 0.12, (batch, 1))
+    f = (np.exp(-t / td) - np.exp(-t / tr)) * rng.uniform(1.0, 5.0, (batch, 1)) + rng.normal(0, 0.005, (batch, n))
+    f[0] = 0.0  # flat trace
+    f[1] = np.linspace(0.0, 1.0, n)  # peak at the window end
+    f[2, :5] = [0.0, 3.0, 1.0, 0.5, 0.2]  # ties and an early spike
+    return f
+
+
+def test_batch_matches_scalar_twitch_metrics():
+    forces = _forces()
+    batch = twitch_metrics_batch(forces, DT, chunk_rows=7)
+    for idx, row in enumerate(forces):
+        ref = twitch_metrics(row, DT)
+        for key, value in ref.items():
+            assert batch[key][idx] == pytest.approx(value, abs=1e-3, rel=1e-3), (idx, key)
+    with pytest.raises(ValueError):
+        twitch_metrics_batch(forces[0], DT)
+
+
+def test_batch_validation_pass_rates(tmp_path):
+    bench = tmp_path / "ranges.json"
+    bench.write_text(json.dumps({"twitch": {"time_to_peak_ms": [20, 40], "half_relaxation_time_ms": [40, 80]},
+                                 "fusion_frequency_Hz": [10, 50]}))
+    forces = _forces(seed=3)
+    metrics = twitch_metrics_batch(forces, DT)
+    res = validate_against_benchmarks_batch(metrics, str(bench), fusion_frequency_Hz=17.5)
+    for idx in (3, 10, 40):
+        tw = twitch_metrics(forces[idx], DT)
+        scalar = validate_against_benchmarks({"single_spike": {"twitch": tw, "fusion_frequency_Hz": 17.5}}, str(bench))
+        assert {k: bool(res[k][idx]) for k in scalar} == scalar
+    assert res["pass_rate"]["time_to_peak_in_range"] == pytest.approx(np.mean(res["time_to_peak_in_range"]))
+    assert res["pass_rate"]["all_in_range"] <= res["pass_rate"]["half_relax_in_range"]
+    no_ff = validate_against_benchmarks_batch(metrics, str(bench))
+    assert "fusion_freq_in_range" not in no_ff and no_ff["all_in_range"].shape == (forces.shape[0],)